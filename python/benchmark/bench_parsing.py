@@ -0,0 +1,65 @@
+"""
+Micro-benchmarks the vectorized duration parser against the row-by-row parsing it replaced.
+
+Run from python/src (like the other scripts) with: PYTHONPATH=. python ../benchmark/bench_parsing.py
+"""
+
+import timeit
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.dataloader.parsing import parse_durations
+
+ROOT_DATA_DIR = "../../data"
+SCALES = (1, 10, 100)
+NUM_REPEATS = 5
+
+
+def legacy_parse_durations(values: pd.Series) -> pd.Series:
+    """Parse durations through timedeltas and a per-row apply (the original DataLoader behaviour)."""
+    durations = pd.to_timedelta(values)
+    durations = durations.apply(lambda x: np.nan if pd.isna(x) else x.total_seconds())
+    return durations.astype("Int64")
+
+
+def time_it(f: Callable[[pd.Series], pd.Series], values: pd.Series) -> float:
+    """Return the best time (in ms) of several runs of f on the given values."""
+    return 1000 * min(timeit.repeat(lambda: f(values), number=1, repeat=NUM_REPEATS))
+
+
+def bench(
+    name: str,
+    values: pd.Series,
+    legacy: Callable[[pd.Series], pd.Series],
+    vectorized: Callable[[pd.Series], pd.Series],
+) -> None:
+    """Time both parsers on the column at each scale, checking that they agree."""
+    print(f"{name} ({len(values):,} rows at 1x)")
+    print(f"  {'scale':>5}  {'rows':>9}  {'legacy (ms)':>11}  {'vectorized (ms)':>15}  {'speedup':>7}")
+    for scale in SCALES:
+        scaled = pd.concat([values] * scale, ignore_index=True)
+        pd.testing.assert_series_equal(legacy(scaled), vectorized(scaled), check_names=False)
+        legacy_ms, vectorized_ms = time_it(legacy, scaled), time_it(vectorized, scaled)
+        print(
+            f"  {scale:>4}x  {len(scaled):>9,}  {legacy_ms:>11.2f}  {vectorized_ms:>15.2f}  "
+            f"{legacy_ms / vectorized_ms:>6.1f}x",
+        )
+
+
+def main() -> None:
+    """Benchmark the duration parser using the real CSVs scaled up by each factor in SCALES."""
+    durations = pd.concat(
+        [
+            pd.read_csv(f"{ROOT_DATA_DIR}/{fname}")[CName.DATA_DURATION]
+            for fname in ["walks.csv", "rate_of_climb.csv", "weight_training_workouts.csv", "dashes.csv"]
+        ],
+        ignore_index=True,
+    )
+    bench("cardio/weight training durations", durations, legacy_parse_durations, parse_durations)
+
+
+if __name__ == "__main__":
+    main()
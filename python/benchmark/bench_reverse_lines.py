@@ -0,0 +1,95 @@
+"""
+Benchmarks the block-based invert_csv_rows against the byte-at-a-time implementation that it replaced.
+
+Run from python/src (like the other scripts) with: PYTHONPATH=. python ../benchmark/bench_reverse_lines.py
+"""
+
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from exercise_log.utils import CR, LF, NEWLINE, UTF8, invert_csv_rows
+
+ROOT_DATA_DIR = "../../data"
+TARGET_SIZES_MB = (1, 4)
+NUM_REPEATS = 3
+
+
+def legacy_invert_csv_rows(fname: str, *, has_header_row: bool = False, output_fname: str) -> None:
+    """Walk the file backwards one byte at a time (the original invert_csv_rows behaviour)."""
+    output_strategy = "wb"
+    if has_header_row:
+        output_strategy = "ab"
+        with open(fname, encoding=UTF8) as f_in, open(output_fname, "w", encoding=UTF8) as f_out:
+            header = f_in.readline()
+            f_out.write(header)
+            f_out.write(NEWLINE)
+
+    line_breaks = {CR, LF}
+    with open(fname, "rb") as f_in, open(output_fname, output_strategy) as f_out:
+        f_in.seek(0, os.SEEK_END)
+        line = b""
+        while f_in.tell() > 1:
+            f_in.seek(-2, os.SEEK_CUR)
+            byte = f_in.read(1)
+            line = byte + line
+            if byte in line_breaks:
+                f_out.write(line[1:])
+                line_break = line[0:1]
+                line = b""
+                if byte == LF:
+                    f_in.seek(-2, 1)
+                    byte = f_in.read(1)
+                    if byte == CR:
+                        line_break = byte + line_break
+                    else:
+                        f_in.seek(1, 1)
+                f_out.write(line_break)
+        if not has_header_row:
+            f_out.write(line)
+
+
+def write_scaled_csv(fname: str, target_mb: int) -> bytes:
+    """Write the real weight training sets CSV with its rows repeated until it's about the target size."""
+    header, rows = Path(f"{ROOT_DATA_DIR}/weight_training_sets.csv").read_bytes().split(LF, 1)
+    num_copies = max(1, target_mb * 2**20 // len(rows))
+    Path(fname).write_bytes(header + LF + rows * num_copies)
+    return header + LF
+
+
+def time_it(invert: Callable[..., None], fname: str, output_fname: str, num_repeats: int) -> float:
+    """Return the best time (in ms) of several runs of the inversion."""
+    times = []
+    for _ in range(num_repeats):
+        start = time.perf_counter()
+        invert(fname, has_header_row=True, output_fname=output_fname)
+        times.append(time.perf_counter() - start)
+    return 1000 * min(times)
+
+
+def main() -> None:
+    """Time both implementations on the real CSV scaled up to each size in TARGET_SIZES_MB, checking that they agree."""
+    print(f"  {'size (MB)':>9}  {'legacy (ms)':>11}  {'blocks (ms)':>11}  {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = f"{tmp_dir}/sets.csv"
+        legacy_fname, blocks_fname = f"{tmp_dir}/legacy.csv", f"{tmp_dir}/blocks.csv"
+        for target_mb in TARGET_SIZES_MB:
+            header = write_scaled_csv(fname, target_mb)
+            # The legacy version is far too slow to repeat
+            legacy_ms = time_it(legacy_invert_csv_rows, fname, legacy_fname, num_repeats=1)
+            blocks_ms = time_it(invert_csv_rows, fname, blocks_fname, NUM_REPEATS)
+
+            # The legacy version also wrote a blank line after the header
+            legacy, blocks = Path(legacy_fname).read_bytes(), Path(blocks_fname).read_bytes()
+            if legacy != header + LF + blocks[len(header) :]:
+                msg = "The inverted CSVs don't match"
+                raise AssertionError(msg)
+
+            size_mb = Path(fname).stat().st_size / 2**20
+            print(f"  {size_mb:>9.1f}  {legacy_ms:>11.0f}  {blocks_ms:>11.1f}  {legacy_ms / blocks_ms:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
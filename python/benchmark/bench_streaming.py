@@ -0,0 +1,62 @@
+"""
+Compares the peak memory of streaming the weight training sets into daily totals against loading them into memory first.
+
+Run from python/src (like the other scripts) with: PYTHONPATH=. python ../benchmark/bench_streaming.py
+"""
+
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import pandas as pd
+
+from exercise_log.dataloader import DataLoader
+from exercise_log.dataloader.streaming import SET_COLUMNS, aggregate_daily_sets, stream_daily_sets
+from exercise_log.utils import LF
+
+ROOT_DATA_DIR = "../../data"
+TARGET_SIZES_MB = (4, 16, 64)
+
+
+def write_scaled_csv(data_dir: str, target_mb: int) -> None:
+    """Write the real weight training sets CSV with its rows repeated until it's about the target size."""
+    header, rows = Path(f"{ROOT_DATA_DIR}/weight_training_sets.csv").read_bytes().split(LF, 1)
+    num_copies = max(1, target_mb * 2**20 // len(rows))
+    Path(f"{data_dir}/weight_training_sets.csv").write_bytes(header + LF + rows * num_copies)
+
+
+def load_daily_sets(data_dir: str) -> pd.DataFrame:
+    """Load the whole CSV into memory then aggregate it, the way that it would be done without streaming."""
+    sets = DataLoader.load_weight_training_sets(data_dir, columns=SET_COLUMNS)
+    return aggregate_daily_sets([sets])
+
+
+def measure(aggregate: Callable[[str], pd.DataFrame], data_dir: str) -> tuple[pd.DataFrame, float, float]:
+    """Return the daily totals along with the time taken (in ms) and the peak memory allocated (in MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    daily_sets = aggregate(data_dir)
+    elapsed_ms = 1000 * (time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return daily_sets, elapsed_ms, peak / 2**20
+
+
+def main() -> None:
+    """Aggregate the real CSV scaled up to each size in TARGET_SIZES_MB both ways, checking that they agree."""
+    print(f"  {'size (MB)':>9}  {'in-memory (ms, MB)':>18}  {'streamed (ms, MB)':>17}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for target_mb in TARGET_SIZES_MB:
+            write_scaled_csv(data_dir, target_mb)
+            expected, load_ms, load_mb = measure(load_daily_sets, data_dir)
+            streamed, stream_ms, stream_mb = measure(stream_daily_sets, data_dir)
+            pd.testing.assert_frame_equal(expected, streamed, check_exact=False)
+
+            size_mb = Path(f"{data_dir}/weight_training_sets.csv").stat().st_size / 2**20
+            print(f"  {size_mb:>9.1f}  {load_ms:>8.0f}, {load_mb:>7.1f}  {stream_ms:>7.0f}, {stream_mb:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Moves the rows that were logged to the journal into the newest-first CSV datasets."""
+
+from exercise_log.dataloader import DataLoader
+
+ROOT_DATA_DIR = "../../data"
+
+
+def main() -> None:
+    """Compact the journal of every dataset and report how many rows were moved into each one."""
+    compacted = DataLoader.compact_journal(ROOT_DATA_DIR)
+    if not compacted:
+        print("The journal is empty.")
+    for fname, num_rows in compacted.items():
+        print(f"  {fname}: {num_rows} rows")
+
+
+if __name__ == "__main__":
+    main()
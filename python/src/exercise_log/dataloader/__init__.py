@@ -1,175 +1,547 @@
 """Contains logic relating to the loading and transformation of ExerciseLog data."""
 
 import csv
+import io
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Optional
 
 import numpy as np
 import pandas as pd
 
 from exercise_log.constants import ROOT_ONTOLOGY_DIR
-from exercise_log.strength import Exercise
-from exercise_log.utils import StrEnum, join_with_comma
+from exercise_log.dataloader.cache import DataCache
+from exercise_log.dataloader.categorical import to_categorical, union_categories
+from exercise_log.dataloader.database import SQLiteStore
+from exercise_log.dataloader.journal import Journal, get_journal_fname, read_journal
+from exercise_log.dataloader.parsing import DATE_FORMAT, LF_BYTE, get_unquoted, parse_durations
+from exercise_log.dataloader.query import RowFilter, RowIndex
+from exercise_log.dataloader.schema import Schema
+from exercise_log.dataloader.snapshot import read_snapshot, write_snapshot
+from exercise_log.strength import CardioType, Exercise, SetRating
+from exercise_log.utils import UTF8, StrEnum
 
 # Dynamically create the ColumnNames enum using a shared definition
 ColumnName = StrEnum.create_from_json(f"{ROOT_ONTOLOGY_DIR}/enum/dataloader/columns.json", __name__)
+SCHEMA = Schema.create_from_json(f"{ROOT_ONTOLOGY_DIR}/enum/dataloader/schema.json", ColumnName)
 
 
 # This is just for convenience since ColumnName is a long string
 CName = ColumnName
 LONG = "Int64"
+STR = "str"
+
+# The repetitive text columns that can be stored as Categoricals, along with the enum the categories come from (if any)
+CATEGORICAL_COLUMNS = {
+    CName.EXERCISE: Exercise,
+    CName.RATING: SetRating,
+    CName.WORKOUT_TYPE: CardioType,
+    CName.LOCATION: None,
+}
+
+# Bytes that are structurally significant when validating a raw CSV
+COMMA_BYTE = ord(",")
+CR_BYTE = ord("\r")
+
+
+class Dataset(StrEnum):
+    """The base datasets, each of which is loaded from its own CSV."""
+
+    HEALTH_METRICS = "health_metrics"
+    TRAVEL_DAYS = "travel_days"
+    WALK_WORKOUTS = "walk_workouts"
+    RUN_WORKOUTS = "run_workouts"
+    BIKE_WORKOUTS = "bike_workouts"
+    ROW_WORKOUTS = "row_workouts"
+    STAIR_WORKOUTS = "stair_workouts"
+    WEIGHT_TRAINING_WORKOUTS = "weight_training_workouts"
+    WEIGHT_TRAINING_SETS = "weight_training_sets"
+
+
+# The names that the aggregate datasets are stored under in a DataBox's snapshot
+CARDIO_WORKOUTS = "cardio_workouts"
+ALL_WORKOUTS = "all_workouts"
 
 
 class DataBox:
-    """A manager for gathering and logically grouping relevant data being loaded."""
+    """
+    A manager for gathering and logically grouping relevant data being loaded.
+
+    It's safe to share a DataBox between threads, each dataset is guarded by its own lock so it's only ever loaded once.
+    """
+
+    def __init__(
+        self,
+        root_data_dir: str,
+        cache_dir: Optional[str] = None,
+        columns: Optional[dict[Dataset, Iterable[str]]] = None,
+        *,
+        categorical: bool = False,
+        db_path: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize this DataBox. The contained data is all computed lazily unless it's preloaded.
 
-    def __init__(self, root_data_dir: str) -> None:
-        """Initialize this DataBox. The contained data is all computed lazily."""
+        Args:
+            root_data_dir (str): The directory containing the CSV datasets
+            cache_dir (Optional[str]): If given, cleaned datasets are cached here and reused until their CSV changes
+            columns (Optional[dict[Dataset, Iterable[str]]]): If given, only these columns are loaded for each of the
+                given datasets (the others are loaded in full)
+            categorical (bool): Whether to store the repetitive text columns (see CATEGORICAL_COLUMNS) as Categoricals
+                so that filtering and grouping on them operates on small integer codes
+            db_path (Optional[str]): If given, cleaned datasets are stored in this SQLite database instead of the
+                cache directory. Queries for a subset of a dataset's rows are then answered by the database.
+        Raises:
+            ValueError: If both a cache directory and a database are given
+        """
+        if cache_dir and db_path:
+            msg = "Only one of cache_dir and db_path can be given"
+            raise ValueError(msg)
         self.root_data_dir = root_data_dir
+        self._cache = SQLiteStore(db_path) if db_path else DataCache(cache_dir) if cache_dir else None
+        self._columns = columns or {}
+        self.categorical = categorical
 
-        # Base datasets
-        self._health_metrics = None
-        self._travel_days = None
-        self._walk_workouts = None
-        self._run_workouts = None
-        self._bike_workouts = None
-        self._row_workouts = None
-        self._stair_workouts = None
-        self._weight_training_workouts = None
-        self._weight_training_sets = None
+        # Base datasets, along with how long (in seconds) each took to load
+        self._datasets: dict[Dataset, pd.DataFrame] = {}
+        self._locks = {dataset: threading.Lock() for dataset in Dataset}
+        self.load_timings: dict[Dataset, float] = {}
+        self._row_indexes: dict[Dataset, RowIndex] = {}
 
         # Aggregate datasets
         self._cardio_workouts = None
         self._all_workouts = None
+        self._cardio_workouts_lock = threading.Lock()
+        self._all_workouts_lock = threading.Lock()
+
+    def _get_dataset(self, dataset: Dataset) -> pd.DataFrame:
+        """Access the given base dataset, loading it if it hasn't been yet."""
+        df = self._datasets.get(dataset)
+        if df is not None:
+            return df
+
+        with self._locks[dataset]:
+            # Another thread may have finished loading it while this one waited for the lock
+            if dataset not in self._datasets:
+                start = time.perf_counter()
+                df = DATASET_LOADERS[dataset](self.root_data_dir, self._cache, self._columns.get(dataset))
+                self._datasets[dataset] = DataLoader.to_categoricals(df) if self.categorical else df
+                self.load_timings[dataset] = time.perf_counter() - start
+            return self._datasets[dataset]
+
+    def preload(
+        self,
+        datasets: Optional[Iterable[Dataset]] = None,
+        max_workers: Optional[int] = None,
+    ) -> dict[Dataset, float]:
+        """
+        Load the given base datasets concurrently. The getters then return the preloaded datasets.
+
+        Each dataset comes from an independent CSV and most of the parsing happens in pandas/NumPy code that releases
+        the GIL so a thread pool is enough to overlap them. Datasets that were already loaded are skipped.
+
+        Args:
+            datasets (Optional[Iterable[Dataset]]): The datasets to load, defaults to all of them
+            max_workers (Optional[int]): The maximum number of threads to use, defaults to one per dataset
+        Returns:
+            The time (in seconds) it took to load each of the requested datasets
+        """
+        datasets = list(Dataset if datasets is None else datasets)
+        with ThreadPoolExecutor(max_workers=max_workers or len(datasets) or None) as executor:
+            # Consuming the results re-raises the first error encountered (if any)
+            list(executor.map(self._get_dataset, datasets))
+        return {dataset: self.load_timings[dataset] for dataset in datasets if dataset in self.load_timings}
+
+    def query(
+        self,
+        dataset: Dataset,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        exercise: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Get the rows of a base dataset within an (inclusive) date range and/or for a single exercise.
+
+        If the dataset is already loaded, or the DataBox has no database, the loaded dataset is searched using its
+        RowIndex. That takes O(log n + k) time and a date range without an exercise is a slice of the dataset rather
+        than a copy. Otherwise the query is pushed down to the database so only the matching rows are read, and the
+        dataset isn't kept around.
+
+        Args:
+            dataset (Dataset): The dataset to query
+            start (Optional[date]): If given, rows before this date are excluded
+            end (Optional[date]): If given, rows after this date are excluded
+            exercise (Optional[str]): If given, only the rows for this exercise are included
+        Returns:
+            The matching rows, in the same order and with the same columns as the full dataset
+        Raises:
+            ValueError: If an exercise is given but the dataset has no exercise column
+        """
+        row_filter = RowFilter(start, end, exercise)
+        if dataset not in self._datasets and self._cache is not None and self._cache.SUPPORTS_PUSH_DOWN:
+            df = DATASET_LOADERS[dataset](self.root_data_dir, self._cache, self._columns.get(dataset), row_filter)
+            return DataLoader.to_categoricals(df) if self.categorical else df
+
+        row_index = self._row_indexes.get(dataset)
+        if row_index is None:
+            # Building one is cheap (the per-exercise positions are gathered lazily) so a race here is harmless
+            row_index = self._row_indexes.setdefault(dataset, RowIndex(self._get_dataset(dataset)))
+        return row_index.select(row_filter)
+
+    def snapshot(self, path: str) -> None:
+        """
+        Write every dataset that has been loaded so far (base and aggregate) into a single snapshot file.
+
+        Call preload(), get_cardio_workouts() and get_all_workouts() first to include everything. The snapshot is a
+        copy of the datasets as they are now, it isn't invalidated if the CSVs change afterwards.
+
+        Args:
+            path (str): Where to write the snapshot, it's replaced if it already exists
+        """
+        frames = {str(dataset): df for dataset, df in self._datasets.items()}
+        aggregates = {CARDIO_WORKOUTS: self._cardio_workouts, ALL_WORKOUTS: self._all_workouts}
+        frames.update({name: df for name, df in aggregates.items() if df is not None})
+        columns = {str(dataset): list(dataset_columns) for dataset, dataset_columns in self._columns.items()}
+        write_snapshot(
+            path,
+            frames,
+            {"root_data_dir": self.root_data_dir, "columns": columns, "categorical": self.categorical},
+        )
+
+    @classmethod
+    def restore(cls, path: str) -> "DataBox":
+        """
+        Build a DataBox from a snapshot (see snapshot()) without loading or merging anything.
+
+        The datasets' numeric columns are memory-mapped from the snapshot rather than copied in. Any dataset that wasn't
+        in the snapshot is loaded from the CSVs (uncached) as usual once it's accessed.
+
+        Args:
+            path (str): The snapshot to restore
+        Returns:
+            A DataBox holding the same datasets as the one that the snapshot was taken of
+        Raises:
+            ValueError: If the file isn't a snapshot or was written by an incompatible version
+        """
+        frames, metadata = read_snapshot(path)
+        columns = {Dataset(dataset): dataset_columns for dataset, dataset_columns in metadata["columns"].items()}
+        data_box = cls(metadata["root_data_dir"], columns=columns, categorical=metadata["categorical"])
+        data_box._cardio_workouts = frames.pop(CARDIO_WORKOUTS, None)
+        data_box._all_workouts = frames.pop(ALL_WORKOUTS, None)
+        data_box._datasets.update({Dataset(dataset): df for dataset, df in frames.items()})
+        return data_box
 
     def get_health_metrics(self) -> pd.DataFrame:
         """Access the health metrics dataset and loads it if it hasn't been yet."""
-        if self._health_metrics is None:
-            self._health_metrics = DataLoader.load_health_metrics(self.root_data_dir)
-        return self._health_metrics
+        return self._get_dataset(Dataset.HEALTH_METRICS)
 
     def get_travel_days(self) -> pd.DataFrame:
         """Access the travel days dataset, loading it if necessary."""
-        if self._travel_days is None:
-            self._travel_days = DataLoader.load_travel_days(self.root_data_dir)
-        return self._travel_days
+        return self._get_dataset(Dataset.TRAVEL_DAYS)
 
     def get_walk_workouts(self) -> pd.DataFrame:
         """Access the walk workouts dataset, loading it if necessary."""
-        if self._walk_workouts is None:
-            self._walk_workouts = DataLoader.load_walk_workouts(self.root_data_dir)
-        return self._walk_workouts
+        return self._get_dataset(Dataset.WALK_WORKOUTS)
 
     def get_run_workouts(self) -> pd.DataFrame:
         """Access the run workouts dataset, loading it if necessary."""
-        if self._run_workouts is None:
-            self._run_workouts = DataLoader.load_run_workouts(self.root_data_dir)
-        return self._run_workouts
+        return self._get_dataset(Dataset.RUN_WORKOUTS)
 
     def get_bike_workouts(self) -> pd.DataFrame:
         """Access the bike workouts dataset, loading it if necessary."""
-        if self._bike_workouts is None:
-            self._bike_workouts = DataLoader.load_bike_workouts(self.root_data_dir)
-        return self._bike_workouts
+        return self._get_dataset(Dataset.BIKE_WORKOUTS)
 
     def get_row_workouts(self) -> pd.DataFrame:
         """Access the row workouts dataset, loading it if necessary."""
-        if self._row_workouts is None:
-            self._row_workouts = DataLoader.load_row_workouts(self.root_data_dir)
-        return self._row_workouts
+        return self._get_dataset(Dataset.ROW_WORKOUTS)
 
     def get_stair_workouts(self) -> pd.DataFrame:
         """Access the stair workouts dataset, loading it if necessary."""
-        if self._stair_workouts is None:
-            self._stair_workouts = DataLoader.load_stair_workouts(self.root_data_dir)
-        return self._stair_workouts
+        return self._get_dataset(Dataset.STAIR_WORKOUTS)
 
     def get_weight_training_workouts(self) -> pd.DataFrame:
         """Access the weight training workouts dataset, loading it if necessary."""
-        if self._weight_training_workouts is None:
-            self._weight_training_workouts = DataLoader.load_weight_training_workouts(self.root_data_dir)
-        return self._weight_training_workouts
+        return self._get_dataset(Dataset.WEIGHT_TRAINING_WORKOUTS)
 
     def get_weight_training_sets(self) -> pd.DataFrame:
         """Access the weight training sets dataset, loading it if necessary."""
-        if self._weight_training_sets is None:
-            self._weight_training_sets = DataLoader.load_weight_training_sets(self.root_data_dir)
-        return self._weight_training_sets
+        return self._get_dataset(Dataset.WEIGHT_TRAINING_SETS)
 
     def get_cardio_workouts(self) -> pd.DataFrame:
         """Access the cardio workouts dataset (an aggregate of other datasets), loading them if necessary."""
-        if self._cardio_workouts is None:
-            workouts = [
-                self.get_walk_workouts(),
-                self.get_run_workouts(),
-                self.get_bike_workouts(),
-                self.get_row_workouts(),
-                self.get_stair_workouts(),
-            ]
-            self._cardio_workouts = DataLoader.merge_on_common_columns(workouts)
+        with self._cardio_workouts_lock:
+            if self._cardio_workouts is None:
+                workouts = [
+                    self.get_walk_workouts(),
+                    self.get_run_workouts(),
+                    self.get_bike_workouts(),
+                    self.get_row_workouts(),
+                    self.get_stair_workouts(),
+                ]
+                self._cardio_workouts = DataLoader.merge_on_common_columns(workouts)
         return self._cardio_workouts
 
     def get_all_workouts(self) -> pd.DataFrame:
         """Access the all workouts dataset (an aggregate of other datasets), loading them if necessary."""
-        if self._all_workouts is None:
-            self._all_workouts = DataLoader.load_all_workouts(
-                self.get_cardio_workouts(),
-                self.get_weight_training_workouts(),
-                self.get_travel_days(),
-            )
+        with self._all_workouts_lock:
+            if self._all_workouts is None:
+                self._all_workouts = DataLoader.load_all_workouts(
+                    self.get_cardio_workouts(),
+                    self.get_weight_training_workouts(),
+                    self.get_travel_days(),
+                )
         return self._all_workouts
 
 
 class DataLoader:
-    """Responsible for loading small datasets that fit in memory."""
+    """Responsible for loading small datasets that fit in memory, see dataloader.streaming for ones that might not."""
 
     @staticmethod
-    def _load_and_clean_data(fname: str) -> pd.DataFrame:
-        """Load the CSV and cleans up the data (convert date/times to proper types, NA -> "", etc)."""
-        df = pd.read_csv(fname)
+    def _load_and_clean_data(
+        fname: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
+        """
+        Load the cleaned CSV, using the cache (if one is given) to skip parsing when the CSV hasn't changed.
 
-        # Clean the data
-        df[CName.DATE] = pd.to_datetime(df[CName.DATE], format="%d-%b-%Y")
-        df = df.sort_values(CName.DATE, ignore_index=True)
-        if CName.DATA_DURATION in df:
-            df[CName.DATA_DURATION] = pd.to_timedelta(df[CName.DATA_DURATION])
-            df[CName.DATA_DURATION] = df[CName.DATA_DURATION].apply(
-                lambda x: np.nan if pd.isna(x) else x.total_seconds(),
+        When rows were only added to the top of the CSV since it was cached, only those rows are parsed. Any rows in the
+        CSV's journal (see exercise_log.dataloader.journal) are parsed and merged in too, they're never cached.
+
+        Args:
+            fname (str): The path to the CSV
+            cache (Optional[DataCache]): The cache of cleaned datasets, the CSV is always parsed if it isn't given
+            columns (Optional[Iterable[str]]): If given, only these (cleaned) columns are loaded. The date is always
+                loaded since the data is ordered by it.
+            row_filter (Optional[RowFilter]): If given, only the matching rows are loaded. A cache that supports it
+                (i.e. an SQLiteStore) only reads those rows, otherwise the dataset is filtered once it's loaded.
+        Raises:
+            ValueError: If the CSV is invalid or doesn't have all of the requested columns
+        """
+        columns = None if columns is None else {CName.DATE.value, *columns}
+        if cache is None:
+            df = DataLoader._parse_and_clean_data(fname, columns)
+            df = df if row_filter is None else row_filter.apply(df)
+        else:
+            df = cache.get_or_load(
+                fname,
+                DataLoader.parse_and_clean_bytes,
+                DataLoader._merge_new_rows,
+                columns,
+                row_filter,
             )
-            df[CName.DATA_DURATION] = df[CName.DATA_DURATION].astype(LONG)
-            df = df.rename(columns={CName.DATA_DURATION: CName.DURATION})
-        if CName.NOTES in df:
-            df[CName.NOTES] = df[CName.NOTES].fillna("")
+            if CName.EXERCISE in df and not DataLoader._are_exercises_valid(df):
+                # The ontology changed since this data was cached, re-parse so the error points at the right CSV row
+                DataLoader._parse_and_clean_data(fname)
+
+        journal = read_journal(fname)
+        if journal is not None:
+            journal_rows = DataLoader.parse_and_clean_bytes(journal, get_journal_fname(fname), columns)
+            if row_filter is not None:
+                journal_rows = row_filter.apply(journal_rows)
+            df = DataLoader._append_journal_rows(df, journal_rows)
+
+        missing_columns = sorted(set(columns or []).difference(df.columns))
+        if missing_columns:
+            msg = f"{fname} is missing the requested columns: {missing_columns}"
+            raise ValueError(msg)
+        return df
+
+    @staticmethod
+    def _parse_and_clean_data(fname: str, columns: Optional[set[str]] = None) -> pd.DataFrame:
+        """Read the CSV from disk exactly once then parse and clean it."""
+        with open(fname, "rb") as f:
+            raw = f.read()
+        return DataLoader.parse_and_clean_bytes(raw, fname, columns)
+
+    @staticmethod
+    def parse_and_clean_bytes(
+        raw: bytes,
+        fname: str,
+        columns: Optional[set[str]] = None,
+        *,
+        row_offset: int = 0,
+    ) -> pd.DataFrame:
+        """
+        Parse and validate the raw CSV then clean up the data (convert date/times to proper types, NA -> "", etc).
+
+        The CSV's structure is validated on the same in-memory bytes that pandas parses. Each column is read straight
+        into the dtype declared by the schema (if the dataset is in it) so there's no inference or casting afterwards.
 
-        # Validate the data
-        DataLoader._validate_csv(fname)
+        Args:
+            raw (bytes): The raw contents of the CSV
+            fname (str): The path to the CSV, its name (without the extension) is the dataset's name in the schema
+            columns (Optional[set[str]]): If given, only these (cleaned) columns are read
+            row_offset (int): The number of the CSV's rows that precede these ones when the raw CSV is only one chunk
+                of a larger CSV (its header followed by some of its rows), so that any errors point at the right row
+        Raises:
+            ValueError: If the CSV is empty, ragged, missing required values or contains an unexpected exercise
+        """
+        DataLoader._validate_csv(raw, fname, row_offset=row_offset)
+        dataset = Path(fname).stem
+        usecols = None
+        if columns is not None:
+            usecols = [CName.DATA_DURATION.value if column == CName.DURATION else column for column in columns]
+        df = pd.read_csv(io.BytesIO(raw), dtype=SCHEMA.get_reader_dtypes(dataset, usecols), usecols=usecols)
+        if row_offset:
+            df.index += row_offset
+        DataLoader._validate_non_nullable(df, dataset, fname)
         if CName.EXERCISE in df:
+            # Validate before sorting so that the row numbers in any error match the CSV
             DataLoader._validate_exercises(df, fname)
 
+        # Clean the data, the sort is stable so that rows sharing a date keep their order from the CSV
+        df[CName.DATE] = pd.to_datetime(df[CName.DATE], format=DATE_FORMAT)
+        df = df.sort_values(CName.DATE, kind="stable", ignore_index=True)
+        if CName.DATA_DURATION in df:
+            df[CName.DATA_DURATION] = parse_durations(df[CName.DATA_DURATION])
+            df = df.rename(columns={CName.DATA_DURATION: CName.DURATION})
+        if CName.NOTES in df:
+            df[CName.NOTES] = df[CName.NOTES].fillna("")
         return df
 
     @staticmethod
-    def _validate_csv(fname: str) -> None:
-        with open(fname, encoding="utf-8") as f:
-            reader = csv.reader(f)
+    def _validate_non_nullable(df: pd.DataFrame, dataset: str, fname: str) -> None:
+        """
+        Check that none of the columns the schema declares as non-nullable are missing values.
+
+        Raises:
+            ValueError: If a non-nullable column is missing a value
+        """
+        for column in SCHEMA.get_columns(dataset):
+            if column.nullable or column.name not in df:
+                continue
+            is_na = df[column.name].isna().to_numpy()
+            if is_na.any():
+                msg = f'"{column.name}" is missing at row {df.index[is_na.argmax()] + 2} in {fname} but is required'
+                raise ValueError(msg)
+
+    @staticmethod
+    def _merge_new_rows(cached: pd.DataFrame, new_rows: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Merge rows that were added to the top of a CSV into the cleaned DataFrame that was cached for it.
 
-            try:
-                headers = next(reader)
+        The result is identical to parsing the whole CSV again: the new rows come first in the CSV, so after a stable
+        sort they still precede any cached rows that share their date.
 
-                # Ensure the data is not ragged
-                for row in reader:
-                    if len(row) != len(headers):
-                        msg = f'File {fname} is ragged at row {reader.line_num}: "{row}"'
-                        raise ValueError(msg)
-            except StopIteration as e:
-                msg = f"CSV at {fname} was empty."
-                raise ValueError(msg) from e
+        Args:
+            cached (pd.DataFrame): The cleaned DataFrame of the rows that were already in the CSV
+            new_rows (pd.DataFrame): The cleaned DataFrame of only the new rows
+        Returns:
+            The merged DataFrame or None if the new rows' types would change the inferred types of the whole dataset
+            (e.g. the first value in a column that was empty until now), in which case the CSV must be fully re-parsed
+        """
+        aligned = DataLoader._align_dtypes(cached, new_rows)
+        if aligned is None:
+            return None
+        cached, new_rows = aligned
+        merged = pd.concat([new_rows, cached], ignore_index=True)
+        return merged.sort_values(CName.DATE, kind="stable", ignore_index=True)
 
     @staticmethod
-    def _validate_exercises(df: pd.DataFrame, fname: str) -> None:
+    def _append_journal_rows(df: pd.DataFrame, journal_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge the cleaned rows of a CSV's journal into the cleaned DataFrame loaded from the CSV.
+
+        The journaled rows were logged after the CSV's rows so, like rows added to the top of the CSV, they come before
+        any that share their date with the last one logged first. Compacting the journal puts them in the same order.
+        """
+        if journal_rows.empty:
+            return df
+        aligned = DataLoader._align_dtypes(df, journal_rows)
+        if aligned is not None:
+            df, journal_rows = aligned
+        merged = pd.concat([journal_rows.iloc[::-1], df], ignore_index=True)
+        return merged.sort_values(CName.DATE, kind="stable", ignore_index=True)
+
+    @staticmethod
+    def _align_dtypes(df: pd.DataFrame, new_rows: pd.DataFrame) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Give the new rows the same dtypes as the DataFrame that they're being merged into.
+
+        Returns:
+            Both DataFrames with their dtypes aligned or None if the new rows' types would change the inferred types of
+            the whole dataset (e.g. the first value in a column that was empty until now)
+        """
+        if not df.columns.equals(new_rows.columns):
+            return None
+
+        cached, new_rows = df.copy(deep=False), new_rows.copy(deep=False)
+        for column in cached.columns:
+            cached_dtype, new_dtype = cached[column].dtype, new_rows[column].dtype
+            if cached_dtype == new_dtype:
+                continue
+            if STR in (cached_dtype, new_dtype) and DataLoader._is_text(cached[column], new_rows[column]):
+                # A text column that's entirely empty on one side was filled with "" as objects rather than as strs
+                cached[column], new_rows[column] = cached[column].astype(STR), new_rows[column].astype(STR)
+            elif new_rows[column].isna().all() and cached_dtype.kind not in "biu":
+                # pandas infers float for an all-empty column, it takes on the existing type once it's combined
+                new_rows[column] = new_rows[column].astype(cached_dtype)
+            elif cached_dtype.kind not in "iuf" or new_dtype.kind not in "iuf":
+                return None
+        return cached, new_rows
+
+    @staticmethod
+    def _is_text(*columns: pd.Series) -> bool:
+        return all(pd.api.types.infer_dtype(column, skipna=True) in {"string", "empty"} for column in columns)
+
+    @staticmethod
+    def _validate_csv(raw: bytes, fname: str, *, row_offset: int = 0) -> None:
+        """
+        Check that the raw CSV isn't empty and that every row has as many fields as the header.
+
+        Fields are counted with vectorized byte comparisons rather than by tokenizing in Python. A delimiter (comma or
+        line feed) is only structural when it's outside of quoted fields (see parsing.get_unquoted()).
+
+        Raises:
+            ValueError: If the CSV is empty or ragged
+        """
+        if not raw:
+            msg = f"CSV at {fname} was empty."
+            raise ValueError(msg)
+
+        data = np.frombuffer(raw, dtype=np.uint8)
+        unquoted = get_unquoted(data)
+        is_line_feed, is_comma = (data == LF_BYTE) & unquoted, (data == COMMA_BYTE) & unquoted
+        line_feeds, commas = np.flatnonzero(is_line_feed), np.flatnonzero(is_comma)
+
+        starts = np.concatenate([[0], line_feeds + 1])
+        ends = np.concatenate([line_feeds, [len(data)]])
+        if starts[-1] == ends[-1]:
+            # The file ends with a line break so the final "row" isn't actually one
+            starts, ends = starts[:-1], ends[:-1]
+
+        # Count the fields in each row, blank rows (incl. a lone CR) have no fields at all
+        field_counts = np.searchsorted(commas, ends) - np.searchsorted(commas, starts) + 1
+        lengths = ends - starts
+        is_blank = (lengths == 0) | ((lengths == 1) & (data[np.maximum(ends - 1, 0)] == CR_BYTE))
+        field_counts[is_blank] = 0
+
+        ragged_rows = np.flatnonzero(field_counts[1:] != field_counts[0])
+        if len(ragged_rows):
+            row_idx = ragged_rows[0] + 1
+            start, end = starts[row_idx], ends[row_idx]
+            line_num = np.count_nonzero(data[:end] == LF_BYTE) + 1 + row_offset
+            row = next(csv.reader(io.StringIO(raw[start:end].decode(UTF8))), [])
+            msg = f'File {fname} is ragged at row {line_num}: "{row}"'
+            raise ValueError(msg)
+
+    @staticmethod
+    def _are_exercises_valid(df: pd.DataFrame) -> bool:
         # Disabling linting, this is needed bc Pandas is fussy; "some_exercise in Exercise" ought to work but doesn't
-        exercise_map = Exercise._value2member_map_  # noqa: SLF001
-        if df[CName.EXERCISE].isin(exercise_map).all():
+        return df[CName.EXERCISE].isin(Exercise._value2member_map_).all()  # noqa: SLF001
+
+    @staticmethod
+    def _validate_exercises(df: pd.DataFrame, fname: str) -> None:
+        if DataLoader._are_exercises_valid(df):
             return
 
+        exercise_map = Exercise._value2member_map_  # noqa: SLF001
         first_invalid_idx = df[~df[CName.EXERCISE].isin(exercise_map)].index.tolist()[0]
         first_invalid = df[CName.EXERCISE][first_invalid_idx]
 
@@ -179,17 +551,6 @@ class DataLoader:
             raise ValueError(base_msg + f', did you mean "{possible_valid}"')
         raise ValueError(base_msg)
 
-    @staticmethod
-    def _det_workout_type(joined_workout_types: str) -> str:
-        """Determine the workout type given all of the comma-joined workout types for a given day."""
-        result = ""
-        for w_type in joined_workout_types.split(","):
-            if not result:
-                result = w_type
-            if result and w_type != result:
-                return "Mixed"
-        return result
-
     @staticmethod
     def _compute_total_durations(
         all_workouts: pd.DataFrame,
@@ -219,23 +580,25 @@ class DataLoader:
         weight_training_workouts: pd.DataFrame,
         travel_days: pd.DataFrame,
     ) -> pd.DataFrame:
-        """Compute the daily workout type for each day."""
-        workout_types = [
-            weight_training_workouts.groupby(CName.DATE)[CName.WORKOUT_TYPE].agg(join_with_comma),
-            cardio_workouts.groupby(CName.DATE)[CName.WORKOUT_TYPE].agg(join_with_comma),
-            travel_days.groupby(CName.DATE)[CName.WORKOUT_TYPE].agg(join_with_comma),
-        ]
-        workout_types = pd.concat(workout_types).groupby(CName.DATE).agg(join_with_comma)
-        workout_types = workout_types.apply(DataLoader._det_workout_type)
-        workout_types.index = pd.DatetimeIndex(workout_types.index)
-        return workout_types.reindex(all_workouts.index, fill_value="Rest Day")
+        """
+        Compute the daily workout type for each day, "Mixed" if there was more than one type that day.
 
-    @staticmethod
-    def _clean_cardio_workout(fname: str) -> pd.DataFrame:
-        workouts = DataLoader._load_and_clean_data(fname)
-        workouts[CName.AVG_HEART_RATE] = workouts[CName.AVG_HEART_RATE].astype(LONG)
-        workouts[CName.MAX_HEART_RATE] = workouts[CName.MAX_HEART_RATE].astype(LONG)
-        return workouts
+        The workout types are factorized into integer codes (which is free for Categoricals) so a day only has a
+        single type when its smallest and largest codes are the same. No strs are built or compared per day.
+        """
+        frames = [weight_training_workouts, cardio_workouts, travel_days]
+        workouts = pd.concat(
+            union_categories([frame[[CName.DATE, CName.WORKOUT_TYPE]] for frame in frames]),
+            ignore_index=True,
+        )
+        codes, uniques = pd.factorize(workouts[CName.WORKOUT_TYPE])
+        code_ranges = pd.Series(codes).groupby(workouts[CName.DATE].to_numpy()).agg(["min", "max"])
+
+        first_codes = code_ranges["min"].to_numpy()
+        is_mixed = first_codes != code_ranges["max"].to_numpy()
+        workout_types = np.where(is_mixed, "Mixed", np.asarray(uniques, dtype=object)[first_codes])
+        workout_types = pd.Series(workout_types, index=pd.DatetimeIndex(code_ranges.index), dtype=STR)
+        return workout_types.reindex(all_workouts.index, fill_value="Rest Day")
 
     @staticmethod
     def _get_all_dates(workouts: list[pd.DataFrame]) -> pd.DataFrame:
@@ -248,100 +611,181 @@ class DataLoader:
         return pd.concat([workout[CName.DATE] for workout in workouts])
 
     @staticmethod
-    def load_health_metrics(root_data_dir: str) -> pd.DataFrame:
-        """Load the health metrics dataset, filtering out days where both weight and resting heart rate are missing."""
-        health_metrics = DataLoader._load_and_clean_data(f"{root_data_dir}/health_metrics.csv")
+    def load_health_metrics(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
+        """Load the health metrics dataset, filtering out days where all of the (loaded) metrics are missing."""
+        health_metrics = DataLoader._load_and_clean_data(
+            f"{root_data_dir}/health_metrics.csv", cache, columns, row_filter
+        )
 
         # Filter out any empty rows from the health metrics
-        return health_metrics[health_metrics[CName.WEIGHT].notna() | health_metrics[CName.RESTING_HEART_RATE].notna()]
+        metrics = [metric for metric in [CName.WEIGHT, CName.RESTING_HEART_RATE] if metric in health_metrics]
+        if not metrics:
+            return health_metrics
+        return health_metrics[health_metrics[metrics].notna().any(axis=1)]
 
     @staticmethod
-    def load_travel_days(root_data_dir: str) -> pd.DataFrame:
+    def load_travel_days(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the travel days dataset."""
-        travel_days = DataLoader._load_and_clean_data(f"{root_data_dir}/travel_days.csv")
+        travel_days = DataLoader._load_and_clean_data(f"{root_data_dir}/travel_days.csv", cache, columns, row_filter)
         # Filling in an explicit workout type since its implicit for travel days
         travel_days[CName.WORKOUT_TYPE] = "Travel"
         return travel_days
 
     @staticmethod
-    def load_walk_workouts(root_data_dir: str) -> pd.DataFrame:
+    def load_walk_workouts(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the walk workouts dataset."""
-        return DataLoader._load_foot_workouts(root_data_dir, "walks.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/walks.csv", cache, columns, row_filter)
 
     @staticmethod
-    def load_run_workouts(root_data_dir: str) -> pd.DataFrame:
+    def load_run_workouts(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the run workouts dataset."""
-        return DataLoader._load_foot_workouts(root_data_dir, "runs.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/runs.csv", cache, columns, row_filter)
 
     @staticmethod
-    def _load_foot_workouts(root_data_dir: str, fname: str) -> pd.DataFrame:
-        workouts = DataLoader._clean_cardio_workout(f"{root_data_dir}/{fname}")
-        workouts[CName.STEPS] = workouts[CName.STEPS].astype(LONG)
-        return workouts
-
-    @staticmethod
-    def load_bike_workouts(root_data_dir: str) -> pd.DataFrame:
+    def load_bike_workouts(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the bike workouts dataset."""
-        return DataLoader._load_spin_workouts(root_data_dir, "bikes.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/bikes.csv", cache, columns, row_filter)
 
     @staticmethod
-    def load_row_workouts(root_data_dir: str) -> pd.DataFrame:
+    def load_row_workouts(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the row workouts dataset."""
-        return DataLoader._load_spin_workouts(root_data_dir, "rows.csv")
-
-    @staticmethod
-    def _load_spin_workouts(root_data_dir: str, fname: str) -> pd.DataFrame:
-        workouts = DataLoader._clean_cardio_workout(f"{root_data_dir}/{fname}")
-        if CName.AVG_CADENCE_BIKE in workouts:
-            avg_cadence = CName.AVG_CADENCE_BIKE
-            max_cadence = CName.MAX_CADENCE_BIKE
-        else:
-            avg_cadence = CName.AVG_CADENCE_ROW
-            max_cadence = CName.MAX_CADENCE_ROW
-        workouts[avg_cadence] = workouts[avg_cadence].astype(LONG)
-        workouts[max_cadence] = workouts[max_cadence].astype(LONG)
-        workouts[CName.AVG_WATT] = workouts[CName.AVG_WATT].astype(LONG)
-        workouts[CName.MAX_WATT] = workouts[CName.MAX_WATT].astype(LONG)
-        return workouts
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/rows.csv", cache, columns, row_filter)
 
     @staticmethod
-    def load_weight_training_workouts(root_data_dir: str) -> pd.DataFrame:
+    def load_weight_training_workouts(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the weight training workouts dataset."""
-        return DataLoader._load_and_clean_data(f"{root_data_dir}/weight_training_workouts.csv")
+        return DataLoader._load_and_clean_data(
+            f"{root_data_dir}/weight_training_workouts.csv", cache, columns, row_filter
+        )
 
     @staticmethod
-    def load_weight_training_sets(root_data_dir: str) -> pd.DataFrame:
+    def load_weight_training_sets(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the weight training sets dataset."""
-        return DataLoader._load_and_clean_data(f"{root_data_dir}/weight_training_sets.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/weight_training_sets.csv", cache, columns, row_filter)
 
     @staticmethod
-    def load_stair_workouts(root_data_dir: str) -> pd.DataFrame:
+    def load_stair_workouts(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the stair workouts dataset."""
-        workouts = DataLoader._clean_cardio_workout(f"{root_data_dir}/stairs.csv")
-        workouts[CName.FLIGHTS_UP] = workouts[CName.FLIGHTS_UP].astype("Int64")
-        workouts[CName.FLIGHTS_DOWN] = workouts[CName.FLIGHTS_DOWN].astype("Int64")
+        workouts = DataLoader._load_and_clean_data(f"{root_data_dir}/stairs.csv", cache, columns, row_filter)
         workouts[CName.DISTANCE] = np.nan  # Distance is unknown but I don't want to ruin merging of cardio workouts
         return workouts
 
     @staticmethod
-    def load_dashes(root_data_dir: str) -> pd.DataFrame:
+    def load_dashes(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the dashes dataset."""
-        return DataLoader._load_and_clean_data(f"{root_data_dir}/dashes.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/dashes.csv", cache, columns, row_filter)
 
     @staticmethod
-    def load_rate_of_climb(root_data_dir: str) -> pd.DataFrame:
+    def load_rate_of_climb(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the rate of climb dataset."""
-        return DataLoader._load_and_clean_data(f"{root_data_dir}/rate_of_climb.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/rate_of_climb.csv", cache, columns, row_filter)
 
     @staticmethod
-    def load_walk_backwards(root_data_dir: str) -> pd.DataFrame:
+    def load_walk_backwards(
+        root_data_dir: str,
+        cache: Optional[DataCache] = None,
+        columns: Optional[Iterable[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
         """Load the walk backwards dataset."""
-        return DataLoader._load_and_clean_data(f"{root_data_dir}/walk_backwards.csv")
+        return DataLoader._load_and_clean_data(f"{root_data_dir}/walk_backwards.csv", cache, columns, row_filter)
+
+    @staticmethod
+    def open_journal(root_data_dir: str) -> Journal:
+        """
+        Open the journal of the datasets in the given directory, it rejects any row that the DataLoader couldn't load.
+
+        Each row is parsed and validated just as it would be when it's loaded (e.g. its exercise and the type of each of
+        its values) before it's appended, so a bad row never reaches the journal.
+        """
+        return Journal(root_data_dir, validate=DataLoader.parse_and_clean_bytes)
+
+    @staticmethod
+    def compact_journal(root_data_dir: str) -> dict[str, int]:
+        """
+        Move the journaled rows of every dataset into its CSV. Each journal is validated before its CSV is rewritten.
+
+        Returns:
+            The number of rows that were moved into each CSV, keyed by the CSV's name
+        Raises:
+            ValueError: If one of the journals is invalid, the CSVs whose journals were already compacted are kept
+        """
+        return DataLoader.open_journal(root_data_dir).compact_all()
+
+    @staticmethod
+    def to_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert the repetitive text columns (see CATEGORICAL_COLUMNS) in the DataFrame into Categoricals.
+
+        The categories come from the matching enum (if there is one), followed by any other values in the column.
+        """
+        df = df.copy(deep=False)
+        for column, enum in CATEGORICAL_COLUMNS.items():
+            if column in df:
+                df[column] = to_categorical(df[column], None if enum is None else [str(member) for member in enum])
+        return df
 
     @staticmethod
     def merge_on_common_columns(workouts: list[pd.DataFrame]) -> pd.DataFrame:
-        """Merge all of the given pd.DataFrames, only keeping common fields."""
-        workouts = pd.concat(workouts, join="inner")  # Use inner so we only preserve the common fields
+        """Merge all of the given pd.DataFrames, only keeping common fields. Categoricals stay Categorical."""
+        workouts = pd.concat(
+            union_categories(workouts), join="inner"
+        )  # Use inner so we only preserve the common fields
         return workouts.reset_index(drop=True)
 
     @staticmethod
@@ -407,3 +851,18 @@ class DataLoader:
             # Convert km to m
             cardio_workouts[CName.STEP_SIZE] = cardio_workouts[CName.DISTANCE] / cardio_workouts[CName.STEPS]
             cardio_workouts[CName.STEP_SIZE] = (cardio_workouts[CName.STEP_SIZE] * 1000).round(2)
+
+
+# How each of the base datasets is loaded
+DatasetLoader = Callable[[str, Optional[DataCache], Optional[Iterable[str]], Optional[RowFilter]], pd.DataFrame]
+DATASET_LOADERS: dict[Dataset, DatasetLoader] = {
+    Dataset.HEALTH_METRICS: DataLoader.load_health_metrics,
+    Dataset.TRAVEL_DAYS: DataLoader.load_travel_days,
+    Dataset.WALK_WORKOUTS: DataLoader.load_walk_workouts,
+    Dataset.RUN_WORKOUTS: DataLoader.load_run_workouts,
+    Dataset.BIKE_WORKOUTS: DataLoader.load_bike_workouts,
+    Dataset.ROW_WORKOUTS: DataLoader.load_row_workouts,
+    Dataset.STAIR_WORKOUTS: DataLoader.load_stair_workouts,
+    Dataset.WEIGHT_TRAINING_WORKOUTS: DataLoader.load_weight_training_workouts,
+    Dataset.WEIGHT_TRAINING_SETS: DataLoader.load_weight_training_sets,
+}
@@ -0,0 +1,246 @@
+"""A binary cache for cleaned datasets so that unchanged CSVs don't need to be parsed again on every run."""
+
+import hashlib
+import json
+import os
+import zipfile
+from collections.abc import Callable, Collection
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader.columnar import arrays_to_frame, frame_to_arrays
+from exercise_log.dataloader.query import RowFilter
+from exercise_log.utils import LF, UTF8, split_csv_header
+
+# Bump this whenever the cleaning logic changes so that stale cache entries are discarded
+CACHE_VERSION = 3
+
+
+def _select(
+    df: pd.DataFrame,
+    columns: Optional[Collection[str]] = None,
+    row_filter: Optional[RowFilter] = None,
+) -> pd.DataFrame:
+    """Select the given columns (any that the DataFrame lacks are skipped, the rest keep their order) and rows."""
+    if columns is not None:
+        df = df[[column for column in df.columns if column in columns]]
+    return df if row_filter is None else row_filter.apply(df)
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    Identifies the exact contents of a CSV. Size and mtime are cheap checks, the hashes are the final say.
+
+    The header and the rows beneath it (the body) are hashed separately and the number of rows that were loaded (the
+    watermark) is kept so that rows added to the top of a newest-first CSV can be told apart from edits to older rows.
+    """
+
+    size: int
+    mtime_ns: int
+    header: str
+    body_sha256: str
+    num_rows: int
+    version: int = CACHE_VERSION
+
+    @classmethod
+    def of(cls, raw: bytes, mtime_ns: int, num_rows: int) -> "Fingerprint":
+        """Build the Fingerprint of a CSV given its raw contents and the number of rows that were loaded from it."""
+        header, body = split_csv_header(raw)
+        return cls(len(raw), mtime_ns, header.decode(UTF8), _hash(body), num_rows)
+
+    def is_current(self, stat: os.stat_result) -> bool:
+        """Cheaply check whether the file is unchanged. False doesn't mean that it changed, only that it might have."""
+        return self.version == CACHE_VERSION and self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+    def matches(self, raw: bytes) -> bool:
+        """Check whether the raw CSV has exactly the contents described by this Fingerprint."""
+        if self.version != CACHE_VERSION or self.size != len(raw):
+            return False
+        header, body = split_csv_header(raw)
+        return header.decode(UTF8) == self.header and _hash(body) == self.body_sha256
+
+    def get_new_rows(self, raw: bytes) -> Optional[bytes]:
+        """
+        Extract the rows that were added to the top of the CSV since this Fingerprint was taken.
+
+        Args:
+            raw (bytes): The current raw contents of the CSV
+        Returns:
+            A standalone CSV (the header followed by only the new rows) or None if the CSV changed in any other way
+            (e.g. a new header or an edit to one of the older rows)
+        """
+        header, body = split_csv_header(raw)
+        num_new_bytes = len(body) - (self.size - len(self.header.encode(UTF8)))
+        if (
+            self.version != CACHE_VERSION
+            or self.num_rows == 0
+            or num_new_bytes <= 0
+            or header.decode(UTF8) != self.header
+            or body[num_new_bytes - 1 : num_new_bytes] != LF
+            or _hash(body[num_new_bytes:]) != self.body_sha256
+        ):
+            return None
+        return header + body[:num_new_bytes]
+
+
+class DataCache:
+    """
+    Stores cleaned, typed DataFrames in a binary columnar format (.npz), keyed by the Fingerprint of the source CSV.
+
+    Each CSV gets a pair of files in the cache directory: "<name>.npz" holding the columns and "<name>.json" holding
+    the Fingerprint. The JSON is written last so that it only ever describes a complete .npz file.
+
+    The CSVs are kept newest-first so when rows are only added to the top of one, just those rows are parsed and merged
+    into the cached DataFrame. Any other edit falls back to parsing the whole CSV again.
+
+    Subclasses can store the entries elsewhere by overriding the _load/_save methods and save().
+    """
+
+    # Whether a RowFilter is applied by the storage itself (so only the matching rows are read) or after loading
+    SUPPORTS_PUSH_DOWN = False
+
+    def __init__(self, cache_dir: str) -> None:
+        """Initialize this DataCache, creating the cache directory if needed."""
+        self.cache_dir = cache_dir
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    def _get_paths(self, fname: str) -> tuple[Path, Path]:
+        stem = Path(fname).stem
+        return Path(self.cache_dir) / f"{stem}.npz", Path(self.cache_dir) / f"{stem}.json"
+
+    def _load_fingerprint(self, fname: str) -> Optional[Fingerprint]:
+        _, fingerprint_path = self._get_paths(fname)
+        try:
+            with open(fingerprint_path, encoding=UTF8) as f:
+                return Fingerprint(**json.load(f))
+        except (OSError, TypeError, ValueError):
+            # A missing, corrupt or outdated entry are all treated the same
+            return None
+
+    def _save_fingerprint(self, fname: str, fingerprint: Fingerprint) -> None:
+        _, fingerprint_path = self._get_paths(fname)
+        tmp_fingerprint_path = fingerprint_path.with_suffix(".json.tmp")
+        with open(tmp_fingerprint_path, "w", encoding=UTF8) as f:
+            json.dump(asdict(fingerprint), f)
+        tmp_fingerprint_path.replace(fingerprint_path)
+
+    def _load_data(
+        self,
+        fname: str,
+        columns: Optional[Collection[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Optional[pd.DataFrame]:
+        data_path, _ = self._get_paths(fname)
+        try:
+            with np.load(data_path, allow_pickle=False) as arrays:
+                df = arrays_to_frame(arrays, columns)
+        except (OSError, KeyError, TypeError, ValueError, zipfile.BadZipFile):
+            return None
+        return _select(df, row_filter=row_filter)
+
+    def load(
+        self,
+        fname: str,
+        columns: Optional[Collection[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Load the cached DataFrame for the given CSV. Returns None if there's no entry or the CSV has changed.
+
+        Only the requested columns (if given) are read from the cache, the others are never loaded at all. The rows
+        are selected by the RowFilter (if given).
+        """
+        fingerprint = self._load_fingerprint(fname)
+        if fingerprint is None:
+            return None
+        if not fingerprint.is_current(Path(fname).stat()):
+            with open(fname, "rb") as f:
+                if not fingerprint.matches(f.read()):
+                    return None
+        return self._load_data(fname, columns, row_filter)
+
+    def save(self, fname: str, df: pd.DataFrame, raw: bytes, mtime_ns: int) -> None:
+        """
+        Store the DataFrame that was loaded from the given CSV. Data that can't be stored is silently skipped.
+
+        Args:
+            fname (str): The path to the CSV the DataFrame was loaded from
+            df (pd.DataFrame): The cleaned DataFrame to store
+            raw (bytes): The raw contents of the CSV that the DataFrame was loaded from
+            mtime_ns (int): The mtime of the CSV, taken *before* it was read
+        """
+        try:
+            arrays = frame_to_arrays(df)
+        except TypeError:
+            return
+        data_path, fingerprint_path = self._get_paths(fname)
+
+        # Write to temporary files then swap them in so a crash never leaves a half-written entry behind
+        fingerprint_path.unlink(missing_ok=True)
+        tmp_data_path = data_path.with_suffix(".npz.tmp")
+        with open(tmp_data_path, "wb") as f:
+            np.savez(f, **arrays)
+        tmp_data_path.replace(data_path)
+        self._save_fingerprint(fname, Fingerprint.of(raw, mtime_ns, len(df)))
+
+    def get_or_load(
+        self,
+        fname: str,
+        parse: Callable[[bytes, str], pd.DataFrame],
+        merge: Optional[Callable[[pd.DataFrame, pd.DataFrame], Optional[pd.DataFrame]]] = None,
+        columns: Optional[Collection[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> pd.DataFrame:
+        """
+        Retrieve the cached DataFrame for the given CSV, parsing as little of the CSV as possible if it has changed.
+
+        Args:
+            fname (str): The path to the CSV
+            parse (Callable[[bytes, str], pd.DataFrame]): Parses and cleans a raw CSV given its contents and path
+            merge (Optional[Callable[[pd.DataFrame, pd.DataFrame], Optional[pd.DataFrame]]]): Merges newly parsed rows
+                into the cached DataFrame, returning None if they can't be. Without it, any change means a full parse.
+            columns (Optional[Collection[str]]): If given, only these columns are returned. The whole CSV is still
+                parsed and cached when it has changed so that the entry can serve any set of columns.
+            row_filter (Optional[RowFilter]): If given, only the matching rows are returned. Like the columns, this
+                doesn't affect what's cached.
+        Returns:
+            The cleaned DataFrame
+        """
+        fingerprint = self._load_fingerprint(fname)
+        stat = Path(fname).stat()
+        if fingerprint is not None and fingerprint.is_current(stat):
+            df = self._load_data(fname, columns, row_filter)
+            if df is not None:
+                return df
+
+        with open(fname, "rb") as f:
+            raw = f.read()
+        if fingerprint is not None and fingerprint.matches(raw):
+            # Only the mtime changed (e.g. after a git checkout), record the new one so the next check stays cheap
+            df = self._load_data(fname)
+            if df is not None:
+                self._save_fingerprint(fname, Fingerprint.of(raw, stat.st_mtime_ns, len(df)))
+                return _select(df, columns, row_filter)
+
+        new_rows = fingerprint.get_new_rows(raw) if fingerprint is not None and merge is not None else None
+        if new_rows is not None:
+            cached = self._load_data(fname)
+            # The row watermark guards against a data file that doesn't belong to this Fingerprint
+            if cached is not None and len(cached) == fingerprint.num_rows:
+                df = merge(cached, parse(new_rows, fname))
+                if df is not None:
+                    self.save(fname, df, raw, stat.st_mtime_ns)
+                    return _select(df, columns, row_filter)
+
+        df = parse(raw, fname)
+        self.save(fname, df, raw, stat.st_mtime_ns)
+        return _select(df, columns, row_filter)
@@ -0,0 +1,98 @@
+"""
+Categorical (integer-coded) representations of repetitive text columns and filters that operate on their codes.
+
+The filters accept plain text columns too, so callers don't need to know which representation was loaded. For a
+Categorical, each predicate is evaluated once per category and then broadcast to the rows using their integer codes.
+"""
+
+from collections.abc import Callable, Iterable
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def to_categorical(values: pd.Series, known_categories: Optional[Iterable[str]] = None) -> pd.Series:
+    """
+    Convert a text column into a Categorical.
+
+    Args:
+        values (pd.Series): The text column to convert
+        known_categories (Optional[Iterable[str]]): The expected categories (e.g. an enum's values), they come first
+            and in the given order. Any other values in the column are appended (sorted) so that no data is lost.
+    Returns:
+        The Categorical column with the same index and name as the input
+    """
+    categories = list(known_categories or [])
+    unexpected = set(values.dropna().unique()).difference(categories)
+    return values.astype(pd.CategoricalDtype([*categories, *sorted(unexpected)]))
+
+
+def union_categories(frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """
+    Give each Categorical column that's shared by all of the frames the same categories so that they can be combined.
+
+    pd.concat() only keeps a column Categorical if its categories are identical in every frame.
+
+    Returns:
+        The frames with their shared Categorical columns re-coded to the union of the categories (in first-seen order)
+    """
+    if not frames:
+        return frames
+    shared_columns = set(frames[0].columns).intersection(*(frame.columns for frame in frames[1:]))
+    categorical_columns = [
+        column
+        for column in frames[0].columns
+        if column in shared_columns and all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames)
+    ]
+    if not categorical_columns:
+        return frames
+
+    frames = [frame.copy(deep=False) for frame in frames]
+    for column in categorical_columns:
+        categories = pd.unique(np.concatenate([frame[column].cat.categories.to_numpy() for frame in frames]))
+        for frame in frames:
+            frame[column] = frame[column].cat.set_categories(categories)
+    return frames
+
+
+def _broadcast(values: pd.Series, is_match: Callable[[pd.Index], np.ndarray]) -> np.ndarray:
+    """Evaluate the predicate once per category then look up each row's result by its code (NA never matches)."""
+    categorical = values.cat
+    # The extra False at the end is what the NA code of -1 indexes into
+    matches = np.append(np.asarray(is_match(categorical.categories), dtype=bool), False)
+    return matches[categorical.codes.to_numpy()]
+
+
+def is_in(values: pd.Series, targets: Iterable[str]) -> np.ndarray:
+    """Get a boolean mask of the rows whose value is one of the targets."""
+    targets = list(targets)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return _broadcast(values, lambda categories: categories.isin(targets))
+    return values.isin(targets).to_numpy()
+
+
+def equals(values: pd.Series, target: str) -> np.ndarray:
+    """Get a boolean mask of the rows whose value is the target."""
+    return is_in(values, [target])
+
+
+def starts_with(values: pd.Series, prefix: str) -> np.ndarray:
+    """Get a boolean mask of the rows whose value starts with the prefix."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return _broadcast(values, lambda categories: categories.str.startswith(prefix))
+    return values.str.startswith(prefix).fillna(value=False).to_numpy(dtype=bool)
+
+
+def map_values(values: pd.Series, func: Callable[[str], Any], dtype: Optional[type] = None) -> np.ndarray:
+    """
+    Apply the function to each row's value, but only call it once per distinct value.
+
+    This is much faster than Series.apply() for expensive lookups (e.g. building an ExerciseInfo) on repetitive data.
+    None of the values may be missing. The dtype of the result is inferred unless one is given.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    return np.asarray([func(value) for value in uniques], dtype=dtype)[codes]
@@ -0,0 +1,167 @@
+"""Converts DataFrames to and from flat NumPy column arrays so they can be stored in binary, columnar formats."""
+
+from collections.abc import Collection, Iterable, Mapping
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNS_KEY = "columns"
+DTYPES_KEY = "dtypes"
+INDEX_KEY = "index"
+
+NULLABLE_INT = "Int64"
+STR = "str"
+OBJECT = "object"
+CATEGORY = "category"
+
+
+def _values_key(idx: int) -> str:
+    return f"c{idx}"
+
+
+def _mask_key(idx: int) -> str:
+    return f"c{idx}_mask"
+
+
+def _categories_key(idx: int) -> str:
+    return f"c{idx}_categories"
+
+
+def frame_to_arrays(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Flatten a DataFrame into a dict of plain NumPy arrays (no Python objects, so no pickling is ever needed).
+
+    Nullable integer columns are split into a values array and a boolean mask. Text columns are dictionary-encoded into
+    integer codes (-1 for NA) and an array of fixed-width unicode categories since they tend to be highly repetitive.
+    Categorical columns (of text) are stored the same way, using their existing codes.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to flatten
+    Returns:
+        A dict of arrays that arrays_to_frame() can rebuild the DataFrame from
+    Raises:
+        TypeError: If one of the columns has a dtype that isn't supported
+    """
+    arrays = {}
+    dtypes = []
+    for idx, column in enumerate(df.columns):
+        series = df[column]
+        dtype = str(series.dtype)
+        if dtype == NULLABLE_INT:
+            arrays[_values_key(idx)] = series.to_numpy(dtype="int64", na_value=0)
+            arrays[_mask_key(idx)] = series.isna().to_numpy()
+        elif dtype in {STR, OBJECT}:
+            codes, categories = pd.factorize(series)
+            if not all(isinstance(category, str) for category in categories):
+                msg = f'Column "{column}" contains non-str objects and cannot be stored in a columnar format'
+                raise TypeError(msg)
+            arrays[_values_key(idx)] = codes
+            arrays[_categories_key(idx)] = np.asarray(categories, dtype=str)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if not all(isinstance(category, str) for category in categories):
+                msg = f'Column "{column}" has non-str categories and cannot be stored in a columnar format'
+                raise TypeError(msg)
+            arrays[_values_key(idx)] = series.cat.codes.to_numpy()
+            arrays[_categories_key(idx)] = np.asarray(categories, dtype=str)
+        elif series.dtype.kind in "biufM":
+            arrays[_values_key(idx)] = series.to_numpy()
+        else:
+            msg = f'Column "{column}" has unsupported dtype "{dtype}"'
+            raise TypeError(msg)
+        dtypes.append(dtype)
+
+    arrays[COLUMNS_KEY] = np.array([str(column) for column in df.columns], dtype=str)
+    arrays[DTYPES_KEY] = np.array(dtypes, dtype=str)
+    return arrays
+
+
+def arrays_to_frame(
+    arrays: Mapping[str, np.ndarray],
+    columns: Optional[Collection[str]] = None,
+    *,
+    copy: bool = True,
+) -> pd.DataFrame:
+    """
+    Rebuild a DataFrame from the arrays produced by frame_to_arrays().
+
+    Args:
+        arrays (Mapping[str, np.ndarray]): The flattened arrays (e.g. the result of np.load on a .npz file)
+        columns (Optional[Collection[str]]): If given, only these columns are rebuilt (any that weren't stored are
+            skipped). With a lazily loaded .npz file, the arrays of the other columns are never even read.
+        copy (bool): Whether to copy the numeric columns rather than using the given arrays as they are (e.g. so that
+            they stay memory-mapped). Text columns are always rebuilt.
+    Returns:
+        The rebuilt DataFrame
+    """
+    data = {}
+    # The labels come back as np.str_, they're made plain strs again so that the DataFrame is the same as the original
+    labels = [str(column) for column in arrays[COLUMNS_KEY]]
+    for idx, (column, dtype) in enumerate(zip(labels, arrays[DTYPES_KEY], strict=True)):
+        if columns is not None and column not in columns:
+            continue
+        values = arrays[_values_key(idx)]
+        if dtype == NULLABLE_INT:
+            data[column] = pd.arrays.IntegerArray(values, arrays[_mask_key(idx)])
+        elif dtype in {STR, OBJECT}:
+            categories = pd.array(arrays[_categories_key(idx)].astype(object), dtype=dtype)
+            data[column] = pd.Series(categories.take(values, allow_fill=True), dtype=dtype)
+        elif dtype == CATEGORY:
+            categories = pd.Index(arrays[_categories_key(idx)].astype(object), dtype=STR)
+            data[column] = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(categories))
+        else:
+            data[column] = values
+    return pd.DataFrame(data, columns=list(data), copy=copy)
+
+
+def _get_frame_key(name: str, key: str) -> str:
+    return f"{name}/{key}"
+
+
+def frames_to_arrays(frames: Mapping[str, pd.DataFrame]) -> dict[str, np.ndarray]:
+    """
+    Flatten several DataFrames into a single dict of plain NumPy arrays (see frame_to_arrays).
+
+    Each DataFrame's arrays are prefixed with its name. Its index is stored too, unless it's the default RangeIndex.
+
+    Args:
+        frames (Mapping[str, pd.DataFrame]): The DataFrames to flatten keyed by name
+    Returns:
+        A dict of arrays that arrays_to_frames() can rebuild the DataFrames from
+    Raises:
+        TypeError: If one of the columns has a dtype that isn't supported
+    """
+    arrays = {}
+    for name, df in frames.items():
+        arrays.update({_get_frame_key(name, key): values for key, values in frame_to_arrays(df).items()})
+        if not df.index.equals(pd.RangeIndex(len(df))):
+            arrays[_get_frame_key(name, INDEX_KEY)] = df.index.to_numpy()
+    return arrays
+
+
+def arrays_to_frames(
+    arrays: Mapping[str, np.ndarray],
+    names: Iterable[str],
+    *,
+    copy: bool = True,
+) -> dict[str, pd.DataFrame]:
+    """
+    Rebuild several DataFrames from the arrays produced by frames_to_arrays().
+
+    Args:
+        arrays (Mapping[str, np.ndarray]): The flattened arrays
+        names (Iterable[str]): The names of the DataFrames to rebuild
+        copy (bool): Whether to copy the numeric columns rather than using the given arrays as they are
+    Returns:
+        The rebuilt DataFrames keyed by name
+    """
+    frames = {}
+    for name in names:
+        prefix = _get_frame_key(name, "")
+        frame_arrays = {key.removeprefix(prefix): values for key, values in arrays.items() if key.startswith(prefix)}
+        df = arrays_to_frame(frame_arrays, copy=copy)
+        if INDEX_KEY in frame_arrays:
+            df.index = frame_arrays[INDEX_KEY]
+        frames[name] = df
+    return frames
@@ -0,0 +1,223 @@
+"""An SQLite store for cleaned datasets that can select a subset of a dataset's rows without loading all of it."""
+
+import json
+import sqlite3
+from collections.abc import Collection, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.constants import DATE
+from exercise_log.dataloader.cache import DataCache, Fingerprint
+from exercise_log.dataloader.query import EXERCISE, RowFilter
+
+# Every dataset's table is indexed on whichever of these columns it has, the date is included in the exercise and
+# workout type indexes so that a date range within one of those is also answered by the index alone
+INDEXES = ((DATE,), (EXERCISE, DATE), ("workout_type", DATE))
+METADATA_TABLE = "_datasets"
+# How long a connection waits for another thread's (or process's) write to finish before giving up
+TIMEOUT_S = 30.0
+
+NULLABLE_INT = "Int64"
+STR = "str"
+OBJECT = "object"
+
+
+def _quote(identifier: str) -> str:
+    """Quote a table or column name for use in an SQL statement."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _get_table_name(fname: str) -> str:
+    return Path(fname).stem
+
+
+def _get_sql_type(column: str, series: pd.Series) -> str:
+    """Get the SQLite type to store the column as. Dates are stored as integer timestamps in their datetime64 unit."""
+    dtype = str(series.dtype)
+    if dtype == NULLABLE_INT or series.dtype.kind in "biuM":
+        return "INTEGER"
+    if series.dtype.kind == "f":
+        return "REAL"
+    if dtype in (STR, OBJECT) and all(isinstance(value, str) for value in series.dropna().unique()):
+        return "TEXT"
+    msg = f'Column "{column}" has unsupported dtype "{dtype}"'
+    raise TypeError(msg)
+
+
+def _to_sql_values(series: pd.Series) -> list[Any]:
+    """Convert a column into Python values that sqlite3 can bind, with None for NA."""
+    if series.dtype.kind == "M":
+        return series.to_numpy().astype(np.int64).tolist()
+    if series.dtype.kind in "biuf":
+        return series.to_numpy().tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _from_sql_values(values: tuple[Any, ...], dtype: str) -> Any:  # noqa: ANN401
+    """Convert a column of values read from SQLite back into the given dtype."""
+    if dtype == NULLABLE_INT:
+        return pd.array(values, dtype=NULLABLE_INT)
+    if dtype in (STR, OBJECT):
+        return pd.array(values, dtype=dtype)
+    if np.dtype(dtype).kind == "M":
+        return np.asarray(values, dtype=np.int64).astype(dtype)
+    # NULLs only occur in float columns and become NaN
+    return np.asarray(values, dtype=np.float64 if np.dtype(dtype).kind == "f" else None).astype(dtype)
+
+
+class SQLiteStore(DataCache):
+    """
+    Stores each cleaned dataset as a table in a local SQLite database, keyed by the Fingerprint of its source CSV.
+
+    This is a drop-in replacement for the .npz DataCache (change detection and incremental loading work the same way)
+    except that a RowFilter is pushed down to SQL. The tables are indexed on their date, exercise and workout type so a
+    date range or single exercise is read without scanning (or loading) the rest of the dataset.
+
+    A new connection is opened for every operation so that one SQLiteStore can be shared by the DataBox's threads.
+    """
+
+    SUPPORTS_PUSH_DOWN = True
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Initialize this SQLiteStore, creating the database file (and its directory) if they don't exist yet.
+
+        Args:
+            db_path (str): The path to the SQLite database file
+        """
+        super().__init__(str(Path(db_path).parent))
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {METADATA_TABLE} "
+                "(name TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, columns TEXT NOT NULL)",
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits when the block succeeds (or rolls back if it raises) and is then closed."""
+        conn = sqlite3.connect(self.db_path, timeout=TIMEOUT_S)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _load_metadata(self, fname: str) -> Optional[tuple[str, str]]:
+        """Get the JSON-encoded Fingerprint and [column, dtype] pairs of the given CSV's table, if it has one."""
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT fingerprint, columns FROM {METADATA_TABLE} WHERE name = ?",  # noqa: S608
+                (_get_table_name(fname),),
+            ).fetchone()
+
+    def _load_fingerprint(self, fname: str) -> Optional[Fingerprint]:
+        try:
+            metadata = self._load_metadata(fname)
+            return None if metadata is None else Fingerprint(**json.loads(metadata[0]))
+        except (sqlite3.Error, TypeError, ValueError):
+            return None
+
+    def _save_fingerprint(self, fname: str, fingerprint: Fingerprint) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE {METADATA_TABLE} SET fingerprint = ? WHERE name = ?",  # noqa: S608
+                (json.dumps(asdict(fingerprint)), _get_table_name(fname)),
+            )
+
+    @staticmethod
+    def _build_where(row_filter: Optional[RowFilter], dtypes: dict[str, str]) -> tuple[str, list[Any]]:
+        """
+        Build the WHERE clause (and its parameters) that selects the RowFilter's rows.
+
+        Raises:
+            ValueError: If the RowFilter has an exercise but the table has no exercise column
+        """
+        if row_filter is None:
+            return "", []
+        row_filter.validate(dtypes)
+
+        clauses, params = [], []
+        unit, _ = np.datetime_data(np.dtype(dtypes[DATE]))
+        start, end = row_filter.get_bounds(unit)
+        if start is not None:
+            clauses.append(f"{_quote(DATE)} >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{_quote(DATE)} <= ?")
+            params.append(end)
+        if row_filter.exercise is not None:
+            clauses.append(f"{_quote(EXERCISE)} = ?")
+            params.append(row_filter.exercise)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def _load_data(
+        self,
+        fname: str,
+        columns: Optional[Collection[str]] = None,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Optional[pd.DataFrame]:
+        try:
+            metadata = self._load_metadata(fname)
+            if metadata is None:
+                return None
+            dtypes = dict(json.loads(metadata[1]))
+        except (sqlite3.Error, TypeError, ValueError):
+            return None
+        selected = [column for column in dtypes if columns is None or column in columns]
+        where, params = self._build_where(row_filter, dtypes)
+
+        select = ", ".join(_quote(column) for column in selected)
+        query = f"SELECT {select} FROM {_quote(_get_table_name(fname))}{where} ORDER BY rowid"  # noqa: S608
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(query, params).fetchall()
+        except sqlite3.Error:
+            return None
+        values = list(zip(*rows, strict=True)) if rows else [() for _ in selected]
+        data = {column: _from_sql_values(vals, dtypes[column]) for column, vals in zip(selected, values, strict=False)}
+        return pd.DataFrame(data, columns=selected)
+
+    def save(self, fname: str, df: pd.DataFrame, raw: bytes, mtime_ns: int) -> None:
+        """
+        Replace the given CSV's table with the DataFrame, along with its indexes and Fingerprint, in one transaction.
+
+        A DataFrame with a column that can't be stored in SQLite isn't saved (it'll just be parsed again next time).
+
+        Args:
+            fname (str): The path to the source CSV
+            df (pd.DataFrame): The cleaned DataFrame that was loaded from it
+            raw (bytes): The raw CSV contents that the DataFrame was loaded from
+            mtime_ns (int): The CSV's modification time when it was read
+        """
+        try:
+            sql_types = [_get_sql_type(str(column), df[column]) for column in df.columns]
+        except TypeError:
+            return
+        stem = _get_table_name(fname)
+        table = _quote(stem)
+        column_defs = ", ".join(
+            f"{_quote(str(column))} {sql_type}" for column, sql_type in zip(df.columns, sql_types, strict=True)
+        )
+        rows = zip(*(_to_sql_values(df[column]) for column in df.columns), strict=True)
+        placeholders = ", ".join("?" * len(df.columns))
+        fingerprint = Fingerprint.of(raw, mtime_ns, len(df))
+        dtypes = [[str(column), str(df[column].dtype)] for column in df.columns]
+
+        with self._connect() as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE TABLE {table} ({column_defs})")
+            conn.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)  # noqa: S608
+            for index_columns in INDEXES:
+                if all(column in df for column in index_columns):
+                    index = _quote(f"{stem}_{'_'.join(index_columns)}")
+                    conn.execute(f"CREATE INDEX {index} ON {table} ({', '.join(map(_quote, index_columns))})")
+            conn.execute(
+                f"INSERT OR REPLACE INTO {METADATA_TABLE} VALUES (?, ?, ?)",  # noqa: S608
+                (stem, json.dumps(asdict(fingerprint)), json.dumps(dtypes)),
+            )
@@ -0,0 +1,219 @@
+"""
+An append-only journal of new rows (sets, workouts, health metrics, etc) for the ExerciseLog CSVs.
+
+Logging a row appends one line to a small journal CSV rather than rewriting the top of a large, newest-first dataset.
+The DataLoader merges any journaled rows in whenever it loads a dataset and compacting the journal moves its rows into
+the datasets in one bulk pass.
+
+Each dataset gets its own journal with the same header, e.g. "<data dir>/journal/weight_training_sets.csv". Its rows
+are in the order they were logged (oldest-first), unlike the datasets themselves.
+"""
+
+import csv
+import io
+import math
+from collections.abc import Callable, Iterator, Mapping
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from exercise_log.dataloader.parsing import DATE_FORMAT, find_record_ends
+from exercise_log.utils import CR, LF, UTF8, split_csv_header
+
+JOURNAL_DIR = "journal"
+QUOTE = b'"'
+SECONDS_PER_MINUTE = 60
+
+
+def get_journal_fname(fname: str) -> str:
+    """Get the path to the journal of the given dataset's CSV."""
+    path = Path(fname)
+    return str(path.parent / JOURNAL_DIR / path.name)
+
+
+def read_journal(fname: str) -> Optional[bytes]:
+    """
+    Read the journal of the given dataset's CSV.
+
+    Args:
+        fname (str): The path to the dataset's CSV (not to the journal itself)
+    Returns:
+        The raw journal (its header followed by the journaled rows) or None if there are no journaled rows
+    """
+    try:
+        with open(get_journal_fname(fname), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    _, body = split_csv_header(raw)
+    return raw if body.strip() else None
+
+
+def _iter_records(body: bytes) -> Iterator[bytes]:
+    """Iterate over the raw records (including their line breaks) of a CSV's body, see parsing.find_record_ends()."""
+    record_start = 0
+    for record_end in find_record_ends(body):
+        yield body[record_start:record_end]
+        record_start = record_end
+    if record_start < len(body):
+        # The last record doesn't end with a line break, or it has an unterminated quote and runs to the end
+        yield body[record_start:]
+
+
+def _get_date(record: bytes) -> Optional[date]:
+    """Get the date (the first field) of a raw record, None for a blank line."""
+    if not record.strip():
+        return None
+    field = record.split(b",", 1)[0].strip().strip(QUOTE).decode(UTF8)
+    return datetime.strptime(field, DATE_FORMAT).replace(tzinfo=UTC).date()
+
+
+def _format_value(value: object) -> str:
+    """Format a value the way that the CSVs store it."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, date):
+        return value.strftime(DATE_FORMAT).upper()
+    if isinstance(value, timedelta):
+        minutes, seconds = divmod(round(value.total_seconds()), SECONDS_PER_MINUTE)
+        hours, minutes = divmod(minutes, SECONDS_PER_MINUTE)
+        return f"{hours:02}:{minutes:02}:{seconds:02}"
+    return str(value)
+
+
+def merge_journal(raw: bytes, journal: bytes) -> tuple[bytes, int]:
+    """
+    Merge the journaled rows into a newest-first CSV by adding them to its top, as if they'd each been added by hand.
+
+    The journaled rows are ordered newest-first amongst themselves, with the last one logged on top of any others that
+    share its date, and the rest of the CSV is copied over as-is. That's the same order that the DataLoader gives them
+    when it merges the journal at load time, and since the CSV only gains rows at its top, a cached copy of it only has
+    to parse the new rows (see exercise_log.dataloader.cache).
+
+    Args:
+        raw (bytes): The raw contents of the CSV
+        journal (bytes): The raw contents of its journal
+    Returns:
+        The raw contents of the merged CSV along with the number of rows that were merged into it
+    Raises:
+        ValueError: If the journal's header doesn't match the CSV's or one of the journaled rows has an invalid date
+    """
+    header, body = split_csv_header(raw)
+    journal_header, journal_body = split_csv_header(journal)
+    if journal_header.rstrip(CR + LF) != header.rstrip(CR + LF):
+        msg = f"The journal's header {journal_header!r} doesn't match the CSV's header {header!r}"
+        raise ValueError(msg)
+
+    newline = CR + LF if header.endswith(CR + LF) else LF
+    # Newest-first by date then by when they were logged, the CSV's own rows are left untouched beneath them
+    new_records = sorted(
+        (
+            (_get_date(record), i, record if record.endswith(LF) else record + newline)
+            for i, record in enumerate(_iter_records(journal_body))
+            if record.strip()
+        ),
+        reverse=True,
+    )
+    return header + b"".join(record for _, _, record in new_records) + body, len(new_records)
+
+
+class Journal:
+    """Appends rows to the journals of the datasets in a data directory and compacts them into the datasets."""
+
+    def __init__(self, root_data_dir: str, validate: Optional[Callable[[bytes, str], object]] = None) -> None:
+        """
+        Initialize this Journal.
+
+        Args:
+            root_data_dir (str): The directory containing the CSV datasets, the journals are kept in a subdirectory
+            validate (Optional[Callable[[bytes, str], object]]): If given, every row is checked with it before it's
+                appended. It's called with a raw CSV of the dataset's header and the row along with the journal's path,
+                and it should raise if the row is invalid (see DataLoader.open_journal()).
+        """
+        self.root_data_dir = root_data_dir
+        self.validate = validate
+        self._headers: dict[str, bytes] = {}
+
+    def _get_header(self, fname: str) -> bytes:
+        """Get the header line (including its line break) of the given dataset's CSV, it's only read once."""
+        header = self._headers.get(fname)
+        if header is None:
+            with open(f"{self.root_data_dir}/{fname}", "rb") as f:
+                header = f.readline()
+            self._headers[fname] = header
+        return header
+
+    def append(self, fname: str, record: Mapping[str, object]) -> None:
+        """
+        Append a row to the journal of the given dataset. Only that row is written, regardless of the dataset's size.
+
+        Args:
+            fname (str): The name of the dataset's CSV within the data directory (e.g. "weight_training_sets.csv")
+            record (Mapping[str, object]): The row's values keyed by column name, any missing columns are left empty.
+                Dates are formatted like "01-JAN-2024" and timedeltas like "HH:mm:ss".
+        Raises:
+            ValueError: If the record has a column that the dataset doesn't or it fails validation, in which case
+                nothing is written
+        """
+        header = self._get_header(fname)
+        columns = next(csv.reader([header.decode(UTF8)]))
+        unknown_columns = sorted(set(record).difference(columns))
+        if unknown_columns:
+            msg = f"{fname} doesn't have the columns: {unknown_columns}"
+            raise ValueError(msg)
+
+        line = io.StringIO()
+        newline = (CR + LF if header.endswith(CR + LF) else LF).decode(UTF8)
+        csv.writer(line, lineterminator=newline).writerow([_format_value(record.get(column)) for column in columns])
+        row = line.getvalue().encode(UTF8)
+        journal_fname = Path(get_journal_fname(f"{self.root_data_dir}/{fname}"))
+        if self.validate is not None:
+            # A bad row would stop every later load of the dataset, so it's rejected before it ever reaches the journal
+            self.validate(header + row, str(journal_fname))
+        journal_fname.parent.mkdir(exist_ok=True)
+        with open(journal_fname, "ab") as f:
+            # A single write so that the row is never interleaved with another one
+            f.write(row if f.tell() else header + row)
+
+    def compact(self, fname: str, validate: Optional[Callable[[bytes, str], object]] = None) -> int:
+        """
+        Merge the journaled rows of the given dataset into its CSV, then clear its journal.
+
+        The CSV is replaced atomically. Rows must not be logged for the dataset while it's being compacted.
+
+        Args:
+            fname (str): The name of the dataset's CSV within the data directory (e.g. "weight_training_sets.csv")
+            validate (Optional[Callable[[bytes, str], object]]): If given, it's called with the raw journal and its
+                path before anything is written. It should raise if the journaled rows are invalid. By default, it's
+                the one that this Journal validates appended rows with.
+        Returns:
+            The number of rows that were moved from the journal into the CSV
+        """
+        csv_fname = f"{self.root_data_dir}/{fname}"
+        journal = read_journal(csv_fname)
+        if journal is None:
+            return 0
+        journal_fname = get_journal_fname(csv_fname)
+        validate = validate or self.validate
+        if validate is not None:
+            validate(journal, journal_fname)
+
+        with open(csv_fname, "rb") as f:
+            merged, num_rows = merge_journal(f.read(), journal)
+        tmp_path = Path(f"{csv_fname}.tmp")
+        tmp_path.write_bytes(merged)
+        tmp_path.replace(csv_fname)
+        Path(journal_fname).unlink()
+        return num_rows
+
+    def compact_all(self, validate: Optional[Callable[[bytes, str], object]] = None) -> dict[str, int]:
+        """
+        Compact the journal of every dataset that has one.
+
+        Returns:
+            The number of rows that were moved into each dataset's CSV, keyed by the CSV's name
+        """
+        journal_dir = Path(self.root_data_dir) / JOURNAL_DIR
+        if not journal_dir.is_dir():
+            return {}
+        return {path.name: self.compact(path.name, validate) for path in sorted(journal_dir.glob("*.csv"))}
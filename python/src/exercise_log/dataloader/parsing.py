@@ -0,0 +1,82 @@
+"""Vectorized parsers for the raw ExerciseLog CSVs: their records, their duration columns and their date format."""
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%d-%b-%Y"
+DURATION_WIDTH = len("HH:mm:ss")
+NULLABLE_INT = "Int64"
+MAX_DIGIT = 9
+
+# Bytes that are structurally significant in a raw CSV
+LF_BYTE = ord("\n")
+QUOTE_BYTE = ord('"')
+
+# Positions of the digits and separators within a "HH:mm:ss" str
+_DIGIT_POSITIONS = [0, 1, 3, 4, 6, 7]
+_SEPARATOR_POSITIONS = [2, 5]
+# Multiplying the digits by these weights and summing gives the total seconds
+_DIGIT_WEIGHTS = np.array([36000, 3600, 600, 60, 10, 1], dtype=np.int64)
+
+
+def get_unquoted(data: np.ndarray) -> np.ndarray:
+    """
+    Find which bytes of a raw CSV are outside of quoted fields, e.g. to tell which line feeds end a record.
+
+    A byte is outside of quoted fields when an even number of quotes precedes it. Escaped quotes ("") come in pairs so
+    they don't affect that parity. The opening quote of a field is outside of it but its closing quote is inside.
+
+    Args:
+        data (np.ndarray): The raw CSV's bytes, as uint8s
+    Returns:
+        A boolean np.ndarray that's True for each byte outside of quoted fields
+    """
+    is_quote = data == QUOTE_BYTE
+    if not is_quote.any():
+        return np.ones(len(data), dtype=bool)
+    return ~np.logical_xor.accumulate(is_quote)
+
+
+def find_record_ends(raw: bytes) -> np.ndarray:
+    """Find the offsets just past every line feed that ends a record of a raw CSV (i.e. isn't within a quoted field)."""
+    data = np.frombuffer(raw, dtype=np.uint8)
+    return np.flatnonzero((data == LF_BYTE) & get_unquoted(data)) + 1
+
+
+def parse_durations(values: pd.Series) -> pd.Series:
+    """
+    Parse a column of "HH:mm:ss" duration strs into whole seconds.
+
+    Well-formed durations are split into their digits using NumPy integer arithmetic on the strs' code points. Anything
+    else (e.g. "1:02:03" or "100:00:00") falls back to pandas' more lenient pd.to_timedelta().
+
+    Args:
+        values (pd.Series): The duration strs to parse, NA is allowed
+    Returns:
+        A nullable integer (Int64) Series of seconds with the same index and name as the input
+    """
+    is_na = values.isna().to_numpy(copy=True)
+    seconds = np.zeros(len(values), dtype=np.int64)
+    if is_na.all():
+        return pd.Series(pd.arrays.IntegerArray(seconds, is_na), index=values.index, name=values.name)
+
+    # View each fixed-width str as a row of code points, anything longer than "HH:mm:ss" is truncated here but is then
+    # caught by the length check and sent to the fallback
+    strs = values.where(~is_na, "00:00:00").to_numpy(dtype=str)
+    code_points = strs.astype(f"U{DURATION_WIDTH}").view(np.uint32).reshape(-1, DURATION_WIDTH)
+    digits = code_points[:, _DIGIT_POSITIONS].astype(np.int64) - ord("0")
+    is_well_formed = (
+        (np.char.str_len(strs) == DURATION_WIDTH)
+        & ((digits >= 0) & (digits <= MAX_DIGIT)).all(axis=1)
+        & (code_points[:, _SEPARATOR_POSITIONS] == ord(":")).all(axis=1)
+    )
+    seconds[is_well_formed] = digits[is_well_formed] @ _DIGIT_WEIGHTS
+
+    # Use the lenient parser on anything that doesn't strictly match the "HH:mm:ss" format
+    needs_fallback = ~is_well_formed & ~is_na
+    if needs_fallback.any():
+        fallback = pd.to_timedelta(values[needs_fallback]).dt.total_seconds()
+        seconds[needs_fallback] = fallback.astype(NULLABLE_INT).to_numpy(dtype=np.int64, na_value=0)
+        is_na[needs_fallback] = fallback.isna().to_numpy()
+
+    return pd.Series(pd.arrays.IntegerArray(seconds, is_na), index=values.index, name=values.name)
@@ -0,0 +1,152 @@
+"""Describes a subset of a dataset's rows (a date range and/or an exercise) so that it can be pushed down to storage."""
+
+import threading
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.constants import DATE
+
+EXERCISE = "exercise"
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    """
+    Selects the rows of a dataset within an inclusive date range and/or for a single exercise.
+
+    Every bound is optional, a RowFilter with none of them selects every row.
+    """
+
+    start: Optional[date] = None
+    end: Optional[date] = None
+    exercise: Optional[str] = None
+
+    def get_bounds(self, unit: str) -> tuple[Optional[int], Optional[int]]:
+        """Get the start and end dates as integer timestamps in the given datetime64 unit (e.g. "us")."""
+        return tuple(
+            None if bound is None else int(np.datetime64(bound, unit).astype(np.int64))
+            for bound in (self.start, self.end)
+        )
+
+    def validate(self, columns: Collection[str]) -> None:
+        """
+        Check that this RowFilter can be applied to a dataset with the given columns.
+
+        Raises:
+            ValueError: If the RowFilter has an exercise but the dataset has no exercise column
+        """
+        if self.exercise is not None and EXERCISE not in columns:
+            msg = "Can't filter by exercise, the dataset has no exercise column"
+            raise ValueError(msg)
+
+    def search(self, dates: np.ndarray) -> tuple[int, int]:
+        """
+        Binary search for the rows within this RowFilter's dates (its exercise is ignored).
+
+        Args:
+            dates (np.ndarray): The sorted datetime64 dates to search
+        Returns:
+            The (start, stop) positions of the matching rows, as a slice would take them
+        """
+        unit, _ = np.datetime_data(dates.dtype)
+        start, end = self.get_bounds(unit)
+        timestamps = dates.view(np.int64)
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = len(dates) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+        return lo, max(lo, hi)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Select the matching rows of the DataFrame (in memory). Unlike a RowIndex, it doesn't need to be sorted.
+
+        Raises:
+            ValueError: If the RowFilter has an exercise but the DataFrame has no exercise column
+        """
+        self.validate(df.columns)
+        mask = np.ones(len(df), dtype=bool)
+        if self.start is not None:
+            mask &= (df[DATE] >= pd.Timestamp(self.start)).to_numpy()
+        if self.end is not None:
+            mask &= (df[DATE] <= pd.Timestamp(self.end)).to_numpy()
+        if self.exercise is not None:
+            mask &= (df[EXERCISE] == self.exercise).to_numpy()
+        return df[mask]
+
+
+def _get_dates(df: pd.DataFrame) -> np.ndarray:
+    dates = df[DATE]
+    if dates.dtype.kind != "M":
+        dates = pd.to_datetime(dates)
+    return dates.to_numpy()
+
+
+def slice_dates(df: pd.DataFrame, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    """
+    Get the rows of a date-sorted DataFrame within an inclusive date range using a binary search.
+
+    The dates must be sorted (as they are in every dataset the DataLoader loads) but unlike a boolean mask, this only
+    takes O(log n) time and returns a slice of the DataFrame rather than a copy of the matching rows.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to slice, sorted by date
+        start (Optional[date]): If given, rows before this date are excluded
+        end (Optional[date]): If given, rows after this date are excluded
+    Returns:
+        The matching rows
+    """
+    lo, hi = RowFilter(start, end).search(_get_dates(df))
+    return df.iloc[lo:hi]
+
+
+class RowIndex:
+    """
+    Selects the rows of a date-sorted DataFrame that match a RowFilter in O(log n + k) time rather than O(n).
+
+    Date ranges are found with a binary search and returned as slices of the DataFrame. Each exercise's rows are found
+    using the row positions of every exercise, which are only gathered the first time an exercise is requested.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        """
+        Initialize this RowIndex.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to index, it must be sorted by date
+        """
+        self.df = df
+        self._dates = _get_dates(df)
+        # The row positions of each exercise along with their dates
+        self._exercise_rows: Optional[dict[str, tuple[np.ndarray, np.ndarray]]] = None
+        self._lock = threading.Lock()
+
+    def _get_exercise_rows(self, exercise: str) -> tuple[np.ndarray, np.ndarray]:
+        """Get the (sorted) positions of the given exercise's rows along with their dates."""
+        if self._exercise_rows is None:
+            with self._lock:
+                if self._exercise_rows is None:
+                    groups = self.df.groupby(EXERCISE, sort=False, observed=True)
+                    self._exercise_rows = {
+                        str(name): (rows, self._dates[rows]) for name, rows in groups.indices.items()
+                    }
+        return self._exercise_rows.get(exercise, (np.empty(0, dtype=np.intp), self._dates[:0]))
+
+    def select(self, row_filter: RowFilter) -> pd.DataFrame:
+        """
+        Select the rows that match the RowFilter.
+
+        Raises:
+            ValueError: If the RowFilter has an exercise but the DataFrame has no exercise column
+        """
+        row_filter.validate(self.df.columns)
+        if row_filter.exercise is None:
+            lo, hi = row_filter.search(self._dates)
+            return self.df.iloc[lo:hi]
+
+        rows, dates = self._get_exercise_rows(row_filter.exercise)
+        lo, hi = row_filter.search(dates)
+        return self.df.take(rows[lo:hi])
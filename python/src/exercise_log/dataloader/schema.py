@@ -0,0 +1,101 @@
+"""Reads the shared column schema that declares the type of each CSV column and the datasets that contain it."""
+
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from exercise_log.utils import UTF8, StrEnum
+
+# The types that columns can be declared as in the schema
+DATE = "date"
+DURATION = "duration"
+INT = "int"
+FLOAT = "float"
+STR = "str"
+
+# Dates and durations are read as strs then parsed by the vectorized parsers
+_READER_DTYPES = {DATE: STR, DURATION: STR, FLOAT: "float64", STR: STR}
+NULLABLE_INT = "Int64"
+NON_NULLABLE_INT = "int64"
+
+
+@dataclass(frozen=True)
+class ColumnSchema:
+    """The declared type of a CSV column, whether it may be empty, and the datasets (CSV names) that contain it."""
+
+    name: str
+    dtype: str
+    nullable: bool
+    datasets: tuple[str, ...]
+
+    def get_reader_dtype(self) -> str:
+        """Get the dtype that this column should be read in as. Only nullable integers need pandas' Int64 type."""
+        if self.dtype == INT:
+            return NULLABLE_INT if self.nullable else NON_NULLABLE_INT
+        return _READER_DTYPES[self.dtype]
+
+
+class Schema:
+    """The ColumnSchemas of every column that the DataLoader reads, keyed by the column's name in the CSVs."""
+
+    def __init__(self, columns: dict[str, ColumnSchema]) -> None:
+        """Initialize this Schema with the ColumnSchemas keyed by column name."""
+        self.columns = columns
+
+    @classmethod
+    def create_from_json(cls, f_name: str, column_names: type[StrEnum]) -> "Schema":
+        """
+        Load the Schema from the given JSON file.
+
+        The dict should be of the form:
+        {
+            "name": "<SchemaName>",
+            "description": "<Some description for your schema>",  # This entry is optional
+            "columns": {
+                "<COLUMN_NAME_1>": {"dtype": "<date|duration|int|float|str>", "nullable": <bool>, "datasets": [...]},
+                ...,
+            }
+        }
+
+        Args:
+            f_name (str): The path to the JSON file
+            column_names (type[StrEnum]): The StrEnum that maps each <COLUMN_NAME> to its name in the CSVs
+        Raises:
+            ValueError: If a column has a dtype that isn't one of the supported types
+        """
+        with open(f_name, encoding=UTF8) as f:
+            data_json = json.load(f)
+
+        columns = {}
+        for name, column_json in data_json["columns"].items():
+            column = ColumnSchema(
+                column_names[name].value,
+                column_json["dtype"],
+                column_json["nullable"],
+                tuple(column_json["datasets"]),
+            )
+            if column.dtype != INT and column.dtype not in _READER_DTYPES:
+                msg = f'Column "{name}" in {f_name} has unexpected dtype "{column.dtype}"'
+                raise ValueError(msg)
+            columns[column.name] = column
+        return cls(columns)
+
+    def get_columns(self, dataset: str) -> list[ColumnSchema]:
+        """Get the ColumnSchemas of every column in the given dataset, empty if the dataset isn't in this Schema."""
+        return [column for column in self.columns.values() if dataset in column.datasets]
+
+    def get_reader_dtypes(self, dataset: str, usecols: Optional[list[str]] = None) -> dict[str, str]:
+        """
+        Get the dtypes to read the given dataset's columns in as.
+
+        Args:
+            dataset (str): The name of the dataset (its CSV's name without the extension)
+            usecols (Optional[list[str]]): If given, only these columns are included
+        Returns:
+            The dtype of each column keyed by column name, suitable for pd.read_csv()
+        """
+        return {
+            column.name: column.get_reader_dtype()
+            for column in self.get_columns(dataset)
+            if usecols is None or column.name in usecols
+        }
@@ -0,0 +1,122 @@
+"""
+Publishes DataFrames into shared memory once so that worker processes can attach to them without copying.
+
+Passing a DataFrame to a process pool pickles it for every task. Instead, the publishing process flattens its DataFrames
+into a single block of shared memory (see exercise_log.dataloader.columnar) and only hands the workers a small
+SharedFramesHandle. Each worker attaches once and rebuilds the DataFrames on top of the shared arrays; only the text
+columns are rebuilt, the numeric and Categorical columns aren't copied.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from types import TracebackType
+from typing import Optional, Self
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader.columnar import arrays_to_frames, frames_to_arrays
+
+# Every array starts on a cache line boundary
+ALIGNMENT = 64
+
+# The blocks of shared memory that this process has attached to, keyed by name. They stay mapped for as long as the
+# process lives since the DataFrames built on top of them can't tell when they're no longer needed.
+_ATTACHED: dict[str, shared_memory.SharedMemory] = {}
+
+
+@dataclass(frozen=True)
+class ArrayLayout:
+    """Where one of the flattened arrays is within the block of shared memory."""
+
+    key: str
+    offset: int
+    dtype: str
+    shape: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class SharedFramesHandle:
+    """A small, picklable description of DataFrames in shared memory that any process can attach to."""
+
+    shm_name: str
+    names: tuple[str, ...]
+    layouts: tuple[ArrayLayout, ...]
+
+
+class SharedFrames:
+    """
+    Owns a block of shared memory holding some DataFrames, it's released once this is closed.
+
+    Use it as a context manager around the lifetime of the workers, e.g.:
+
+        with SharedFrames({"sets": sets}) as shared, Pool(initializer=attach, initargs=(shared.handle,)) as pool:
+            ...
+    """
+
+    def __init__(self, frames: Mapping[str, pd.DataFrame]) -> None:
+        """
+        Publish the DataFrames into a new block of shared memory.
+
+        Args:
+            frames (Mapping[str, pd.DataFrame]): The DataFrames to publish keyed by name
+        Raises:
+            TypeError: If one of the DataFrames has a column that can't be stored in a columnar format
+        """
+        arrays = frames_to_arrays(frames)
+        layouts, size = [], 0
+        for key, values in arrays.items():
+            offset = -(-size // ALIGNMENT) * ALIGNMENT
+            layouts.append(ArrayLayout(key, offset, values.dtype.str, values.shape))
+            size = offset + values.nbytes
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for layout in layouts:
+            _get_array(self._shm, layout)[...] = arrays[layout.key]
+        self.handle = SharedFramesHandle(self._shm.name, tuple(frames), tuple(layouts))
+
+    def close(self) -> None:
+        """Release the shared memory. Workers that are still attached keep their mapping until they exit."""
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> Self:
+        """Return this SharedFrames, it's closed when the context exits."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Release the shared memory."""
+        self.close()
+
+
+def _get_array(shm: shared_memory.SharedMemory, layout: ArrayLayout) -> np.ndarray:
+    return np.ndarray(layout.shape, dtype=np.dtype(layout.dtype), buffer=shm.buf, offset=layout.offset)
+
+
+def attach_frames(handle: SharedFramesHandle) -> dict[str, pd.DataFrame]:
+    """
+    Attach to DataFrames that another process published with SharedFrames. Nothing is copied out of shared memory.
+
+    The shared memory stays mapped in this process until it exits, so the DataFrames stay valid even after the process
+    that published them releases it. They're read-only, writing to one gives it its own copy.
+
+    Args:
+        handle (SharedFramesHandle): The handle of the published DataFrames
+    Returns:
+        The DataFrames keyed by name
+    """
+    shm = _ATTACHED.get(handle.shm_name)
+    if shm is None:
+        shm = _ATTACHED.setdefault(handle.shm_name, shared_memory.SharedMemory(name=handle.shm_name))
+    arrays = {}
+    for layout in handle.layouts:
+        values = _get_array(shm, layout)
+        values.flags.writeable = False
+        arrays[layout.key] = values
+    return arrays_to_frames(arrays, handle.names, copy=False)
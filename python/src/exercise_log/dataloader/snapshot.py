@@ -0,0 +1,116 @@
+"""
+Writes a set of DataFrames into a single snapshot file and memory-maps them back.
+
+A snapshot is an uncompressed .npz file (see exercise_log.dataloader.columnar for how each DataFrame is flattened into
+arrays). Since nothing is compressed, the arrays are read straight out of a memory map of the file rather than being
+copied in, so restoring a snapshot only costs as much as rebuilding its text columns.
+"""
+
+import json
+import mmap
+import struct
+import zipfile
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader.columnar import arrays_to_frames, frames_to_arrays
+
+# Bump this whenever the layout of a snapshot changes so that older snapshots are rejected
+SNAPSHOT_VERSION = 1
+METADATA_KEY = "metadata"
+NPY_SUFFIX = ".npy"
+
+# Each member of a zip file is preceded by a local header: 30 fixed bytes then the member's name and an extra field,
+# whose lengths are stored at these offsets
+LOCAL_HEADER_SIZE = 30
+LOCAL_HEADER_LENGTHS_OFFSET = 26
+
+
+def write_snapshot(path: str, frames: Mapping[str, pd.DataFrame], metadata: Mapping[str, object]) -> None:
+    """
+    Write the DataFrames into a single snapshot file, replacing any that's already there.
+
+    Args:
+        path (str): Where to write the snapshot
+        frames (Mapping[str, pd.DataFrame]): The DataFrames to store keyed by name, their index is stored too
+        metadata (Mapping[str, object]): Anything else to store alongside the DataFrames, it must be JSON serializable
+    Raises:
+        TypeError: If one of the DataFrames has a column that can't be stored in a columnar format
+    """
+    arrays = frames_to_arrays(frames)
+    header = {"version": SNAPSHOT_VERSION, "frames": list(frames), **metadata}
+    arrays[METADATA_KEY] = np.array(json.dumps(header))
+
+    # Write to a temporary file then swap it in so a crash never leaves a half-written snapshot behind
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    tmp_path.replace(path)
+
+
+def _map_arrays(path: str) -> dict[str, np.ndarray]:
+    """
+    Memory-map every array in an uncompressed .npz file, the arrays are read-only views of the file.
+
+    Raises:
+        ValueError: If the file isn't an uncompressed .npz file of plain (non-object) arrays
+    """
+    layouts = {}
+    with open(path, "rb") as f:
+        try:
+            with zipfile.ZipFile(f) as zip_file:
+                members = zip_file.infolist()
+        except zipfile.BadZipFile:
+            msg = f"{path} isn't a snapshot"
+            raise ValueError(msg) from None
+        for member in members:
+            if member.compress_type != zipfile.ZIP_STORED or not member.filename.endswith(NPY_SUFFIX):
+                msg = f"{member.filename} in {path} isn't an uncompressed array"
+                raise ValueError(msg)
+            f.seek(member.header_offset + LOCAL_HEADER_LENGTHS_OFFSET)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(member.header_offset + LOCAL_HEADER_SIZE + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, is_fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, is_fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                msg = f"{member.filename} in {path} is an array of Python objects"
+                raise ValueError(msg)
+            layouts[member.filename.removesuffix(NPY_SUFFIX)] = (f.tell(), shape, is_fortran_order, dtype)
+        # The arrays keep the map open for as long as any of them are referenced
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    arrays = {}
+    for key, (offset, shape, is_fortran_order, dtype) in layouts.items():
+        values = np.frombuffer(buffer, dtype, count=int(np.prod(shape)), offset=offset)
+        arrays[key] = values.reshape(shape, order="F" if is_fortran_order else "C")
+    return arrays
+
+
+def read_snapshot(path: str) -> tuple[dict[str, pd.DataFrame], dict[str, object]]:
+    """
+    Read the DataFrames back from a snapshot file. Their numeric columns stay memory-mapped (and read-only).
+
+    Args:
+        path (str): The snapshot to read
+    Returns:
+        The DataFrames keyed by name along with the metadata that was stored alongside them
+    Raises:
+        ValueError: If the file isn't a snapshot or was written by an incompatible version
+    """
+    arrays = _map_arrays(path)
+    try:
+        metadata = json.loads(str(arrays.pop(METADATA_KEY)))
+    except KeyError:
+        msg = f"{path} isn't a snapshot"
+        raise ValueError(msg) from None
+    if metadata.pop("version", None) != SNAPSHOT_VERSION:
+        msg = f"{path} was written by an incompatible version"
+        raise ValueError(msg)
+    return arrays_to_frames(arrays, metadata.pop("frames"), copy=False), metadata
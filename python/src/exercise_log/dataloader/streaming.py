@@ -0,0 +1,231 @@
+"""
+Streams the per-set and cardio CSVs through a generator pipeline (parse, clean, validate, aggregate) in chunks.
+
+Unlike the DataLoader, which loads a whole dataset into memory, only one chunk of a CSV's rows is held at a time along
+with the aggregates built so far (one row per exercise or workout type per day). This keeps memory bounded no matter how
+many years of sets the CSVs hold, e.g.:
+
+    daily_sets = aggregate_daily_sets(iter_clean_chunks("../../data/weight_training_sets.csv", SET_COLUMNS))
+    summaries = summarize_exercises(daily_sets)
+
+Each chunk is a valid CSV on its own (the header followed by whole rows) so it's parsed, cleaned and validated just as
+the DataLoader would, with any errors pointing at the row in the original CSV.
+"""
+
+import itertools
+from collections.abc import Iterable, Iterator
+from operator import methodcaller
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import SCHEMA, CName, DataLoader
+from exercise_log.dataloader.journal import get_journal_fname, read_journal
+from exercise_log.dataloader.parsing import find_record_ends
+
+DEFAULT_CHUNK_SIZE = 4 * 2**20  # In bytes
+# Partial aggregates are combined every so many chunks so that they never hold many more rows than the final result
+MAX_PENDING_PARTIALS = 32
+
+# The columns of the aggregates that aren't in the datasets themselves
+SETS = "sets"
+VOLUME = "volume(lbs)"
+MAX_WEIGHT = "max_weight(lbs)"
+WORKOUTS = "workouts"
+ACTIVE_DAYS = "active_days"
+FIRST_DATE = "first_date"
+LAST_DATE = "last_date"
+
+SET_COLUMNS = (CName.EXERCISE, CName.REPS, CName.WEIGHT)
+CARDIO_FNAMES = ("walks.csv", "runs.csv", "bikes.csv", "rows.csv", "stairs.csv")
+
+# How the partial aggregates of each chunk are combined with each other, each is called on the column's grouped values
+SUM = methodcaller("sum")
+# A sum that stays NaN when every value is, e.g. the distance of cardio that doesn't have one (like stairs)
+SUM_IF_ANY = methodcaller("sum", min_count=1)
+DAILY_SETS_COMBINERS = {SETS: SUM, CName.REPS: SUM, VOLUME: SUM, MAX_WEIGHT: methodcaller("max")}
+DAILY_CARDIO_COMBINERS = {WORKOUTS: SUM, CName.DURATION: SUM, CName.DISTANCE: SUM_IF_ANY}
+
+
+def iter_raw_chunks(fname: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple[bytes, int]]:
+    """
+    Read a CSV in chunks of whole rows, each of which is a CSV on its own.
+
+    A row is never split across chunks, even when a quoted field contains line breaks. A row that's longer than the
+    chunk size makes its chunk grow until the row is complete.
+
+    Args:
+        fname (str): The path to the CSV
+        chunk_size (int): Roughly how many bytes of the CSV go into each chunk
+    Yields:
+        The raw CSV's header followed by the next rows and the number of rows that precede those ones in the CSV. There
+        is always at least one chunk, even if the CSV has no rows.
+    """
+    with open(fname, "rb") as f:
+        header = f.readline()
+        num_rows, pending = 0, b""
+        for block in iter(lambda: f.read(chunk_size), b""):
+            pending += block
+            record_ends = find_record_ends(pending)
+            if not len(record_ends):
+                continue
+            end = record_ends[-1]
+            yield header + pending[:end], num_rows
+            num_rows += len(record_ends)
+            pending = pending[end:]
+        if pending.strip() or not num_rows:
+            yield header + pending, num_rows
+
+
+def iter_clean_chunks(
+    fname: str,
+    columns: Optional[Iterable[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """
+    Parse, validate and clean a CSV one chunk at a time, followed by any rows in its journal.
+
+    Each chunk is sorted by date, but the chunks themselves are in the CSV's order (newest-first) with the journaled
+    rows last. Anything computed from them shouldn't depend on their order.
+
+    Args:
+        fname (str): The path to the CSV
+        columns (Optional[Iterable[str]]): If given, only these (cleaned) columns are read. The date is always read.
+        chunk_size (int): Roughly how many bytes of the CSV go into each chunk
+    Yields:
+        The cleaned DataFrame of each chunk's rows
+    Raises:
+        ValueError: If any chunk of the CSV is invalid (see DataLoader.parse_and_clean_bytes)
+    """
+    columns = None if columns is None else {CName.DATE.value, *columns}
+    for raw, row_offset in iter_raw_chunks(fname, chunk_size):
+        yield DataLoader.parse_and_clean_bytes(raw, fname, columns, row_offset=row_offset)
+
+    journal = read_journal(fname)
+    if journal is not None:
+        yield DataLoader.parse_and_clean_bytes(journal, get_journal_fname(fname), columns)
+
+
+def _combine_partials(partials: Iterable[pd.DataFrame], combiners: dict[str, methodcaller]) -> pd.DataFrame:
+    """
+    Combine the partial aggregates of each chunk (indexed by their group) into the aggregates of the whole dataset.
+
+    A group (e.g. an exercise on a given day) can span chunks so its partial aggregates are combined once more. This is
+    done every MAX_PENDING_PARTIALS chunks rather than only at the end so that memory stays bounded.
+    """
+    pending: list[pd.DataFrame] = []
+    for partial in partials:
+        pending.append(partial)
+        if len(pending) == MAX_PENDING_PARTIALS:
+            pending = [_combine(pending, combiners)]
+    return _combine(pending, combiners)
+
+
+def _combine(partials: list[pd.DataFrame], combiners: dict[str, methodcaller]) -> pd.DataFrame:
+    combined = pd.concat(partials)
+    grouped = combined.groupby(level=list(range(combined.index.nlevels)), sort=False)
+    return pd.DataFrame({column: combine(grouped[column]) for column, combine in combiners.items()})
+
+
+def _aggregate_daily_sets(chunk: pd.DataFrame) -> pd.DataFrame:
+    volume = chunk[CName.REPS] * chunk[CName.WEIGHT]
+    return (
+        chunk.assign(**{VOLUME: volume})
+        .groupby([CName.DATE, CName.EXERCISE], sort=False, observed=True)
+        .agg(
+            **{
+                SETS: (CName.REPS, "size"),
+                CName.REPS: (CName.REPS, "sum"),
+                VOLUME: (VOLUME, "sum"),
+                MAX_WEIGHT: (CName.WEIGHT, "max"),
+            }
+        )
+    )
+
+
+def _aggregate_daily_cardio(chunk: pd.DataFrame) -> pd.DataFrame:
+    if CName.DISTANCE not in chunk:
+        # Distance is unknown for some forms of cardio (e.g. stairs), same as when the workouts are merged in memory
+        chunk = chunk.assign(**{CName.DISTANCE: np.nan})
+    grouped = chunk.groupby([CName.DATE, CName.WORKOUT_TYPE], sort=False, observed=True)
+    return pd.DataFrame(
+        {
+            WORKOUTS: grouped.size(),
+            CName.DURATION: SUM(grouped[CName.DURATION]),
+            CName.DISTANCE: SUM_IF_ANY(grouped[CName.DISTANCE]),
+        }
+    )
+
+
+def _finish(aggregates: pd.DataFrame) -> pd.DataFrame:
+    """Turn the aggregates' groups back into columns, ordered by date then group."""
+    return aggregates.reset_index().sort_values(list(aggregates.index.names), kind="stable", ignore_index=True)
+
+
+def aggregate_daily_sets(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Aggregate the cleaned chunks of the weight training sets into per-exercise daily totals.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The cleaned chunks, each with at least the date and the SET_COLUMNS
+    Returns:
+        A DataFrame with one row per exercise per day (ordered by date then exercise) of the number of sets, the total
+        reps, the total volume (reps x weight) and the heaviest weight
+    """
+    return _finish(_combine_partials(map(_aggregate_daily_sets, chunks), DAILY_SETS_COMBINERS))
+
+
+def aggregate_daily_cardio(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Aggregate the cleaned chunks of cardio workouts into per-workout-type daily totals.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): The cleaned chunks, each with at least the date, workout type and duration
+            (the distance is optional)
+    Returns:
+        A DataFrame with one row per workout type per day (ordered by date then workout type) of the number of
+        workouts, the total duration and the total distance
+    """
+    return _finish(_combine_partials(map(_aggregate_daily_cardio, chunks), DAILY_CARDIO_COMBINERS))
+
+
+def summarize_exercises(daily_sets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Summarize each exercise over the whole history from its daily totals (see aggregate_daily_sets).
+
+    Returns:
+        A DataFrame indexed by exercise of the number of days it was done on, its total sets, reps and volume, its
+        heaviest weight and the first and last days it was done on
+    """
+    return daily_sets.groupby(CName.EXERCISE, observed=True).agg(
+        **{
+            ACTIVE_DAYS: (CName.DATE, "size"),
+            SETS: (SETS, "sum"),
+            CName.REPS: (CName.REPS, "sum"),
+            VOLUME: (VOLUME, "sum"),
+            MAX_WEIGHT: (MAX_WEIGHT, "max"),
+            FIRST_DATE: (CName.DATE, "min"),
+            LAST_DATE: (CName.DATE, "max"),
+        }
+    )
+
+
+def stream_daily_sets(root_data_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """Stream the weight training sets CSV into per-exercise daily totals (see aggregate_daily_sets)."""
+    return aggregate_daily_sets(iter_clean_chunks(f"{root_data_dir}/weight_training_sets.csv", SET_COLUMNS, chunk_size))
+
+
+def stream_daily_cardio(root_data_dir: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """Stream every cardio CSV into per-workout-type daily totals (see aggregate_daily_cardio)."""
+    chunks = itertools.chain.from_iterable(
+        iter_clean_chunks(f"{root_data_dir}/{fname}", _get_cardio_columns(fname), chunk_size) for fname in CARDIO_FNAMES
+    )
+    return aggregate_daily_cardio(chunks)
+
+
+def _get_cardio_columns(fname: str) -> list[str]:
+    dataset_columns = {column.name for column in SCHEMA.get_columns(Path(fname).stem)}
+    columns = [CName.WORKOUT_TYPE, CName.DURATION]
+    return [*columns, CName.DISTANCE] if CName.DISTANCE in dataset_columns else columns
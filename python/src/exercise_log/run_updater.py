@@ -2,26 +2,39 @@
 
 import datetime
 import os
+import resource
+import sys
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
 from functools import partial
 from multiprocessing import Pool
+from typing import Optional
 
 import pandas as pd
 
-from exercise_log.dataloader import CName, DataBox
+from exercise_log.dataloader import CName, DataBox, Dataset
+from exercise_log.dataloader.shared import SharedFrames, SharedFramesHandle, attach_frames
 from exercise_log.strength import Exercise
+from exercise_log.strength.progress import StrengthProgress
 from exercise_log.trend import HealthTrends
 from exercise_log.utils import TermColour
 from exercise_log.vis import (
     PlotOptions,
+    get_exercise_fname,
+    init_plotting,
+    plot_exercise_progress,
     plot_resting_heart_rate,
-    plot_strength_over_time,
     plot_weight,
     plot_workout_frequency,
 )
+from exercise_log.vis.export import EXPORT_FORMATS, PNG_FORMAT
+from exercise_log.vis.manifest import RenderManifest, hash_inputs
 
 ROOT_DATA_DIR = "../../data"
 ROOT_IMG_DIR = "../../img"
 PREDS_DIR = f"{ROOT_DATA_DIR}/preds"
+CACHE_DIR = f"{ROOT_DATA_DIR}/.cache"
 EXTRAPOLATE_DAYS = 100
 N_DAYS_TO_AVG = 28
 
@@ -43,57 +56,297 @@ SKIP_EXERCISE_PLOT_EXERCISES = {
     Exercise.SQUAT_WALKOUT,
 }
 
+STRENGTH_WORKERS_ENV_VAR = "EXERCISE_LOG_STRENGTH_WORKERS"
+BOOTSTRAP_WORKERS_ENV_VAR = "EXERCISE_LOG_BOOTSTRAP_WORKERS"
+PLOT_FORMATS_ENV_VAR = "EXERCISE_LOG_PLOT_FORMATS"
 
-def build_health_visuals(health_trends: HealthTrends) -> None:
-    """Build and save health metric visuals including workout frequency, resting heart rate, and weight."""
-    options = PlotOptions(export_dir=ROOT_IMG_DIR, show_plot=False)
-    print("Plotting workout frequency..")
-    plot_workout_frequency(health_trends.get_workout_durations(), N_DAYS_TO_AVG, options)
-    print("Plotting resting heart rate..")
-    plot_resting_heart_rate(health_trends.health_metrics, health_trends.get_heart_rate_trendline(), options)
-    print("Plotting weight..")
-    plot_weight(health_trends.health_metrics, health_trends.get_weight_trendline(), options)
+# The strength progress that a plotting worker attached to when it started (see _init_strength_worker)
+PROGRESS = "progress"
+_worker_state: dict[str, StrengthProgress] = {}
+
+
+@dataclass(frozen=True)
+class StrengthPlotResult:
+    """What a plotting worker sends back once it's done with an exercise."""
+
+    exercise: str
+    # Why the exercise wasn't plotted, or None if it was
+    skip_reason: Optional[str]
+    # The peak RSS of the worker so far, in bytes
+    peak_rss: int
+
+
+def build_health_visuals(health_trends: HealthTrends, manifest: Optional[RenderManifest] = None) -> None:
+    """
+    Build and save health metric visuals including workout frequency, resting heart rate, and weight.
+
+    Args:
+        health_trends (HealthTrends): The health trends to plot
+        manifest (Optional[RenderManifest]): If given, visuals whose inputs haven't changed since they were last
+            rendered are skipped
+    """
+    options = get_plot_options()
+    plots = {
+        "workout frequency": (
+            "workout_frequency.png",
+            partial(plot_workout_frequency, health_trends.get_workout_durations(), N_DAYS_TO_AVG, options),
+        ),
+        "resting heart rate": (
+            "resting_heart_rate.png",
+            partial(
+                plot_resting_heart_rate,
+                health_trends.health_metrics,
+                health_trends.get_heart_rate_trendline(),
+                options,
+                confidence_band=health_trends.get_heart_rate_confidence_band(),
+            ),
+        ),
+        "weight": (
+            "weight.png",
+            partial(
+                plot_weight,
+                health_trends.health_metrics,
+                health_trends.get_weight_trendline(),
+                options,
+                confidence_band=health_trends.get_weight_confidence_band(),
+            ),
+        ),
+    }
+    for name, (fname, plot) in plots.items():
+        print(f"Plotting {name}..")
+        if manifest is None:
+            plot()
+        elif not manifest.render(options.get_export_fnames(fname), plot):
+            print(f"  Unchanged, skipped {fname}.")
     print("Done plotting health metrics.")
 
 
-def build_strength_visuals(workouts: pd.DataFrame, sets: pd.DataFrame) -> None:
-    """Build and save the strength metric visuals for each individual exercise. Runs them in parallel."""
-    num_workers = 5 * os.cpu_count()  # Should be a little faster if hyperthreading is enabled
-    with Pool(num_workers) as p:
-        partial_plot_strength = partial(plot_single_strength_visual, workouts=workouts, sets=sets)
-        print("Loading strength sets data..")
-        p.map(partial_plot_strength, sets[CName.EXERCISE].unique())
-    print("Done plotting strength metrics.")
+def build_strength_visuals(
+    workouts: pd.DataFrame,
+    sets: pd.DataFrame,
+    num_workers: Optional[int] = None,
+    manifest: Optional[RenderManifest] = None,
+) -> None:
+    """
+    Build and save the strength metric visuals for each individual exercise. Runs them in parallel.
+
+    The strength progress of every exercise is prepared once up front then published into shared memory rather than
+    being pickled for every exercise. Each worker attaches to it and sets up matplotlib once when it starts, then it's
+    handed one exercise at a time. The exercises with the most sets are handed out first so that the slowest plots
+    don't end up running alone at the end. Progress is printed as each plot finishes, followed by the wall time and
+    peak RSS of the run.
 
+    Args:
+        workouts (pd.DataFrame): The weight training workouts
+        sets (pd.DataFrame): The weight training sets
+        num_workers (Optional[int]): How many worker processes to plot with, see get_num_strength_workers() for the
+            default. With a single worker everything is plotted in this process instead.
+        manifest (Optional[RenderManifest]): If given, exercises whose inputs haven't changed since they were last
+            rendered are skipped
+    """
+    start = time.perf_counter()
+    num_workers = num_workers or get_num_strength_workers()
+    options = get_plot_options()
+    print("Loading strength sets data..")
+    progress = StrengthProgress.prepare(workouts, sets, PRIMARY_GYMS)
 
-def plot_single_strength_visual(exercise: str, workouts: pd.DataFrame, sets: pd.DataFrame) -> None:
-    """Plot the strength metric visual for the given exercise."""
-    if exercise in SKIP_EXERCISE_PLOT_EXERCISES:
+    exercises, skipped = get_strength_exercises(sets)
+    for exercise in skipped:
         print(f"Manually skipping {exercise}.")
-        return
 
-    print(f"Plotting {exercise}... ", end="")
-    try:
-        options = PlotOptions(export_dir=ROOT_IMG_DIR, show_plot=False)
-        plot_strength_over_time(
-            workouts,
-            sets,
-            exercise,
-            PRIMARY_GYMS,
-            options,
+    inputs_hashes = {}
+    if manifest is not None:
+        # Only which gyms are primary affects the plots, not until when (see the TODO in StrengthProgress.prepare)
+        for exercise in exercises:
+            inputs_hashes[exercise] = hash_inputs(progress.get_exercise(exercise), sorted(PRIMARY_GYMS), options)
+        exercises = [
+            e
+            for e in exercises
+            if not manifest.is_current(options.get_export_fnames(get_exercise_fname(e)), inputs_hashes[e])
+        ]
+        print(f"Skipping {len(inputs_hashes) - len(exercises)} unchanged exercises.")
+
+    num_workers = min(num_workers, len(exercises))
+    results = []
+    if num_workers == 1:
+        init_plotting()
+        results = _report_strength_progress(
+            (_plot_strength_visual(exercise, progress) for exercise in exercises),
+            len(exercises),
         )
-        print("done.")
+    elif num_workers > 1:
+        with (
+            SharedFrames(progress.get_tables()) as shared,
+            Pool(num_workers, initializer=_init_strength_worker, initargs=(shared.handle,)) as p,
+        ):
+            results = _report_strength_progress(
+                p.imap_unordered(_plot_shared_strength_visual, exercises, chunksize=1),
+                len(exercises),
+            )
+    if manifest is not None:
+        for result in results:
+            if result.skip_reason is None:
+                fnames = options.get_export_fnames(get_exercise_fname(result.exercise))
+                manifest.record(fnames, inputs_hashes[result.exercise])
+
+    msg = f"Done plotting strength metrics in {time.perf_counter() - start:.1f}s with {num_workers} worker(s)"
+    msg += f", peak RSS {_get_peak_rss() / 2**20:.0f}MB"
+    if num_workers > 1:
+        msg += f" ({max(result.peak_rss for result in results) / 2**20:.0f}MB in the largest worker)"
+    print(f"{msg}.")
+
+
+def get_strength_exercises(sets: pd.DataFrame) -> tuple[list[str], list[str]]:
+    """
+    Get the exercises to plot, longest job first since the number of sets is a good proxy for how long one takes.
+
+    Args:
+        sets (pd.DataFrame): The weight training sets
+    Returns:
+        The exercises to plot and the ones that are manually skipped (see SKIP_EXERCISE_PLOT_EXERCISES), each ordered
+        from the most sets to the fewest
+    """
+    set_counts = sets.groupby(CName.EXERCISE, observed=True).size().sort_values(ascending=False, kind="stable")
+    exercises = [exercise for exercise in set_counts.index if exercise not in SKIP_EXERCISE_PLOT_EXERCISES]
+    skipped = [exercise for exercise in set_counts.index if exercise in SKIP_EXERCISE_PLOT_EXERCISES]
+    return exercises, skipped
+
+
+def get_plot_options() -> PlotOptions:
+    """
+    Get the options that every visual is plotted with.
+
+    The visuals are exported as PNGs unless the EXERCISE_LOG_PLOT_FORMATS environment variable lists other formats
+    (comma-separated, see exercise_log.vis.export), e.g. "json,svg" for the web site to draw the charts itself.
+
+    Raises:
+        ValueError: If one of the listed formats isn't supported
+    """
+    export_formats = tuple(
+        export_format.strip().lower()
+        for export_format in os.environ.get(PLOT_FORMATS_ENV_VAR, PNG_FORMAT).split(",")
+        if export_format.strip()
+    )
+    unknown = [export_format for export_format in export_formats if export_format not in EXPORT_FORMATS]
+    if unknown or not export_formats:
+        msg = f"Invalid {PLOT_FORMATS_ENV_VAR}, expected a comma-separated list of {', '.join(EXPORT_FORMATS)}"
+        raise ValueError(msg)
+    return PlotOptions(export_dir=ROOT_IMG_DIR, show_plot=False, export_formats=export_formats)
+
+
+def _get_num_workers(env_var: str) -> int:
+    """
+    Get how many worker processes to use, from the environment variable if it's set or else one per usable CPU.
+
+    Raises:
+        ValueError: If the environment variable isn't a whole number, anything less than 1 means a single worker
+    """
+    if num_workers := os.environ.get(env_var, "").strip():
+        try:
+            return max(1, int(num_workers))
+        except ValueError:
+            msg = f"Invalid {env_var}, expected a whole number of workers but got {num_workers!r}"
+            raise ValueError(msg) from None
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_num_strength_workers() -> int:
+    """
+    Get how many worker processes to plot the strength visuals with.
+
+    It's read from the EXERCISE_LOG_STRENGTH_WORKERS environment variable if it's set, otherwise it's one per CPU that
+    this process can run on. Plotting is CPU-bound so any more than that just adds overhead.
+    """
+    return _get_num_workers(STRENGTH_WORKERS_ENV_VAR)
+
+
+def get_num_bootstrap_workers() -> int:
+    """
+    Get how many worker processes to bootstrap the confidence bands of the health trends with.
+
+    It's read from the EXERCISE_LOG_BOOTSTRAP_WORKERS environment variable if it's set, otherwise it's one per CPU that
+    this process can run on.
+    """
+    return _get_num_workers(BOOTSTRAP_WORKERS_ENV_VAR)
+
+
+def _report_strength_progress(results: Iterable[StrengthPlotResult], num_exercises: int) -> list[StrengthPlotResult]:
+    """Print each plot's result as soon as it finishes. Returns all of the results once they're done."""
+    reported = []
+    for i, result in enumerate(results, start=1):
+        prefix = f"[{i}/{num_exercises}] Plotting {result.exercise}... "
+        if result.skip_reason is None:
+            print(f"{prefix}done.")
+        else:
+            TermColour.print_warning(f"{prefix}SKIPPED: {result.skip_reason}.")
+        reported.append(result)
+    return reported
+
+
+def _get_peak_rss() -> int:
+    """Get the peak resident set size of this process in bytes."""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # It's in bytes on macOS but in kilobytes everywhere else
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _init_strength_worker(handle: SharedFramesHandle) -> None:
+    """Set up a plotting worker when it starts: load matplotlib's fonts and attach to the shared strength progress."""
+    init_plotting()
+    _worker_state[PROGRESS] = StrengthProgress(**attach_frames(handle))
+
+
+def _plot_shared_strength_visual(exercise: str) -> StrengthPlotResult:
+    """Plot the strength metric visual for the given exercise using the strength progress the worker attached to."""
+    return _plot_strength_visual(exercise, _worker_state[PROGRESS])
+
+
+def _plot_strength_visual(exercise: str, progress: StrengthProgress) -> StrengthPlotResult:
+    skip_reason = plot_single_strength_visual(exercise, progress)
+    return StrengthPlotResult(exercise, skip_reason, _get_peak_rss())
+
+
+def plot_single_strength_visual(exercise: str, progress: StrengthProgress) -> Optional[str]:
+    """
+    Plot the strength metric visual for the given exercise.
+
+    Returns:
+        Why the visual was skipped, or None if it was plotted
+    """
+    try:
+        plot_exercise_progress(progress.get_exercise(exercise), get_plot_options())
     except ValueError as ve:
-        TermColour.print_warning(f"SKIPPED: {ve}.")
+        return str(ve)
+    return None
 
 
 def main() -> None:
     """Execute the data loading to metric visualization pipeline."""
     # Load data, build graphs, make predictions, save results
-    databox = DataBox(ROOT_DATA_DIR)
-    health_trends = HealthTrends(databox.get_all_workouts(), databox.get_health_metrics(), PREDS_DIR)
-    build_health_visuals(health_trends)
-    build_strength_visuals(databox.get_weight_training_workouts(), databox.get_weight_training_sets())
+    databox = DataBox(
+        ROOT_DATA_DIR,
+        cache_dir=CACHE_DIR,
+        columns={Dataset.HEALTH_METRICS: HealthTrends.HEALTH_METRICS_COLUMNS},
+        categorical=True,
+    )
+    print("Loading datasets..")
+    for dataset, seconds in databox.preload().items():
+        print(f"  {dataset}: {seconds * 1000:.1f}ms")
+    health_trends = HealthTrends(
+        databox.get_all_workouts(),
+        databox.get_health_metrics(),
+        PREDS_DIR,
+        EXTRAPOLATE_DAYS,
+        num_workers=get_num_bootstrap_workers(),
+    )
+    manifest = RenderManifest(ROOT_IMG_DIR)
+    build_health_visuals(health_trends, manifest)
+    build_strength_visuals(
+        databox.get_weight_training_workouts(), databox.get_weight_training_sets(), manifest=manifest
+    )
+    manifest.save()
     health_trends.save_predictions()
 
 
@@ -0,0 +1,148 @@
+"""
+Prepares the strength progress of every exercise (its heaviest set of each SetType per day) in a single pass.
+
+Everything that doesn't depend on the exercise (which sets are eligible, which SetType each set counts towards and the
+heaviest of them per day) is computed once over all of the sets. Each exercise's progress is then a slice of the result.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.dataloader.categorical import is_in, map_values, starts_with
+from exercise_log.dataloader.query import RowFilter, RowIndex
+from exercise_log.strength import SetRating, SetType
+from exercise_log.strength.ontology import ExerciseInfo
+
+SET_TYPE = "set_type"
+MIN_WEIGHT = "min_weight(lbs)"
+MAX_WEIGHT = "max_weight(lbs)"
+
+IGNORED_RATINGS = (SetRating.WARMUP, SetRating.FUN, SetRating.DELOAD)
+IGNORED_RATING_PREFIXES = (SetRating.BAD, SetRating.FAILURE)
+
+
+@dataclass(frozen=True)
+class ExerciseProgress:
+    """The strength progress of a single exercise, a slice of the StrengthProgress of every exercise."""
+
+    exercise: str
+    # The heaviest eligible set of each SetType per day, ordered by SetType then date
+    daily_bests: pd.DataFrame
+    # The lightest and heaviest weights of all of the exercise's sets, eligible or not
+    weight_range: tuple[float, float]
+    # The first and last days with a workout at a primary gym
+    workout_dates: pd.DataFrame
+
+
+@dataclass
+class StrengthProgress:
+    """
+    The strength progress of every exercise, see prepare() for how it's computed.
+
+    It's made up of plain DataFrames (see get_tables()) so it can be rebuilt from them, e.g. after they've been shared
+    with another process.
+    """
+
+    # The heaviest eligible set of each SetType per day for every exercise, ordered by exercise, SetType then date
+    daily_bests: pd.DataFrame
+    # The lightest and heaviest weights of each exercise's sets
+    weight_ranges: pd.DataFrame
+    # The first and last days with a workout at a primary gym
+    workout_dates: pd.DataFrame
+    _row_index: Optional[RowIndex] = field(default=None, init=False, repr=False)
+    _weight_ranges: Optional[dict[str, tuple[float, float]]] = field(default=None, init=False, repr=False)
+
+    @classmethod
+    def prepare(
+        cls,
+        workouts: pd.DataFrame,
+        weight_training_sets: pd.DataFrame,
+        primary_gyms: dict[str, tuple[date, date]],
+    ) -> "StrengthProgress":
+        """
+        Prepare the strength progress of every exercise in one pass over the sets.
+
+        A set is eligible if its rating isn't ignored (warm-ups, bad sets, etc), it was done on a day with a workout at
+        a primary gym and, if the exercise requires a machine, it was done at that gym. Each eligible set counts
+        towards every SetType whose rep range it's in.
+
+        Args:
+            workouts (pd.DataFrame): The weight training workouts, sorted by date
+            weight_training_sets (pd.DataFrame): The weight training sets, sorted by date
+            primary_gyms (dict[str, tuple[date, date]]): The primary gyms along with when they were primary
+        Returns:
+            The prepared StrengthProgress
+        """
+        sets = weight_training_sets
+        # The filters below run on the integer codes when the text columns are Categorical
+        ratings = sets[CName.RATING]
+        is_ignored = is_in(ratings, IGNORED_RATINGS)
+        for prefix in IGNORED_RATING_PREFIXES:
+            is_ignored = is_ignored | starts_with(ratings, prefix)
+        requires_machine = map_values(
+            sets[CName.EXERCISE],
+            lambda name: ExerciseInfo(name).requires_machine,
+            dtype=bool,
+        )
+
+        # Filter out sets using machines in non-primary gyms
+        workouts = workouts[is_in(workouts[CName.LOCATION], primary_gyms)]
+        # TODO(eric): also filter out sets that are from a primary gym but *not* in the time period when it was primary
+        in_primary_gym = sets[CName.DATE].isin(workouts[CName.DATE]).to_numpy()
+        is_eligible = ~is_ignored & (in_primary_gym | ~requires_machine)
+        # Only days with a workout at a primary gym are plotted
+        is_eligible &= in_primary_gym
+        # A set without a weight can never be the heaviest one
+        is_eligible &= sets[CName.WEIGHT].notna().to_numpy()
+        eligible = sets.loc[is_eligible, [CName.EXERCISE, CName.DATE, CName.REPS, CName.WEIGHT]]
+
+        # Bucket the sets by SetType, a set goes in every bucket whose rep range it's in
+        buckets = []
+        set_types = pd.CategoricalDtype(list(SetType))
+        for code, set_type in enumerate(SetType):
+            low, high = set_type.get_rep_range()
+            bucket = eligible[(low <= eligible[CName.REPS]) & (eligible[CName.REPS] <= high)]
+            set_type_codes = np.full(len(bucket), code)
+            buckets.append(bucket.assign(**{SET_TYPE: pd.Categorical.from_codes(set_type_codes, dtype=set_types)}))
+        bucketed = pd.concat(buckets, ignore_index=True)
+
+        # Keep only the heaviest set of each type per day (the first one when there's a tie)
+        groups = bucketed.groupby([CName.EXERCISE, SET_TYPE, CName.DATE], observed=True, sort=True)
+        best_rows = groups[CName.WEIGHT].idxmax().to_numpy()
+        daily_bests = bucketed.loc[best_rows, [CName.EXERCISE, SET_TYPE, CName.DATE, CName.WEIGHT]].reset_index(
+            drop=True
+        )
+
+        weights = sets.groupby(CName.EXERCISE, observed=True)[CName.WEIGHT]
+        weight_ranges = pd.DataFrame({MIN_WEIGHT: weights.min(), MAX_WEIGHT: weights.max()}).reset_index()
+        workout_dates = pd.DataFrame({CName.DATE: [workouts[CName.DATE].iloc[0], workouts[CName.DATE].max()]})
+        return cls(daily_bests, weight_ranges, workout_dates)
+
+    def get_tables(self) -> dict[str, pd.DataFrame]:
+        """Get the DataFrames that make up this StrengthProgress by name, StrengthProgress(**tables) rebuilds it."""
+        return {
+            "daily_bests": self.daily_bests,
+            "weight_ranges": self.weight_ranges,
+            "workout_dates": self.workout_dates,
+        }
+
+    def get_exercise(self, exercise: str) -> ExerciseProgress:
+        """Get the strength progress of a single exercise in O(log n + k) time rather than a scan of every row."""
+        if self._row_index is None:
+            self._row_index = RowIndex(self.daily_bests)
+        if self._weight_ranges is None:
+            self._weight_ranges = dict(
+                zip(
+                    self.weight_ranges[CName.EXERCISE],
+                    zip(self.weight_ranges[MIN_WEIGHT], self.weight_ranges[MAX_WEIGHT], strict=True),
+                    strict=True,
+                ),
+            )
+        daily_bests = self._row_index.select(RowFilter(exercise=exercise))
+        weight_range = self._weight_ranges.get(exercise, (np.nan, np.nan))
+        return ExerciseProgress(exercise, daily_bests, weight_range, self.workout_dates)
@@ -2,7 +2,9 @@
 
 from abc import ABC, abstractmethod
 from collections.abc import Callable
-from datetime import UTC, date, datetime, timedelta
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -10,11 +12,23 @@ from scipy.ndimage import uniform_filter1d
 from scipy.optimize import curve_fit
 
 from exercise_log.dataloader import CName
+from exercise_log.dataloader.query import slice_dates
+from exercise_log.trend.bootstrap import BOOTSTRAP_SEED, bootstrap_curve, bootstrap_lines
+from exercise_log.trend.changepoint import find_datespans
+from exercise_log.trend.linear import RunningLine, fit_lines, fit_segments
+from exercise_log.trend.rolling import compute_rolling_stats
+from exercise_log.trend.state import TrendState, get_state_key, hash_readings
 from exercise_log.utils import TermColour, get_padded_dates, pairwise
 
 EXTRAPOLATE_DAYS = 100
 MIN_DAILY_ACTIVE_MINUTES = 22.5  # Weekly is 150, this is about 150/7
 N_DAYS_TO_AVG = 8
+# Where the state of each trend is kept between updates, in the predictions directory
+WEIGHT_TREND_STATE_FNAME = ".weight_trend_state.json"
+HEART_RATE_TREND_STATE_FNAME = ".resting_heart_rate_trend_state.json"
+# The seeds of the bootstrap resamples of the fixed datespans and of the last one, so that they're drawn independently
+FIXED_BAND_SEED = (BOOTSTRAP_SEED, 0)
+LAST_BAND_SEED = (BOOTSTRAP_SEED, 1)
 
 
 class Trendsetter:
@@ -27,7 +41,7 @@ class Trendsetter:
 
     @staticmethod
     def _f_affine(t: float, a: float, b: float) -> float:
-        """Define a linear function to be fit using Scipy's curve_fit (using the variables given)."""
+        """Define a linear function (using the variables given), its variables are fit in closed form by fit_lines."""
         return a * t + b
 
     @staticmethod
@@ -41,6 +55,24 @@ class Trendsetter:
         padded_dates = get_padded_dates(df, num_days_to_extrapolate)
         return f_to_fit(padded_dates.index, *fitted_params).to_numpy()
 
+    @staticmethod
+    def get_days_x(df: pd.DataFrame, start_date: pd.Timestamp, end_date: pd.Timestamp) -> np.ndarray:
+        """
+        Get the x values to evaluate a curve fit to the given data at, for each day of a span of dates.
+
+        Like the padded dates of get_padded_dates(), the x values count days from the first row of the DataFrame so the
+        span can start and end on days without a row, or outside of the DataFrame entirely.
+
+        Args:
+            df (pd.DataFrame): The data that the curve was fit to, the x value of each row is its index
+            start_date (pd.Timestamp): The first day of the span
+            end_date (pd.Timestamp): The day after the last day of the span
+        Returns:
+            An np.ndarray of the x value of each day
+        """
+        first_index, first_date = df.index[0], df[CName.DATE].iloc[0]
+        return first_index + np.arange((start_date - first_date).days, (end_date - first_date).days)
+
     @staticmethod
     def compute_n_sample_avg(data: pd.DataFrame, field: str, n_days_to_avg: int) -> np.ndarray:
         """Compute an average over the most recent N samples."""
@@ -49,7 +81,7 @@ class Trendsetter:
     @staticmethod
     def fit_linear(df: pd.DataFrame, field: str) -> np.ndarray:
         """
-        Compute the line of best fit for the given field.
+        Compute the line of best fit for the given field. It's solved in closed form, see exercise_log.trend.linear.
 
         Args:
             df (pd.DataFrame): The data to fit. It must contain a column with the name of the given field.
@@ -59,8 +91,7 @@ class Trendsetter:
                 m (float): The slope of the line of best fit
                 b (float): The y-intercept of the line of best fit
         """
-        (m, b), _ = curve_fit(Trendsetter._f_affine, df.index, df[field])
-        return m, b
+        return fit_lines(df.index, df[field])[0]
 
     @staticmethod
     def fit_logarithmic(df: pd.DataFrame, field: str) -> np.ndarray:
@@ -88,9 +119,26 @@ class Trendsetter:
         Returns:
             An np.ndarray of values that belong to the trendline
         """
-        nonnulls = df[df[field].notna()]
-        fitted_params = Trendsetter.fit_linear(nonnulls, field)
-        return Trendsetter._get_curve_of_best_fit(nonnulls, Trendsetter._f_affine, fitted_params, extrapolate_days)
+        return Trendsetter.get_lines_of_best_fit([df], field, [extrapolate_days])[0]
+
+    @staticmethod
+    def get_lines_of_best_fit(dfs: list[pd.DataFrame], field: str, extrapolate_days: list[int]) -> list[np.ndarray]:
+        """
+        Fit a linear trendline to the given field of each DataFrame, fitting all of them in a single batch.
+
+        Args:
+            dfs (list[pd.DataFrame]): The data to fit, each must contain a column with the name of the given field
+            field (str): The column name to fit
+            extrapolate_days (list[int]): The number of days to extrapolate each trend until
+        Returns:
+            An np.ndarray of values that belong to each trendline
+        """
+        nonnulls = [df[df[field].notna()] for df in dfs]
+        fits = fit_segments((df.index, df[field]) for df in nonnulls)
+        return [
+            Trendsetter._get_curve_of_best_fit(df, Trendsetter._f_affine, fits[i], days)
+            for i, (df, days) in enumerate(zip(nonnulls, extrapolate_days, strict=True))
+        ]
 
     @staticmethod
     def get_logarithmic_curve_of_best_fit(df: pd.DataFrame, field: str, extrapolate_days: int = 0) -> np.ndarray:
@@ -110,146 +158,268 @@ class Trendsetter:
 
 
 class Trend(ABC):
-    """An abstract class that uses datespans, a dataset, and a number of days to extrapolate to fit a trend."""
+    """
+    An abstract class that uses datespans, a dataset, and a number of days to extrapolate to fit a trend.
+
+    The last datespan is always fit linearly and extrapolated. It's the only one that new readings are added to, so its
+    line of best fit is kept as a RunningLine in a TrendState (along with the trendline of every datespan before it) and
+    if a state_path is given, that TrendState is saved there and reused by the next update while its datespans stay the
+    same. That way each new reading only costs an O(1) update to the fit instead of refitting the whole trend. Checking
+    that the saved state still matches the readings hashes all of them, so an update as a whole still takes O(n) time
+    (as does finding the datespans, see HealthTrends), just in vectorized passes rather than a refit.
+
+    Its confidence band comes from a residual bootstrap of each datespan's fit, see exercise_log.trend.bootstrap.
+    """
+
+    # The column that this Trend fits
+    FIELD: str
+    # The datespans after the first are fit from this many days before they start so they join the one before cleanly
+    LOOKBACK_DAYS: int
 
-    def __init__(self, datespans: list[date], health_metrics: pd.DataFrame, extrapolate_days: int) -> None:
+    def __init__(
+        self,
+        datespans: list[date],
+        health_metrics: pd.DataFrame,
+        extrapolate_days: int,
+        state_path: Optional[str] = None,
+        num_workers: int = 1,
+    ) -> None:
         """Initialize this Trend with the relevant data. The trendline itself is computed lazily."""
         self.datespans = [pd.to_datetime(d) for d in datespans]
         self.health_metrics = health_metrics
         self.extrapolate_days = extrapolate_days
+        self.state_path = state_path
+        self.num_workers = num_workers
 
+        self._state = None
         self._trendline = None
+        self._confidence_band = None
 
     @abstractmethod
-    def get_trendline(self) -> pd.DataFrame:
-        """Retrieve this Trend's trendline, computing it if necessary. Must be implemented by child classes."""
+    def get_fixed_trendline(self) -> np.ndarray:
+        """
+        Compute the trendline of every datespan before the last one, with one value for each day from the first date
+        until the day before the last datespan starts. Must be implemented by child classes.
+        """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_fixed_band(self) -> np.ndarray:
+        """
+        Compute the confidence band of the trendline of every datespan before the last one, of shape (2, the length of
+        the fixed trendline). Must be implemented by child classes.
+        """
+        raise NotImplementedError
 
-class WeightTrend(Trend):
-    """A Trend that predicts weight over time. Assumes each datespan contains a linear pattern of weight change."""
-
-    def __init__(self, datespans: list[tuple[date]], health_metrics: pd.DataFrame, extrapolate_days: int) -> None:
-        """Initialize this WeightTrend. Removes any null rows from the health_metrics."""
-        nonnulls = health_metrics[health_metrics[CName.WEIGHT].notna()]
-        super().__init__(datespans, nonnulls, extrapolate_days)
+    def _get_last_start(self) -> pd.Timestamp:
+        return self.datespans[-2] - timedelta(days=self.LOOKBACK_DAYS)
+
+    def _get_last_slice(self) -> tuple[pd.DataFrame, np.ndarray]:
+        """Get the readings that the last datespan is fit to, and the x values of every day that it extrapolates to."""
+        last_slice = slice_dates(self.health_metrics, self._get_last_start(), self.datespans[-1])
+        end_date = self.datespans[-1] + timedelta(days=self.extrapolate_days)
+        return last_slice, Trendsetter.get_days_x(last_slice, self.datespans[-2], end_date)
+
+    def get_state(self) -> TrendState:
+        """Retrieve this Trend's TrendState, extending the saved one if it's still valid or fitting it otherwise."""
+        if self._state is None:
+            readings = self.health_metrics[[CName.DATE, self.FIELD]]
+            # The last datespan ends at the latest reading so it's left out, it moves with every new reading anyways
+            key = get_state_key(type(self).__name__, self.LOOKBACK_DAYS, self.datespans[:-1])
+            state = TrendState.load(self.state_path, key) if self.state_path is not None else None
+            if state is not None:
+                state = state.extend(readings, self.FIELD, self._get_last_start())
+            if state is None:
+                last_slice = slice_dates(readings, self._get_last_start(), self.datespans[-1])
+                line = RunningLine.from_points(last_slice.index, last_slice[self.FIELD])
+                fixed_trendline = self.get_fixed_trendline()
+                state = TrendState(key, len(readings), hash_readings(readings), fixed_trendline, line)
+            self._state = state
+        return self._state
+
+    def save_state(self) -> None:
+        """Save this Trend's TrendState so that the next update can extend it, if it has a state_path."""
+        if self.state_path is not None:
+            self.get_state().save(self.state_path)
 
     def get_trendline(self) -> pd.DataFrame:
-        """Retrieve this WeightTrend's trendline, computing it if necessary."""
+        """Retrieve this Trend's trendline, computing it if necessary."""
         if self._trendline is None:
-            cname = CName.WEIGHT
-            lookback_days = 10
-
-            # First section doesn't need a lookback
-            metrics_slice = self.health_metrics[self.health_metrics[CName.DATE].between(*self.datespans[0:2])]
-            y = [Trendsetter.get_line_of_best_fit(metrics_slice, cname)]
-            for start, end in pairwise(self.datespans[1:-1]):
-                start_date = start - timedelta(days=lookback_days)
-                end_date = end + timedelta(days=lookback_days)
-                metrics_slice = self.health_metrics[self.health_metrics[CName.DATE].between(start_date, end_date)]
-                line_of_fit = Trendsetter.get_line_of_best_fit(metrics_slice, cname)
-                y.append(line_of_fit[lookback_days:-lookback_days])
-
             # The last section extrapolates a trend
-            (start_date, end_date) = self.datespans[-2:]
-            start_date -= timedelta(days=lookback_days)
-            metrics_slice = self.health_metrics[self.health_metrics[CName.DATE].between(start_date, end_date)]
-            line_of_fit = Trendsetter.get_line_of_best_fit(metrics_slice, cname, self.extrapolate_days)
-            y.append(line_of_fit[lookback_days:])
+            _, x = self._get_last_slice()
+            last_line = self.get_state().line.to_fits().evaluate(x)
 
             # Combine all pieces into a single prediction
-            y = np.concatenate(y)
+            y = np.concatenate([self.get_state().fixed_trendline, last_line])
             padded_dates = get_padded_dates(self.health_metrics, self.extrapolate_days)
-            self._trendline = pd.DataFrame({CName.DATE: padded_dates, cname: y})
+            self._trendline = pd.DataFrame({CName.DATE: padded_dates, self.FIELD: y})
         return self._trendline
 
+    def get_confidence_band(self) -> pd.DataFrame:
+        """Retrieve the confidence band of this Trend's trendline, computing it if necessary."""
+        if self._confidence_band is None:
+            state = self.get_state()
+            if state.fixed_band is None:
+                state = self._state = replace(state, fixed_band=self.get_fixed_band())
+
+            # The last section's band changes with every reading so it's always bootstrapped, it's a single batch
+            last_slice, x = self._get_last_slice()
+            (last_band,) = bootstrap_lines([(last_slice.index, last_slice[self.FIELD], x)], seed=LAST_BAND_SEED)
+
+            band = np.concatenate([state.fixed_band, last_band], axis=1)
+            padded_dates = get_padded_dates(self.health_metrics, self.extrapolate_days)
+            column_dict = {CName.DATE: padded_dates, CName.LOWER_BOUND: band[0], CName.UPPER_BOUND: band[1]}
+            self._confidence_band = pd.DataFrame(column_dict)
+        return self._confidence_band
+
+
+class WeightTrend(Trend):
+    """A Trend that predicts weight over time. Assumes each datespan contains a linear pattern of weight change."""
+
+    FIELD = CName.WEIGHT
+    LOOKBACK_DAYS = 10
+
+    def __init__(
+        self,
+        datespans: list[tuple[date]],
+        health_metrics: pd.DataFrame,
+        extrapolate_days: int,
+        state_path: Optional[str] = None,
+        num_workers: int = 1,
+    ) -> None:
+        """Initialize this WeightTrend. Removes any null rows from the health_metrics."""
+        nonnulls = health_metrics[health_metrics[CName.WEIGHT].notna()]
+        super().__init__(datespans, nonnulls, extrapolate_days, state_path, num_workers)
+
+    def _get_fixed_slices(self) -> tuple[list[pd.DataFrame], list[tuple[pd.Timestamp, pd.Timestamp]]]:
+        """Get the readings that each datespan before the last one is fit to, and the span of dates that it covers."""
+        spans = list(pairwise(self.datespans[:-1]))
+        slices = []
+        for i, (start, end) in enumerate(spans):
+            # First section doesn't need a lookback, the rest also look ahead to join the next one cleanly
+            if i == 0:
+                slices.append(slice_dates(self.health_metrics, start, end))
+            else:
+                lookback = timedelta(days=self.LOOKBACK_DAYS)
+                slices.append(slice_dates(self.health_metrics, start - lookback, end + lookback))
+        return slices, spans
+
+    def get_fixed_trendline(self) -> np.ndarray:
+        """Compute the weight trendline of every datespan before the last one, fitting all of their lines in a batch."""
+        slices, spans = self._get_fixed_slices()
+
+        # Every section's line is fit in a single batch
+        fits = fit_segments((df.index, df[self.FIELD]) for df in slices)
+        y = [
+            fits.evaluate(Trendsetter.get_days_x(df, *span), i)
+            for i, (df, span) in enumerate(zip(slices, spans, strict=True))
+        ]
+        return np.concatenate([np.empty(0), *y])
+
+    def get_fixed_band(self) -> np.ndarray:
+        """Compute the confidence band of every datespan before the last one, bootstrapping all of them in a batch."""
+        slices, spans = self._get_fixed_slices()
+        segments = [
+            (df.index, df[self.FIELD], Trendsetter.get_days_x(df, *span))
+            for df, span in zip(slices, spans, strict=True)
+        ]
+        return np.concatenate([np.empty((2, 0)), *bootstrap_lines(segments, seed=FIXED_BAND_SEED)], axis=1)
+
 
 class HeartRateTrend(Trend):
     """
     A Trend that predicts resting heart rate (RHR) over time.
 
-    Assumes the first datespan covers a logarithmic decrease in RHR and subsequent datespans are linear patterns of
-    change. The first datespan is meant to capture the period of going from untrained to trained.
+    Assumes the first of its (up to) two datespans covers a logarithmic decrease in RHR and the second is a linear
+    pattern of change. The first datespan is meant to capture the period of going from untrained to trained, without it
+    the whole trend is linear.
+
+    There's better ways to fit the process of slowly becoming detrained or of becoming incrementally more trained but
+    this can be improved in the future.
     """
 
-    def __init__(self, datespans: list[tuple[date]], health_metrics: pd.DataFrame, extrapolate_days: int) -> None:
+    FIELD = CName.RESTING_HEART_RATE
+    LOOKBACK_DAYS = 100
+
+    def __init__(
+        self,
+        datespans: list[tuple[date]],
+        health_metrics: pd.DataFrame,
+        extrapolate_days: int,
+        state_path: Optional[str] = None,
+        num_workers: int = 1,
+    ) -> None:
         """Initialize this HeartRateTrend. Removes any null rows from the health_metrics."""
         nonnulls = health_metrics[health_metrics[CName.RESTING_HEART_RATE].notna()]
-        super().__init__(datespans, nonnulls, extrapolate_days)
-
-    def get_trendline(self) -> pd.DataFrame:
-        """
-        Retrieve the heart rate trendline, computing it if necessary.
-
-        First projects a log curve while going from untrained to trained, then projects linearly onward from there.
-
-        There's better ways to fit the process of slowly becoming detrained or of becoming incrementally more trained
-        but this can be improved in the future.
-        """
-        if self._trendline is None:
-            cname = CName.RESTING_HEART_RATE
-            lookback_days = 100
-            first_slice = self.health_metrics[self.health_metrics[CName.DATE].between(*self.datespans[0:2])]
-            untrained_to_trained = Trendsetter.get_logarithmic_curve_of_best_fit(first_slice, cname)
-
-            # Start fitting this section from a little before it starts so that it fits more cleanly.
-            span = (self.datespans[1] - timedelta(days=lookback_days), self.datespans[2])
-            second_slice = self.health_metrics[self.health_metrics[CName.DATE].between(*span)]
-            training = Trendsetter.get_line_of_best_fit(second_slice, cname, self.extrapolate_days)
-            training = training[lookback_days:]
-
-            # Combine both pieces into a single prediction
-            y = np.concatenate([untrained_to_trained, training])
-            padded_dates = get_padded_dates(self.health_metrics, self.extrapolate_days)
-            self._trendline = pd.DataFrame({CName.DATE: padded_dates, cname: y})
-        return self._trendline
+        super().__init__(datespans, nonnulls, extrapolate_days, state_path, num_workers)
+
+    def get_fixed_trendline(self) -> np.ndarray:
+        """Compute the log curve of the heart rate while going from untrained to trained."""
+        if len(self.datespans) < 3:  # noqa: PLR2004
+            return np.empty(0)
+        first_slice = slice_dates(self.health_metrics, *self.datespans[0:2])
+        fitted_params = Trendsetter.fit_logarithmic(first_slice, self.FIELD)
+        x = Trendsetter.get_days_x(first_slice, *self.datespans[0:2])
+        return Trendsetter._f_log_curve(x, *fitted_params)  # noqa: SLF001
+
+    def get_fixed_band(self) -> np.ndarray:
+        """Compute the confidence band of the log curve, refitting its resamples over num_workers processes."""
+        if len(self.datespans) < 3:  # noqa: PLR2004
+            return np.empty((2, 0))
+        first_slice = slice_dates(self.health_metrics, *self.datespans[0:2])
+        fitted_params = Trendsetter.fit_logarithmic(first_slice, self.FIELD)
+        return bootstrap_curve(
+            Trendsetter._f_log_curve,  # noqa: SLF001
+            first_slice.index,
+            first_slice[self.FIELD],
+            fitted_params,
+            Trendsetter.get_days_x(first_slice, *self.datespans[0:2]),
+            seed=FIXED_BAND_SEED,
+            num_workers=self.num_workers,
+        )
 
 
 class HealthTrends:
     """Creates relevant trendlines and stores the results."""
 
+    # The only health metrics columns that are needed, so the rest don't need to be loaded at all
+    HEALTH_METRICS_COLUMNS = (CName.DATE, CName.WEIGHT, CName.RESTING_HEART_RATE)
+
     def __init__(
         self,
         all_workouts: pd.DataFrame,
         health_metrics: pd.DataFrame,
         preds_dir: str,
         extrapolate_days: int = EXTRAPOLATE_DAYS,
+        num_workers: int = 1,
     ) -> None:
-        """Initialize this HealthTrends using the given data. The actual trends are computed lazily."""
+        """
+        Initialize this HealthTrends using the given data. The actual trends are computed lazily.
+
+        Args:
+            all_workouts (pd.DataFrame): Every day's workouts
+            health_metrics (pd.DataFrame): The weight and resting heart rate readings
+            preds_dir (str): The directory to save the predictions (and the state of the trends) in
+            extrapolate_days (int): The number of days to extrapolate the trends until
+            num_workers (int): The number of processes to bootstrap the confidence bands of non-linear trends with
+        """
         self.all_workouts = all_workouts
         self.health_metrics = health_metrics
         self.extrapolate_days = extrapolate_days
         self.preds_dir = preds_dir
 
-        fmt = "%Y-%m-%d"
-        first_weight_loss_end_date = datetime.strptime("2024-01-06", fmt).astimezone(UTC).date()
-        first_weight_maintenance_end_date = datetime.strptime("2024-03-05", fmt).astimezone(UTC).date()
-        second_weight_loss_end_date = datetime.strptime("2024-04-30", fmt).astimezone(UTC).date()
-
-        # Init the weight trend
-        nonnulls = self.health_metrics[self.health_metrics[CName.WEIGHT].notna()]
-        first_date = nonnulls[CName.DATE].min()
-        last_date = nonnulls[CName.DATE].max()
-        datespans = [
-            first_date,
-            first_weight_loss_end_date,
-            first_weight_maintenance_end_date,
-            second_weight_loss_end_date,
-            last_date,
-        ]
-        self._weight_trend = WeightTrend(datespans, self.health_metrics, self.extrapolate_days)
-
-        # Init the resting heart rate trend
-        nonnulls = self.health_metrics[self.health_metrics[CName.RESTING_HEART_RATE].notna()]
-        first_date = nonnulls[CName.DATE].min()
-        last_date = nonnulls[CName.DATE].max()
-        trained_date = datetime.strptime("2024-01-01", fmt).astimezone(UTC).date()
-        datespans = [
-            first_date,
-            trained_date,
-            last_date,
-        ]
-        self._heart_rate_trend = HeartRateTrend(datespans, self.health_metrics, self.extrapolate_days)
+        # Each trend's segments are found in its readings, so a new phase of training just shows up as a new segment
+        datespans = find_datespans(self.health_metrics, CName.WEIGHT)
+        state_path = f"{self.preds_dir}/{WEIGHT_TREND_STATE_FNAME}"
+        self._weight_trend = WeightTrend(datespans, self.health_metrics, self.extrapolate_days, state_path, num_workers)
+
+        # Only the first change of the resting heart rate is kept, it's the end of going from untrained to trained
+        datespans = find_datespans(self.health_metrics, CName.RESTING_HEART_RATE, HeartRateTrend.LOOKBACK_DAYS)
+        datespans = [*datespans[:-1][:2], datespans[-1]]
+        state_path = f"{self.preds_dir}/{HEART_RATE_TREND_STATE_FNAME}"
+        self._heart_rate_trend = HeartRateTrend(
+            datespans, self.health_metrics, self.extrapolate_days, state_path, num_workers
+        )
 
         self._workout_durations = None
 
@@ -257,6 +427,9 @@ class HealthTrends:
         """
         Access the n-day average workout duration, computing it if it hasn't been already.
 
+        Alongside it are the rolling statistics of the workout durations over each of the ROLLING_WINDOWS, i.e. the
+        mean daily duration, total duration, and number of active days over the trailing days (e.g. the last week).
+
         Note: n-day average gives a sense of whether its keeping above the recommended baseline of 150 mins/week
         """
         if self._workout_durations is None:
@@ -266,7 +439,8 @@ class HealthTrends:
                 CName.AVG_DURATION: data,
                 CName.DURATION: self.all_workouts[CName.DURATION],
             }
-            self._workout_durations = pd.DataFrame(column_dict)
+            rolling_stats = compute_rolling_stats(self.all_workouts, CName.DURATION)
+            self._workout_durations = pd.concat([pd.DataFrame(column_dict), rolling_stats], axis=1)
         return self._workout_durations
 
     def get_weight_trendline(self) -> pd.DataFrame:
@@ -277,6 +451,14 @@ class HealthTrends:
         """Access the logarithmic curve of best fit of resting heart rate over time, first computing it if needed."""
         return self._heart_rate_trend.get_trendline()
 
+    def get_weight_confidence_band(self) -> pd.DataFrame:
+        """Access the confidence band of the weight trendline, first computing it if needed."""
+        return self._weight_trend.get_confidence_band()
+
+    def get_heart_rate_confidence_band(self) -> pd.DataFrame:
+        """Access the confidence band of the resting heart rate trendline, first computing it if needed."""
+        return self._heart_rate_trend.get_confidence_band()
+
     def _save_data(self, data: pd.DataFrame, fname: str) -> None:
         """Save the given data, print an error if it fails."""
         if data is not None:
@@ -289,3 +471,7 @@ class HealthTrends:
         self._save_data(data=self.get_workout_durations(), fname="avg_workout_durations.csv")
         self._save_data(data=self.get_heart_rate_trendline(), fname="resting_heart_rate_trendline.csv")
         self._save_data(data=self.get_weight_trendline(), fname="weight_trendline.csv")
+        self._save_data(data=self.get_heart_rate_confidence_band(), fname="resting_heart_rate_confidence_band.csv")
+        self._save_data(data=self.get_weight_confidence_band(), fname="weight_confidence_band.csv")
+        self._heart_rate_trend.save_state()
+        self._weight_trend.save_state()
@@ -0,0 +1,160 @@
+"""
+Estimates how uncertain a trend is with a residual bootstrap, as a confidence band around its curve of best fit.
+
+Each resample keeps the fitted value at every x and adds one of the fit's residuals (drawn with replacement) to it, then
+the curve is refit to the resample. The band at each x covers the middle CONFIDENCE_LEVEL of the refit curves there.
+
+Lines are refit in closed form, so every resample of every segment is refit at once in a single batch (see
+exercise_log.trend.linear). Other curves have to be refit iteratively by curve_fit, so their resamples are split over a
+pool of processes. Each resample draws from its own seed, spawned from a single seed in order, so the resamples are the
+same no matter how many processes there are or how they're split between them.
+"""
+
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import numpy.typing as npt
+from scipy.optimize import curve_fit
+
+from exercise_log.trend.linear import fit_lines
+
+NUM_RESAMPLES = 1000
+# The fraction of the refit curves that a band covers
+CONFIDENCE_LEVEL = 0.95
+# The seed that every resample's seed is spawned from
+BOOTSTRAP_SEED = 0
+
+
+def get_band(curves: np.ndarray, confidence_level: float = CONFIDENCE_LEVEL) -> np.ndarray:
+    """
+    Get the band that covers the middle of the given curves.
+
+    Args:
+        curves (np.ndarray): The value of each curve at each x, of shape (number of curves, number of x values). Curves
+            that are NaN (e.g. they failed to fit) are ignored.
+        confidence_level (float): The fraction of the curves that the band covers at each x
+    Returns:
+        An np.ndarray of shape (2, number of x values) of the lower and upper bounds of the band at each x
+    """
+    tail = (1 - confidence_level) / 2
+    return np.nanquantile(curves, [tail, 1 - tail], axis=0)
+
+
+def _resample(y_fit: np.ndarray, residuals: np.ndarray, rng: np.random.Generator, num_resamples: int) -> np.ndarray:
+    """Resample a fit by adding residuals drawn with replacement to its fitted values, one resample per row."""
+    return y_fit + residuals[rng.integers(0, len(residuals), size=(num_resamples, len(residuals)))]
+
+
+def bootstrap_lines(
+    segments: Sequence[tuple[npt.ArrayLike, npt.ArrayLike, npt.ArrayLike]],
+    num_resamples: int = NUM_RESAMPLES,
+    seed: int | Sequence[int] = BOOTSTRAP_SEED,
+) -> list[np.ndarray]:
+    """
+    Get the confidence band of the line of best fit of each segment, refitting every resample of them in one batch.
+
+    Args:
+        segments (Sequence[tuple[npt.ArrayLike, npt.ArrayLike, npt.ArrayLike]]): The x and y values to fit a line to
+            for each segment and the x values to get its band at. Points where either x or y is NaN are ignored.
+        num_resamples (int): The number of resamples of each segment
+        seed (int | Sequence[int]): The seed to draw the resamples from
+    Returns:
+        The band of each segment (see get_band()), in order
+    """
+    rng = np.random.default_rng(seed)
+    points = []
+    for x_values, y_values, _ in segments:
+        x, y = np.asarray(x_values, dtype="float64"), np.asarray(y_values, dtype="float64")
+        is_valid = ~(np.isnan(x) | np.isnan(y))
+        points.append((x[is_valid], y[is_valid]))
+
+    # Pad every resample of every segment into a single batch of series, NaN padding is ignored by fit_lines
+    width = max((len(x) for x, _ in points), default=0)
+    x_batch = np.full((len(points) * num_resamples, width), np.nan)
+    y_batch = np.full((len(points) * num_resamples, width), np.nan)
+    for i, (x, y) in enumerate(points):
+        rows = slice(i * num_resamples, (i + 1) * num_resamples)
+        x_batch[rows, : len(x)] = x
+        y_fit = fit_lines(x, y).evaluate(x)
+        y_batch[rows, : len(x)] = _resample(y_fit, y - y_fit, rng, num_resamples)
+    fits = fit_lines(x_batch, y_batch)
+
+    bands = []
+    for i, (_, _, x_band) in enumerate(segments):
+        rows = slice(i * num_resamples, (i + 1) * num_resamples)
+        curves = fits.slopes[rows, None] * np.asarray(x_band, dtype="float64") + fits.intercepts[rows, None]
+        bands.append(get_band(curves))
+    return bands
+
+
+def _refit_curves(
+    seeds: Sequence[np.random.SeedSequence],
+    f_to_fit: Callable,
+    x: np.ndarray,
+    y_fit: np.ndarray,
+    residuals: np.ndarray,
+    fitted_params: tuple,
+    x_band: np.ndarray,
+) -> np.ndarray:
+    """Refit the curve to the resample drawn from each seed, and evaluate each refit curve at the band's x values."""
+    curves = np.full((len(seeds), len(x_band)), np.nan)
+    for i, seed in enumerate(seeds):
+        y = _resample(y_fit, residuals, np.random.default_rng(seed), 1)[0]
+        # curve_fit can try parameters that are out of the curve's domain (e.g. the log of a negative number) on its way
+        # to the fit, which just gives it NaNs to steer away from, and the refit curve itself can be NaN in places
+        with np.errstate(invalid="ignore", divide="ignore"):
+            try:
+                params, _ = curve_fit(f_to_fit, x, y, p0=fitted_params)
+            except RuntimeError:
+                # The resample didn't converge, so it's left out of the band
+                continue
+            curves[i] = f_to_fit(x_band, *params)
+    return curves
+
+
+def bootstrap_curve(
+    f_to_fit: Callable,
+    x: npt.ArrayLike,
+    y: npt.ArrayLike,
+    fitted_params: tuple,
+    x_band: npt.ArrayLike,
+    num_resamples: int = NUM_RESAMPLES,
+    seed: int | Sequence[int] = BOOTSTRAP_SEED,
+    num_workers: int = 1,
+) -> np.ndarray:
+    """
+    Get the confidence band of a curve of best fit, refitting its resamples with curve_fit over a pool of processes.
+
+    Args:
+        f_to_fit (Callable): The function that was fit, it must be picklable (e.g. defined at the top of a module)
+        x (npt.ArrayLike): The x values that the curve was fit to
+        y (npt.ArrayLike): The y values that the curve was fit to
+        fitted_params (tuple): The parameters of the curve of best fit, each resample's refit starts from them
+        x_band (npt.ArrayLike): The x values to get the band at
+        num_resamples (int): The number of resamples
+        seed (int | Sequence[int]): The seed that each resample's seed is spawned from
+        num_workers (int): The number of processes to refit the resamples in, 1 refits them in this process
+    Returns:
+        The band of the curve (see get_band())
+    """
+    x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+    y_fit = f_to_fit(x, *fitted_params)
+    refit = partial(
+        _refit_curves,
+        f_to_fit=f_to_fit,
+        x=x,
+        y_fit=y_fit,
+        residuals=y - y_fit,
+        fitted_params=tuple(fitted_params),
+        x_band=np.asarray(x_band, dtype="float64"),
+    )
+
+    seeds = np.random.SeedSequence(seed).spawn(num_resamples)
+    if num_workers <= 1:
+        return get_band(refit(seeds))
+    chunks = [seeds[i::num_workers] for i in range(num_workers)]
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        curves = np.concatenate(list(executor.map(refit, chunks)))
+    return get_band(curves)
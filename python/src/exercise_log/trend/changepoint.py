@@ -0,0 +1,175 @@
+"""
+Finds where a series changes from one linear trend to another, so that trends don't need hard-coded datespans.
+
+A segmentation costs the total squared error of fitting a line to each segment plus a penalty for each segment, and the
+changepoints are those of the cheapest segmentation. The squared error of a line through any range of points has a
+closed form in terms of a handful of sums (the same ones that exercise_log.trend.linear solves with), so with cumulative
+sums of them (a CostTable) the error of any range takes O(1) time and of many ranges, a single vectorized pass.
+
+Searching every segmentation exactly (e.g. with PELT) takes O(n^2) time for a series with long trends, which is what
+weights and heart rates are. Instead the search is done in two steps:
+    1. Binary segmentation with a fraction of the penalty proposes candidate changepoints, it splits each segment at
+        the point that most reduces its squared error for as long as that's worth even the reduced penalty. Every split
+        of a segment is tried at once, so this takes O(n log n) time.
+    2. The cheapest segmentation that only uses the candidates is found exactly, by dynamic programming over them.
+Step 2 undoes the greedy choices of step 1 that don't hold up, so the changepoints stay put as new readings are added
+rather than jumping around as binary segmentation's alone do.
+"""
+
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from exercise_log.dataloader import CName
+
+# The fewest points that a segment can have, so that a handful of unusual readings don't become a trend of their own
+MIN_SEGMENT_SIZE = 28
+# How much more a segment has to reduce the squared error than the noise alone would, see get_default_penalty(). Daily
+# readings drift around a trend for days at a time (e.g. water weight) so it's much more than a BIC penalty would be.
+PENALTY_SCALE = 64.0
+# Binary segmentation proposes candidates with the penalty divided by this, so that it proposes more than are needed
+CANDIDATE_PENALTY_DIVISOR = 16.0
+# The scale of the median absolute deviation relative to the standard deviation of normally distributed noise
+MAD_TO_STD = 1.4826
+
+
+class CostTable:
+    """
+    The cumulative sums needed to find the squared error of the line of best fit through any range of a series in O(1).
+
+    The series is centred first so that the sums stay precise even for large x values (e.g. day numbers).
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Initialize this CostTable by taking the cumulative sums of the given series."""
+        x, y = x - x.mean(), y - y.mean()
+        terms = np.stack([np.ones_like(x), x, y, x * x, x * y, y * y])
+        self._sums = np.zeros((len(terms), len(x) + 1))
+        np.cumsum(terms, axis=1, out=self._sums[:, 1:])
+
+    def get_costs(self, starts: npt.ArrayLike, ends: npt.ArrayLike) -> np.ndarray:
+        """
+        Get the squared error of the line of best fit through each range of points.
+
+        Args:
+            starts (npt.ArrayLike): The first position of each range, or of all of them
+            ends (npt.ArrayLike): The position after the last one of each range, or of all of them
+        Returns:
+            The residual sum of squares of each range's line of best fit, 0 for ranges of fewer than 3 points
+        """
+        starts, ends = np.broadcast_arrays(starts, ends)
+        n, sx, sy, sxx, sxy, syy = self._sums[:, ends] - self._sums[:, starts]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # The centred sums of squares and products of each range
+            cxx, cxy, cyy = sxx - sx * sx / n, sxy - sx * sy / n, syy - sy * sy / n
+            costs = cyy - np.where(cxx > 0, cxy * cxy / cxx, 0)
+        # Rounding can leave a perfect fit a hair below zero
+        return np.where(n > 2, np.maximum(costs, 0), 0)  # noqa: PLR2004
+
+
+def get_default_penalty(y: np.ndarray) -> float:
+    """
+    Get the penalty for adding a segment to a series of the given values, scaled to how noisy they are.
+
+    The noise is estimated from the differences between consecutive values, since those barely depend on the trend. It
+    uses the median absolute deviation so that outliers and the jumps between segments don't inflate it.
+    """
+    diffs = np.diff(y)
+    noise_var = (MAD_TO_STD * np.median(np.abs(diffs - np.median(diffs)))) ** 2 / 2
+    return PENALTY_SCALE * noise_var * np.log(len(y))
+
+
+def _propose_candidates(table: CostTable, num_points: int, min_size: int, penalty: float) -> list[int]:
+    """Propose changepoints by binary segmentation, splitting segments for as long as it's worth the penalty."""
+    candidates = []
+    segments = [(0, num_points)]
+    while segments:
+        start, end = segments.pop()
+        splits = np.arange(start + min_size, end - min_size + 1)
+        if len(splits) == 0:
+            continue
+        costs = table.get_costs(start, splits) + table.get_costs(splits, end)
+        best = int(np.argmin(costs))
+        if table.get_costs(start, end) - costs[best] > penalty:
+            split = int(splits[best])
+            candidates.append(split)
+            segments.extend([(start, split), (split, end)])
+    return sorted(candidates)
+
+
+def _choose_changepoints(table: CostTable, bounds: np.ndarray, min_size: int, penalty: float) -> list[int]:
+    """Find the cheapest segmentation whose segments start and end on the given bounds, by dynamic programming."""
+    # The cost of the cheapest segmentation of the points up to each bound, and where its last segment starts
+    costs = np.full(len(bounds), np.inf)
+    costs[0] = 0
+    previous = np.zeros(len(bounds), dtype="int64")
+    for j in range(1, len(bounds)):
+        (starts,) = np.nonzero((bounds[:j] <= bounds[j] - min_size) & np.isfinite(costs[:j]))
+        if len(starts) == 0:
+            continue
+        options = costs[starts] + table.get_costs(bounds[starts], bounds[j]) + penalty
+        best = int(np.argmin(options))
+        costs[j], previous[j] = options[best], starts[best]
+
+    changepoints = []
+    j = int(previous[-1])
+    while j > 0:
+        changepoints.append(int(bounds[j]))
+        j = int(previous[j])
+    return changepoints[::-1]
+
+
+def find_changepoints(
+    x: npt.ArrayLike,
+    y: npt.ArrayLike,
+    min_size: int = MIN_SEGMENT_SIZE,
+    penalty: Optional[float] = None,
+) -> list[int]:
+    """
+    Find the points where a series changes from one linear trend to another.
+
+    Args:
+        x (npt.ArrayLike): The x values of the series, in increasing order
+        y (npt.ArrayLike): The y values of the series, without any NaN
+        min_size (int): The fewest points that a segment can have
+        penalty (Optional[float]): The cost of each segment, in units of squared error. By default it's scaled to how
+            noisy the series is (see get_default_penalty()).
+    Returns:
+        The position of the first point of every segment after the first, in increasing order
+    Raises:
+        ValueError: If x and y have different shapes
+    """
+    x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+    if x.shape != y.shape:
+        msg = f"x and y must have the same shape, got {x.shape} and {y.shape}"
+        raise ValueError(msg)
+    if len(y) < 2 * min_size:
+        return []
+    if penalty is None:
+        penalty = get_default_penalty(y)
+
+    table = CostTable(x, y)
+    candidates = _propose_candidates(table, len(y), min_size, penalty / CANDIDATE_PENALTY_DIVISOR)
+    bounds = np.array([0, *candidates, len(y)])
+    return _choose_changepoints(table, bounds, min_size, penalty)
+
+
+def find_datespans(readings: pd.DataFrame, field: str, min_size: int = MIN_SEGMENT_SIZE) -> list[pd.Timestamp]:
+    """
+    Find the datespans of a trend of the given readings, i.e. the dates that each linear segment of it starts on.
+
+    Args:
+        readings (pd.DataFrame): The readings, sorted by date. Rows where the field is null are ignored and the x value
+            of the rest is their index, as in a Trend.
+        field (str): The column name of the readings' values
+        min_size (int): The fewest readings that a segment can have
+    Returns:
+        The date of the first reading, the date that each segment after the first starts on, and the date of the last
+        reading, in order
+    """
+    nonnulls = readings[readings[field].notna()]
+    dates = nonnulls[CName.DATE]
+    changepoints = find_changepoints(nonnulls.index, nonnulls[field], min_size)
+    return [dates.iloc[0], *dates.iloc[changepoints], dates.iloc[-1]]
@@ -4,10 +4,10 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Self
 
-import numpy as np
 import pandas as pd
 
 from exercise_log.dataloader import CName
+from exercise_log.dataloader.query import slice_dates
 
 
 class ExerciseSummary:
@@ -15,11 +15,8 @@ class ExerciseSummary:
 
     @classmethod
     def build_summary(cls, data: pd.DataFrame, start_date: date, end_date: date) -> Self:
-        """Build and return an ExerciseSummary using the data and date range provided."""
-        start_date, end_date = np.datetime64(start_date, "ns"), np.datetime64(end_date, "ns")
-        data = data[start_date <= data[CName.DATE]]
-        data = data[data[CName.DATE] <= end_date]
-        return cls._build(data)
+        """Build and return an ExerciseSummary using the data (sorted by date) and date range provided."""
+        return cls._build(slice_dates(data, start_date, end_date))
 
     @staticmethod
     def _build(data: pd.DataFrame) -> "ExerciseSummary":
@@ -0,0 +1,201 @@
+"""
+Fits lines of best fit in closed form, for any number of series at once.
+
+A least-squares line has an exact solution, so rather than iterating towards it (as scipy's curve_fit does for any
+model) each line is solved directly from the normal equations. The sums that they need are taken along the last axis of
+2D arrays, so a whole batch of series (e.g. every datespan of a trend) is fit with a handful of vectorized operations.
+Series of different lengths are fit together by padding them with NaN, which is ignored.
+
+A line can also be kept up to date as points arrive (see RunningLine) since the same sums can be updated one point at a
+time, without revisiting the points that were already added.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+# A line through fewer points than this has no error estimate, so its covariance is infinite (as with curve_fit)
+MIN_POINTS_FOR_COVARIANCE = 3
+
+
+@dataclass(frozen=True)
+class LinearFits:
+    """
+    The lines of best fit (y = slope * x + intercept) of a batch of series.
+
+    The covariance of each line's (slope, intercept) is estimated from its residuals the same way that scipy's
+    curve_fit estimates it by default, so their square roots on the diagonal are the standard errors of the parameters.
+    """
+
+    # Each of shape (k,) for a batch of k series
+    slopes: np.ndarray
+    intercepts: np.ndarray
+    # Of shape (k, 2, 2)
+    covariances: np.ndarray
+
+    def __len__(self) -> int:
+        """Get the number of lines in this batch."""
+        return len(self.slopes)
+
+    def __getitem__(self, i: int) -> tuple[float, float]:
+        """Get the slope and intercept of the i-th line."""
+        return float(self.slopes[i]), float(self.intercepts[i])
+
+    def evaluate(self, x: npt.ArrayLike, i: int = 0) -> np.ndarray:
+        """Evaluate the i-th line at the given x values."""
+        slope, intercept = self[i]
+        return slope * np.asarray(x, dtype="float64") + intercept
+
+
+def _get_covariances(n: np.ndarray, x_mean: np.ndarray, sxx: np.ndarray, rss: np.ndarray) -> np.ndarray:
+    """Estimate the covariance of each line's (slope, intercept) from its residual sum of squares, like curve_fit."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variances = rss / (n - 2)
+        variances[n < MIN_POINTS_FOR_COVARIANCE] = np.inf
+        slope_variances = variances / sxx
+        covariances = np.empty((len(n), 2, 2))
+        covariances[:, 0, 0] = slope_variances
+        covariances[:, 0, 1] = covariances[:, 1, 0] = -x_mean * slope_variances
+        covariances[:, 1, 1] = variances / n + x_mean * x_mean * slope_variances
+    return covariances
+
+
+def fit_lines(x: npt.ArrayLike, y: npt.ArrayLike) -> LinearFits:
+    """
+    Fit a line of best fit to each row of x and y in a single vectorized pass.
+
+    Args:
+        x (npt.ArrayLike): The x values, of shape (n,) for a single series or (k, n) for a batch of k series
+        y (npt.ArrayLike): The y values, of the same shape as x. Points where either x or y is NaN are ignored.
+    Returns:
+        The LinearFits of each series. A series needs two distinct x values to have a line, otherwise it's all NaN.
+    Raises:
+        ValueError: If x and y have different shapes
+    """
+    x, y = np.atleast_2d(np.asarray(x, dtype="float64")), np.atleast_2d(np.asarray(y, dtype="float64"))
+    if x.shape != y.shape:
+        msg = f"x and y must have the same shape, got {x.shape} and {y.shape}"
+        raise ValueError(msg)
+
+    is_valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = np.where(is_valid, x, 0), np.where(is_valid, y, 0)
+    n = is_valid.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Centering the series first keeps the sums of squares precise even for large x values (e.g. day numbers)
+        x_mean, y_mean = x.sum(axis=1) / n, y.sum(axis=1) / n
+        dx = np.where(is_valid, x - x_mean[:, None], 0)
+        dy = np.where(is_valid, y - y_mean[:, None], 0)
+        sxx, sxy = (dx * dx).sum(axis=1), (dx * dy).sum(axis=1)
+        slopes = sxy / sxx
+        intercepts = y_mean - slopes * x_mean
+
+        residuals = np.where(is_valid, dy - slopes[:, None] * dx, 0)
+        covariances = _get_covariances(n, x_mean, sxx, (residuals * residuals).sum(axis=1))
+    return LinearFits(slopes, intercepts, covariances)
+
+
+def fit_segments(segments: Iterable[tuple[npt.ArrayLike, npt.ArrayLike]]) -> LinearFits:
+    """
+    Fit a line of best fit to each segment in a single vectorized pass.
+
+    Args:
+        segments (Iterable[tuple[npt.ArrayLike, npt.ArrayLike]]): The x and y values of each segment, which can all be
+            different lengths
+    Returns:
+        The LinearFits of each segment, in order
+    """
+    segments = [(np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")) for x, y in segments]
+    width = max((len(x) for x, _ in segments), default=0)
+    x_padded, y_padded = np.full((len(segments), width), np.nan), np.full((len(segments), width), np.nan)
+    for i, (x, y) in enumerate(segments):
+        x_padded[i, : len(x)], y_padded[i, : len(y)] = x, y
+    return fit_lines(x_padded, y_padded)
+
+
+@dataclass(frozen=True)
+class RunningLine:
+    """
+    A line of best fit that's updated as points are added to it, i.e. recursive least squares (without forgetting).
+
+    Rather than the points themselves it only keeps their count, means and centred sums of squares and products. Those
+    are updated the way Welford's algorithm updates a variance, which keeps them precise even for large x values, so
+    adding a point takes O(1) time and the line is always the one that fit_lines() would fit to every point at once.
+    """
+
+    n: int = 0
+    x_mean: float = 0.0
+    y_mean: float = 0.0
+    # The sums of dx * dx, dx * dy and dy * dy, where dx and dy are each point's distance from the means
+    sxx: float = 0.0
+    sxy: float = 0.0
+    syy: float = 0.0
+
+    @classmethod
+    def from_points(cls, x: npt.ArrayLike, y: npt.ArrayLike) -> "RunningLine":
+        """
+        Create a RunningLine of the given points in a single vectorized pass.
+
+        Args:
+            x (npt.ArrayLike): The x values of the points
+            y (npt.ArrayLike): The y values of the points. Points where either x or y is NaN are ignored.
+        Returns:
+            The RunningLine of the points
+        Raises:
+            ValueError: If x and y have different shapes
+        """
+        x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+        if x.shape != y.shape:
+            msg = f"x and y must have the same shape, got {x.shape} and {y.shape}"
+            raise ValueError(msg)
+        is_valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[is_valid], y[is_valid]
+        if len(x) == 0:
+            return cls()
+        dx, dy = x - x.mean(), y - y.mean()
+        return cls(len(x), float(x.mean()), float(y.mean()), float(dx @ dx), float(dx @ dy), float(dy @ dy))
+
+    def add(self, x: float, y: float) -> "RunningLine":
+        """Get this RunningLine with a point added to it, or unchanged if either x or y is NaN."""
+        if np.isnan(x) or np.isnan(y):
+            return self
+        n = self.n + 1
+        dx, dy = x - self.x_mean, y - self.y_mean
+        x_mean, y_mean = self.x_mean + dx / n, self.y_mean + dy / n
+        return RunningLine(
+            n,
+            x_mean,
+            y_mean,
+            self.sxx + dx * (x - x_mean),
+            self.sxy + dx * (y - y_mean),
+            self.syy + dy * (y - y_mean),
+        )
+
+    def merge(self, other: "RunningLine") -> "RunningLine":
+        """Get the RunningLine of both this RunningLine's points and the other's, e.g. to add a batch of points."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        dx, dy = other.x_mean - self.x_mean, other.y_mean - self.y_mean
+        weight = self.n * other.n / n
+        return RunningLine(
+            n,
+            self.x_mean + dx * other.n / n,
+            self.y_mean + dy * other.n / n,
+            self.sxx + other.sxx + dx * dx * weight,
+            self.sxy + other.sxy + dx * dy * weight,
+            self.syy + other.syy + dy * dy * weight,
+        )
+
+    def to_fits(self) -> LinearFits:
+        """Get the line of best fit through this RunningLine's points, as a batch of one."""
+        n, x_mean, sxx = np.array([self.n]), np.array([self.x_mean]), np.array([self.sxx])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = np.array([self.sxy]) / sxx
+            intercepts = self.y_mean - slopes * x_mean
+            # The residual sum of squares can come out a hair below zero from rounding when the points are collinear
+            rss = np.maximum(self.syy - slopes * self.sxy, 0)
+        return LinearFits(slopes, intercepts, _get_covariances(n, x_mean, sxx, rss))
@@ -0,0 +1,58 @@
+"""
+Computes rolling statistics of a daily series over several windows at once.
+
+Every statistic is a sum over a window, so each is the difference between two entries of a cumulative sum: the one at
+the end of the window and the one just before it starts. The cumulative sums are taken once and the start of every
+window (for every window length) is found with a single binary search on the dates, so more windows only cost a little
+more indexing rather than another pass over the data.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+
+# The number of days in each window, e.g. for weekly and monthly views
+ROLLING_WINDOWS = (7, 14, 28, 90)
+# The columns of each window's statistics, formatted with its number of days
+MEAN_COLUMN = "avg_duration_{}d(s)"
+TOTAL_COLUMN = "total_duration_{}d(s)"
+ACTIVE_DAYS_COLUMN = "active_days_{}d"
+
+
+def compute_rolling_stats(df: pd.DataFrame, field: str, windows: Sequence[int] = ROLLING_WINDOWS) -> pd.DataFrame:
+    """
+    Compute the mean, total, and number of active days of the given field over the trailing window of each row.
+
+    A window of n days covers the day of its row and the n - 1 days before it, by date, so days without a row count as
+    zero. Windows that start before the first row are cut short and their mean is only over the days that they cover.
+
+    Args:
+        df (pd.DataFrame): The daily data, sorted by date. It must contain a column with the name of the given field.
+        field (str): The column name to compute the statistics of, missing values count as zero
+        windows (Sequence[int]): The number of days in each window
+    Returns:
+        A pd.DataFrame with the same index as df and the mean, total, and active days columns of each window in order
+        (see MEAN_COLUMN, TOTAL_COLUMN, and ACTIVE_DAYS_COLUMN)
+    """
+    values = df[field].fillna(0).to_numpy()
+    days = (df[CName.DATE] - df[CName.DATE].iloc[0]).dt.days.to_numpy()
+
+    # A single pass for every statistic, with a leading zero so that a window from the first row subtracts nothing
+    cumsums = np.zeros((2, len(values) + 1), dtype=np.result_type(values, "int64"))
+    np.cumsum(np.stack([values, values > 0]), axis=1, out=cumsums[:, 1:])
+
+    # The first row in each window, of shape (number of windows, number of rows)
+    lengths = np.asarray(windows)[:, None]
+    starts = np.searchsorted(days, days[None, :] - lengths + 1)
+    totals, active_days = cumsums[:, 1:][:, None, :] - cumsums[:, starts]
+    num_days = np.minimum(lengths, days + 1)
+
+    stats = {}
+    for i, window in enumerate(windows):
+        stats[MEAN_COLUMN.format(window)] = totals[i] / num_days[i]
+        stats[TOTAL_COLUMN.format(window)] = totals[i]
+        stats[ACTIVE_DAYS_COLUMN.format(window)] = active_days[i]
+    return pd.DataFrame(stats, index=df.index)
@@ -0,0 +1,131 @@
+"""
+Keeps the state of a trend between updates so that new readings don't mean refitting the whole trend.
+
+Every segment of a trend has fixed boundaries except the last one, which runs up to the latest reading. Readings are
+only ever appended, so the trendline before the last segment stays the same from one update to the next and the last
+segment's line is a RunningLine that each new reading is added to in O(1) time. A saved state is only reused while the
+fixed boundaries and every reading that it has already seen are unchanged, otherwise the trend is refit from scratch.
+
+Checking that the readings are unchanged still takes O(n) time since every one of them is hashed, but in a single
+vectorized pass that's far cheaper than refitting (see TrendState.extend()).
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.trend.linear import RunningLine
+from exercise_log.utils import UTF8
+
+# Bump this whenever the way that trends are fit changes, so that states saved by the old code are discarded
+TREND_STATE_VERSION = 1
+
+
+def _get_row_hashes(readings: pd.DataFrame) -> np.ndarray:
+    """Hash each of the given readings by its index and contents, in a single vectorized pass."""
+    return pd.util.hash_pandas_object(readings, index=True).to_numpy()
+
+
+def _start_digest(readings: pd.DataFrame) -> "hashlib._Hash":
+    # The labels are hashed as strs, e.g. the CName labels of freshly parsed readings and the strs of cached ones
+    return hashlib.sha256(repr([str(column) for column in readings.columns]).encode(UTF8))
+
+
+def hash_readings(readings: pd.DataFrame) -> str:
+    """Hash the given readings by their index and contents, in a single vectorized pass."""
+    digest = _start_digest(readings)
+    digest.update(_get_row_hashes(readings).tobytes())
+    return digest.hexdigest()
+
+
+def get_state_key(*boundaries: object) -> str:
+    """Get the key of a trend's state, which identifies the trend and its fixed boundaries, e.g. its datespans."""
+    return hashlib.sha256(repr((TREND_STATE_VERSION, *boundaries)).encode(UTF8)).hexdigest()
+
+
+@dataclass(frozen=True)
+class TrendState:
+    """
+    The trendline of a trend's fixed segments, and the running line of best fit of its last segment.
+
+    The confidence band of the fixed segments is kept too once it's been computed, since it's far more costly to
+    compute than the trendline but doesn't change until the fixed segments do either.
+    """
+
+    # Identifies the trend and fixed boundaries that this state was built for, see get_state_key()
+    key: str
+    # How many readings this state has seen, and their hash (see hash_readings()) to tell whether they've changed
+    num_readings: int
+    readings_hash: str
+    fixed_trendline: np.ndarray
+    line: RunningLine
+    # Of shape (2, len(fixed_trendline)), see exercise_log.trend.bootstrap.get_band()
+    fixed_band: Optional[np.ndarray] = None
+
+    def extend(self, readings: pd.DataFrame, field: str, last_start: pd.Timestamp) -> Optional["TrendState"]:
+        """
+        Add any readings that this state hasn't seen yet to the line of best fit of the last segment.
+
+        Args:
+            readings (pd.DataFrame): Every reading of the trend, sorted by date, the x value of each is its index
+            field (str): The column name of the readings' values
+            last_start (pd.Timestamp): The date that the last segment starts on
+        Returns:
+            The extended TrendState, or None if the readings that this state has seen have changed since or if a new
+            reading is from before the last segment (both of which mean that the trend has to be refit)
+        """
+        if len(readings) < self.num_readings:
+            return None
+        # Each reading is hashed on its own, so the hash of the seen readings and of all of them share a single pass
+        row_hashes = _get_row_hashes(readings)
+        digest = _start_digest(readings)
+        digest.update(row_hashes[: self.num_readings].tobytes())
+        if digest.hexdigest() != self.readings_hash:
+            return None
+        new_readings = readings.iloc[self.num_readings :]
+        if len(new_readings) == 0:
+            return self
+        if new_readings[CName.DATE].iloc[0] < last_start:
+            return None
+        line = self.line
+        for x, y in zip(new_readings.index, new_readings[field], strict=True):
+            line = line.add(float(x), float(y))
+        digest.update(row_hashes[self.num_readings :].tobytes())
+        return replace(self, num_readings=len(readings), readings_hash=digest.hexdigest(), line=line)
+
+    @staticmethod
+    def load(path: str, key: str) -> Optional["TrendState"]:
+        """Load the TrendState saved at the given path, or get None if it's missing, corrupt, or for a different key."""
+        try:
+            with open(path, encoding=UTF8) as f:
+                saved = json.load(f)
+            if saved["key"] != key:
+                return None
+            fixed_trendline = np.asarray(saved["fixed_trendline"], dtype="float64")
+            line = RunningLine(**saved["line"])
+            fixed_band = None if saved.get("fixed_band") is None else np.asarray(saved["fixed_band"], dtype="float64")
+            return TrendState(key, saved["num_readings"], saved["readings_hash"], fixed_trendline, line, fixed_band)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """Save this TrendState to the given path."""
+        saved = {
+            "key": self.key,
+            "num_readings": self.num_readings,
+            "readings_hash": self.readings_hash,
+            "fixed_trendline": self.fixed_trendline.tolist(),
+            "line": asdict(self.line),
+            "fixed_band": None if self.fixed_band is None else self.fixed_band.tolist(),
+        }
+        tmp_path = Path(path).with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding=UTF8) as f:
+            json.dump(saved, f)
+            f.write("\n")
+        tmp_path.replace(path)
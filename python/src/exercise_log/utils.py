@@ -6,7 +6,7 @@ import itertools
 import json
 import os
 from enum import Enum, EnumMeta
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, BinaryIO, Optional
 
 import numpy as np
 import pandas as pd
@@ -14,7 +14,7 @@ import pandas as pd
 from exercise_log.constants import DATE, number
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
 
     from pandas.core.generic import NDFrame  # This is the generic type that encompasses Series and DataFrame
 
@@ -22,6 +22,7 @@ UTF8 = "utf-8"
 NEWLINE = "\n"
 CR = b"\r"
 LF = b"\n"
+REVERSE_READ_BLOCK_SIZE = 64 * 1024
 
 
 class StrEnumMeta(EnumMeta):
@@ -165,6 +166,46 @@ def get_padded_dates(df: pd.DataFrame, num_days_to_pad: int) -> pd.DataFrame:
     return padded_dates
 
 
+def iter_lines_reversed(f: BinaryIO, start: int = 0, block_size: int = REVERSE_READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """
+    Iterate over the lines of a file from last to first, e.g. to read a newest-first CSV in chronological order.
+
+    The file is read backwards in fixed-size blocks so only about one block (plus the current line) is ever in memory
+    and each block takes a single read. A line break is a CR, LF, or CRLF (even if the CR and LF are in different
+    blocks) and each line is yielded with its own line break, the last line may not have one.
+
+    Args:
+        f (BinaryIO): The file to read, opened in binary mode. It must be seekable.
+        start (int): The offset to stop reading at, e.g. the length of a header row so that it's excluded
+        block_size (int): The number of bytes to read at a time
+    Returns:
+        A generator of the lines, as bytes
+    """
+    pos = f.seek(0, os.SEEK_END)
+    # The start of the current block's last line, it continues into the preceding block if there's no break before it
+    partial_line = b""
+    while pos > start:
+        read_size = min(block_size, pos - start)
+        pos -= read_size
+        f.seek(pos)
+        lines = (f.read(read_size) + partial_line).splitlines(keepends=True)
+        partial_line = lines[0] if pos > start else b""
+        yield from reversed(lines[1 if pos > start else 0 :])
+
+
+def split_csv_header(raw: bytes) -> tuple[bytes, bytes]:
+    """Split a raw CSV into its header line (including its line break) and the rows beneath it."""
+    header_end = raw.find(LF) + 1
+    if not header_end:
+        return raw, b""
+    return raw[:header_end], raw[header_end:]
+
+
+def _get_line_break(line: bytes) -> bytes:
+    """Get the line break that ends the line (CR, LF, or CRLF), empty if there isn't one."""
+    return line[len(line.rstrip(CR + LF)) :]
+
+
 def invert_csv_rows(
     fname: str,
     *,
@@ -176,15 +217,15 @@ def invert_csv_rows(
     Inverts the rows of a csv so that the last row is first, the second last row is second, and so on. The inverted csv
     is then written to a new file. By default "x" or "x.csv" -> "x_inverted.csv".
 
+    The rows are streamed from the input file to the output file, see iter_lines_reversed(). Each row keeps its own
+    line break, a last row without one is given the line break of the row before it.
+
     Args:
         fname (str): The path to the csv file to invert
         has_header_row (Optional[str]): Whether the csv has a header row that should be maintained by this function.
         output_fname (Optional[str]): The new path to write the inverted csv to
         encoding (str): The encoding to use when reading the file (only supports UTF-8 currently)
     """
-    # Note: working backwards from the input file rather than injecting into the first row of the output file even
-    #       though it's messier bc I assume it's faster for data allocation reasons. I didn't validate this though.
-    # Note: In Python, "\n" is the correct way to refer to a new line on all OS's.
     if encoding != UTF8:
         msg = "This function currently only supports utf-8"
         raise NotImplementedError(msg)
@@ -192,45 +233,27 @@ def invert_csv_rows(
     if not output_fname:
         output_fname = fname.rsplit(".csv")[0] + "_inverted.csv"
 
-    # Start with the header row if it exists since it needs to remain at the top of the file
-    output_strategy = "wb"
+    # The header row needs to remain at the top of the file. Reading it with newline="" finds the same line breaks as
+    # iter_lines_reversed() without translating them, so its length is the offset that the rows start at.
+    header = ""
     if has_header_row:
-        output_strategy = "ab"
-        with open(fname, encoding=encoding) as f_in, open(output_fname, "w", encoding=encoding) as f_out:
+        with open(fname, encoding=encoding, newline="") as f_in:
             header = f_in.readline()
-            f_out.write(header)
-            f_out.write(NEWLINE)
-
-    line_breaks = {CR, LF}
-    with open(fname, "rb") as f_in, open(output_fname, output_strategy) as f_out:
-        # Move to an offset of 0 bytes from the end of the file
-        f_in.seek(0, os.SEEK_END)
-
-        # Work backwards and write a line every time a line break is found
-        line = b""
-        while f_in.tell() > 1:  # tell() gives the current position in the file
-            f_in.seek(-2, os.SEEK_CUR)  # Move 2 bytes back to read the previous byte
-            byte = f_in.read(1)  # Read a single byte, moving the pointer forward by one
-            line = byte + line
-            if byte in line_breaks:
-                # Write the bytes from this line
-                f_out.write(line[1:])
-                line_break = line[0:1]
-                line = b""
-
-                # Now write whichever line break was used to terminate the line
-                if byte == LF:
-                    f_in.seek(-2, 1)
-                    byte = f_in.read(1)
-                    if byte == CR:
-                        line_break = byte + line_break
-                    else:
-                        f_in.seek(1, 1)  # We still need this byte if it's not CR, reset the pointer
-                f_out.write(line_break)
-
-        # Skip the last line if it's a header since it's already been written
-        if not has_header_row:
-            f_out.write(line)
+    header_bytes = header.encode(encoding)
+
+    with open(fname, "rb") as f_in, open(output_fname, "wb") as f_out:
+        f_out.write(header_bytes)
+        lines = iter_lines_reversed(f_in, start=len(header_bytes))
+        last_line = next(lines, b"")
+        if last_line and not _get_line_break(last_line):
+            # The last row is now followed by the others so it needs a line break too
+            previous_line = next(lines, b"")
+            last_line += _get_line_break(previous_line) or (LF if previous_line else b"")
+            f_out.write(last_line)
+            f_out.write(previous_line)
+        else:
+            f_out.write(last_line)
+        f_out.writelines(lines)
 
 
 def pairwise(iterable: Iterable) -> Iterable:
@@ -1,4 +1,9 @@
-"""Contains utilities for visualizing fitness data such as strength over time, weight, and resting heart rate."""
+"""
+Contains utilities for visualizing fitness data such as strength over time, weight, and resting heart rate.
+
+Each plot is drawn on the Axes that it's given (or on a new Figure of its own) and returns its Figure. Nothing is drawn
+through pyplot's global state, so plots never leak into one another and can be drawn from multiple threads.
+"""
 
 from dataclasses import dataclass
 from datetime import date
@@ -8,15 +13,17 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from matplotlib import ticker
+from matplotlib import font_manager, ticker
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 
 from exercise_log.constants import MIN_DAILY_ACTIVE_MINUTES
 from exercise_log.dataloader import ColumnName
-from exercise_log.strength import SetRating, SetType
-from exercise_log.strength.ontology import ExerciseInfo
+from exercise_log.strength.progress import SET_TYPE, ExerciseProgress, StrengthProgress
 from exercise_log.utils import convert_mins_to_hour_mins, convert_pd_to_np
 from exercise_log.vis.constants import BOTTOM_OFFSET, NON_GRAPH_AREA_SCALER, RIGHT_OF_AXIS_X_COORD
-from exercise_log.vis.utils import configure_x_axis_by_month, create_legend_and_title
+from exercise_log.vis.export import PNG_FORMAT, export_figure, get_export_fname
+from exercise_log.vis.utils import configure_x_axis_by_month, create_legend_and_title, plot_confidence_band
 
 WEIGHT_LEVELS = {
     "Healthy": 250,
@@ -43,155 +50,212 @@ class PlotOptions:
 
     export_dir: Optional[str] = None
     show_plot: Optional[bool] = None
-
-    def execute(self, f_name: str) -> None:
-        """Execute (save and/or show then clear figure) this plot according to the options provided."""
+    # What the plots are exported as, see exercise_log.vis.export
+    export_formats: tuple[str, ...] = (PNG_FORMAT,)
+
+    def create_axes(self, ax: Optional[Axes] = None) -> Axes:
+        """
+        Get the Axes to plot on, a new one on its own Figure unless one was given.
+
+        The Figure is independent of pyplot (so plots can be drawn concurrently and never leak into one another) unless
+        the plot is to be shown, since only pyplot can show it.
+        """
+        if ax is not None:
+            return ax
+        fig = plt.figure() if self.show_plot else Figure()
+        return fig.add_subplot()
+
+    def get_export_fnames(self, f_name: str) -> list[str]:
+        """Get the files (relative to the export directory) that a plot saved as f_name is exported to."""
+        return [get_export_fname(f_name, export_format) for export_format in self.export_formats]
+
+    def execute(self, fig: Figure, f_name: str) -> None:
+        """Execute (export and/or show) this plot according to the options provided."""
         if self.export_dir:
-            plt.savefig(f"{self.export_dir}/{f_name}", bbox_inches="tight")
+            for export_format in self.export_formats:
+                export_figure(fig, f"{self.export_dir}/{get_export_fname(f_name, export_format)}", export_format)
         if self.show_plot:
             plt.show()
-        plt.clf()
+            plt.close(fig)
+
+
+def init_plotting() -> None:
+    """
+    Load what matplotlib otherwise loads lazily when the first figure is drawn, i.e. the default font and its glyphs.
+
+    A long-lived process that plots many figures (e.g. a plotting worker) calls this once when it starts.
+    """
+    font_manager.findfont(font_manager.FontProperties(family=mpl.rcParams["font.family"]))
+    fig = Figure()
+    fig.text(0, 0, "0")
+    fig.canvas.draw()
 
 
 def plot_workout_frequency(
     workout_durations: pd.DataFrame,
     n_days_to_avg: int,
     options: Optional[PlotOptions] = None,
-) -> None:
+    *,
+    ax: Optional[Axes] = None,
+) -> Figure:
     """Plot a graph of workout frequency over time."""
+    options = options or PlotOptions(None, None)
+    ax = options.create_axes(ax)
+    fig = ax.figure
+
     non_graph_gcf_percent = 0.1
     workout_frequency_bottom_offset = 0.03
     y_min, y_max = 0, 210  # Setting a 3.5 hour max since there's a few backpacking days that mess up the scale
 
     # Draw the main graph contents and setup the axes
     workout_durations_mins = workout_durations[ColumnName.DURATION] // 60
-    plt.scatter(
+    ax.scatter(
         workout_durations[ColumnName.DATE],
         workout_durations_mins,
         s=5,
         label="Workout Duration",
     )
-    plt.plot(
+    ax.plot(
         convert_pd_to_np(workout_durations[ColumnName.DATE]),
         convert_pd_to_np(workout_durations[ColumnName.AVG_DURATION] // 60),
         label=f"{n_days_to_avg}-Day Avg Daily Duration",
     )
 
     # Delineate the ideal minimum daily exercise threshold as a horizontal reference line
-    plt.axhline(y=MIN_DAILY_ACTIVE_MINUTES, color="r", linestyle="-")
+    ax.axhline(y=MIN_DAILY_ACTIVE_MINUTES, color="r", linestyle="-", gid="Target Minimum")
     y_percent_min_daily_active = (MIN_DAILY_ACTIVE_MINUTES / y_max) - workout_frequency_bottom_offset
     y_pos = y_percent_min_daily_active + non_graph_gcf_percent
-    plt.gcf().text(RIGHT_OF_AXIS_X_COORD, y_pos, "Target\nMinimum")
+    fig.text(RIGHT_OF_AXIS_X_COORD, y_pos, "Target\nMinimum")
 
     # Set up axes
-    ax = plt.gca()
-    configure_x_axis_by_month(workout_durations)
+    configure_x_axis_by_month(ax, workout_durations)
     ax.yaxis.set_major_formatter(ticker.FuncFormatter(convert_mins_to_hour_mins))
     ax.yaxis.set_major_locator(ticker.MultipleLocator(30))
     ax.yaxis.set_minor_locator(ticker.MultipleLocator(10))
     ax.set_ylim([y_min, y_max])
-    plt.grid(visible=True)
-    plt.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
+    ax.grid(visible=True)
+    ax.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
 
     # Scale up the plot
-    plt.gcf().set_size_inches(15, 9)
+    fig.set_size_inches(15, 9)
 
     # Add in the surrounding information
-    create_legend_and_title("Workout Frequency", reverse_labels=True)
-    options = options if options else PlotOptions(None, None)
-    options.execute("workout_frequency.png")
+    create_legend_and_title(ax, "Workout Frequency", reverse_labels=True)
+    options.execute(fig, "workout_frequency.png")
+    return fig
 
 
 def plot_resting_heart_rate(
     health_metrics: np.ndarray,
     heart_rate_trendline: np.ndarray,
     options: Optional[PlotOptions] = None,
-) -> None:
-    """Plot a graph of resting heart rate over time."""
+    *,
+    ax: Optional[Axes] = None,
+    confidence_band: Optional[pd.DataFrame] = None,
+) -> Figure:
+    """Plot a graph of resting heart rate over time, shading the confidence band of the trendline if it's given."""
+    options = options or PlotOptions(None, None)
+    ax = options.create_axes(ax)
+    fig = ax.figure
+
     y_min, y_max = 45, 90
 
     nonnull_heart_rates = health_metrics[health_metrics[ColumnName.RESTING_HEART_RATE].notna()]
-    plt.scatter(
+    ax.scatter(
         nonnull_heart_rates[ColumnName.DATE].to_numpy(),
         nonnull_heart_rates[ColumnName.RESTING_HEART_RATE].to_numpy(),
         s=5,
         label="Resting HR",
     )
-    plt.plot(
+    (trendline,) = ax.plot(
         heart_rate_trendline[ColumnName.DATE],
         heart_rate_trendline[ColumnName.RESTING_HEART_RATE],
         linestyle="--",
         label="Projected Resting HR",
     )
+    if confidence_band is not None:
+        plot_confidence_band(ax, confidence_band, trendline.get_color())
 
     # Delineate various resting heart rate levels as horizontal reference lines
     for text, hr in RESTING_HEART_RATE_LEVELS.items():
-        plt.axhline(y=hr, color="k", linestyle="--", linewidth="0.75")
+        ax.axhline(y=hr, color="k", linestyle="--", linewidth="0.75", gid=text)
         y_range = y_max - y_min
         y_pos = BOTTOM_OFFSET + (hr - y_min) / (NON_GRAPH_AREA_SCALER * y_range)
-        plt.gcf().text(RIGHT_OF_AXIS_X_COORD, y_pos, text)
+        fig.text(RIGHT_OF_AXIS_X_COORD, y_pos, text)
 
     # Set up axes
-    ax = plt.gca()
-    configure_x_axis_by_month(heart_rate_trendline)
+    configure_x_axis_by_month(ax, heart_rate_trendline)
     ax.yaxis.set_minor_locator(ticker.MultipleLocator(1))
     ax.set_ylim([y_min, y_max])
-    plt.grid(visible=True)
-    plt.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
+    ax.grid(visible=True)
+    ax.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
 
     # Scale up the plot
-    plt.gcf().set_size_inches(15, 9)
+    fig.set_size_inches(15, 9)
 
     # Add in the surrounding information
-    create_legend_and_title("Resting Heart Rate", reverse_labels=True)
-    options = options if options else PlotOptions(None, None)
-    options.execute("resting_heart_rate.png")
+    create_legend_and_title(ax, "Resting Heart Rate", reverse_labels=True)
+    options.execute(fig, "resting_heart_rate.png")
+    return fig
 
 
 def plot_weight(
     health_metrics: pd.DataFrame,
     weight_trendline: np.ndarray,
     options: Optional[PlotOptions] = None,
-) -> None:
-    """Plot a graph of weight over time."""
+    *,
+    ax: Optional[Axes] = None,
+    confidence_band: Optional[pd.DataFrame] = None,
+) -> Figure:
+    """Plot a graph of weight over time, shading the confidence band of the trendline if it's given."""
+    options = options or PlotOptions(None, None)
+    ax = options.create_axes(ax)
+    fig = ax.figure
+
     y_min, y_max = 180, 305
 
     nonnull_weights = health_metrics[health_metrics[ColumnName.WEIGHT].notna()]
-    plt.scatter(
+    ax.scatter(
         nonnull_weights[ColumnName.DATE].to_numpy(),
         nonnull_weights[ColumnName.WEIGHT].to_numpy(),
         s=5,
         label="Weight",
     )
-    plt.plot(
+    (trendline,) = ax.plot(
         weight_trendline[ColumnName.DATE],
         weight_trendline[ColumnName.WEIGHT],
         linestyle="--",
         label="Projected Weight",
     )
+    if confidence_band is not None:
+        plot_confidence_band(ax, confidence_band, trendline.get_color())
 
     # Delineate various resting heart rate levels as horizontal reference lines
     for text, weight in WEIGHT_LEVELS.items():
-        plt.axhline(y=weight, color="k", linestyle="--", linewidth="0.75")
+        ax.axhline(y=weight, color="k", linestyle="--", linewidth="0.75", gid=text)
         y_range = y_max - y_min
         y_pos = BOTTOM_OFFSET + (weight - y_min) / (NON_GRAPH_AREA_SCALER * y_range)
-        plt.gcf().text(RIGHT_OF_AXIS_X_COORD, y_pos, text)
+        fig.text(RIGHT_OF_AXIS_X_COORD, y_pos, text)
 
     # Set up axes
-    ax = plt.gca()
-    configure_x_axis_by_month(weight_trendline)
+    configure_x_axis_by_month(ax, weight_trendline)
     ax.yaxis.set_minor_locator(ticker.MultipleLocator(5))
     ax.set_ylim([y_min, y_max])
-    plt.grid(visible=True)
-    plt.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
+    ax.grid(visible=True)
+    ax.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
 
     # Scale up the plot
-    plt.gcf().set_size_inches(18.5, 10.5)
+    fig.set_size_inches(18.5, 10.5)
 
     # Add in the surrounding information
-    create_legend_and_title("Weight", reverse_labels=True)
-    options = options if options else PlotOptions(None, None)
-    options.execute("weight.png")
+    create_legend_and_title(ax, "Weight", reverse_labels=True)
+    options.execute(fig, "weight.png")
+    return fig
+
+
+def get_exercise_fname(exercise: str) -> str:
+    """Get the file that an exercise's strength plot is saved to, relative to the export directory."""
+    return f"strength/{exercise}.png"
 
 
 def plot_strength_over_time(
@@ -200,74 +264,71 @@ def plot_strength_over_time(
     exercise: str,
     primary_gyms: dict[str, tuple[date, date]],
     options: Optional[PlotOptions] = None,
-) -> None:
-    """Plot a graph of strength of a single exercise over time."""
-    single_exercise = weight_training_sets[weight_training_sets[ColumnName.EXERCISE] == exercise]
-    for set_type in SetType:
-        rep_range = set_type.get_rep_range()
-        sets = single_exercise[
-            (rep_range[0] <= single_exercise[ColumnName.REPS]) & (single_exercise[ColumnName.REPS] <= rep_range[1])
-        ]
-
-        # Filter out sets with ratings that should be ignored
-        sets = sets[sets[ColumnName.RATING] != SetRating.WARMUP]
-        sets = sets[~sets[ColumnName.RATING].str.startswith(SetRating.BAD)]
-        sets = sets[~sets[ColumnName.RATING].str.startswith(SetRating.FAILURE)]
-        sets = sets[sets[ColumnName.RATING] != SetRating.FUN]
-        sets = sets[sets[ColumnName.RATING] != SetRating.DELOAD]
-
-        # Filter out sets using machines in non-primary gyms
-        workouts = workouts[workouts[ColumnName.LOCATION].isin(primary_gyms)]
-        # TODO(eric): also filter out sets that are from a primary gym but *not* in the time period when it was primary
-        sets = sets[
-            sets[ColumnName.DATE].isin(workouts[ColumnName.DATE])
-            | ~sets[ColumnName.EXERCISE].apply(lambda exercise: ExerciseInfo(exercise).requires_machine)
-        ]
-        sets = sets[sets[ColumnName.DATE].isin(workouts[ColumnName.DATE])]
-
-        # Filter to only the max weight set of this type for that day
-        sets = sets.loc[sets.groupby(ColumnName.DATE)[ColumnName.WEIGHT].idxmax()]
+    *,
+    ax: Optional[Axes] = None,
+) -> Figure:
+    """
+    Plot a graph of strength of a single exercise over time.
 
+    To plot many exercises, prepare their StrengthProgress once and use plot_exercise_progress() for each of them.
+    """
+    progress = StrengthProgress.prepare(workouts, weight_training_sets, primary_gyms)
+    return plot_exercise_progress(progress.get_exercise(exercise), options, ax=ax)
+
+
+def plot_exercise_progress(
+    progress: ExerciseProgress,
+    options: Optional[PlotOptions] = None,
+    *,
+    ax: Optional[Axes] = None,
+) -> Figure:
+    """Plot a graph of strength of a single exercise over time from its prepared progress."""
+    options = options or PlotOptions(None, None)
+    ax = options.create_axes(ax)
+    fig = ax.figure
+
+    last_workout_date = progress.workout_dates[ColumnName.DATE].iloc[-1]
+    for set_type, bests in progress.daily_bests.groupby(SET_TYPE, observed=True, sort=True):
         # Only bother with plotting when there's 3+ sets available
-        if len(sets) >= MIN_SETS_TO_PLOT:
+        if len(bests) >= MIN_SETS_TO_PLOT:
             final_row = pd.DataFrame(
                 {
-                    ColumnName.DATE: [workouts[ColumnName.DATE].max()],
-                    ColumnName.WEIGHT: [sets[ColumnName.WEIGHT].iloc[-1]],
+                    ColumnName.DATE: [last_workout_date],
+                    ColumnName.WEIGHT: [bests[ColumnName.WEIGHT].iloc[-1]],
                 },
             )
-            sets = pd.concat([sets, final_row], ignore_index=True)
-            plt.scatter(
+            sets = pd.concat([bests[[ColumnName.DATE, ColumnName.WEIGHT]], final_row], ignore_index=True)
+            ax.scatter(
                 sets[ColumnName.DATE],
                 sets[ColumnName.WEIGHT],
                 s=2,
                 label=set_type,
             )
-            plt.step(
+            ax.step(
                 sets[ColumnName.DATE].to_numpy(),
                 sets[ColumnName.WEIGHT].to_numpy(),
                 where="post",
             )
 
     # All of the set types were skipped due to insufficient data, skip this plot entirely
-    if not plt.gca().has_data():
+    if not ax.has_data():
         msg = "Not enough good sets"
         raise ValueError(msg)
 
     # Set up axes
-    ax = plt.gca()
-    configure_x_axis_by_month(workouts)
-    chunk_of_range = (single_exercise[ColumnName.WEIGHT].max() - single_exercise[ColumnName.WEIGHT].min()) / 20
+    configure_x_axis_by_month(ax, progress.workout_dates)
+    min_weight, max_weight = progress.weight_range
+    chunk_of_range = (max_weight - min_weight) / 20
     y_step = max(1, round(chunk_of_range / 10) * 10)
     ax.yaxis.set_major_locator(ticker.MultipleLocator(5 * y_step))
     ax.yaxis.set_minor_locator(ticker.MultipleLocator(y_step))
-    plt.grid(visible=True)
-    plt.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
+    ax.grid(visible=True)
+    ax.grid(visible=True, which="minor", linestyle="--", linewidth="0.25")
 
     # Scale up the plot
-    plt.gcf().set_size_inches(18.5, 10.5)
+    fig.set_size_inches(18.5, 10.5)
 
     # Add in the surrounding information
-    create_legend_and_title(exercise, reverse_labels=True)
-    options = options if options else PlotOptions(None, None)
-    options.execute(f"strength/{exercise}.png")
+    create_legend_and_title(ax, progress.exercise, reverse_labels=True)
+    options.execute(fig, get_exercise_fname(progress.exercise))
+    return fig
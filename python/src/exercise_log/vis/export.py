@@ -0,0 +1,179 @@
+"""
+Exports plots as structured data so that the web site can draw them itself rather than showing pre-rendered images.
+
+The data is read back off of the Figure that a plot drew, so any plot in exercise_log.vis can be exported without
+knowing how it was drawn. Each Axes becomes its title, its x and y axes (limits, ticks and whether they're dates), its
+series (lines, steps, scatters and shaded bands), its horizontal reference lines (named by their gid) and the order of
+its legend. Dates are written as ISO dates and every other value is rounded to keep the JSON compact.
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+import matplotlib as mpl
+import matplotlib.dates as mdates
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.axis import Axis
+from matplotlib.collections import PathCollection, PolyCollection
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from exercise_log.utils import UTF8
+
+PNG_FORMAT = "png"
+SVG_FORMAT = "svg"
+JSON_FORMAT = "json"
+EXPORT_FORMATS = (PNG_FORMAT, SVG_FORMAT, JSON_FORMAT)
+
+# Plenty of precision for anything that's plotted (weights, durations, heart rates, etc)
+DECIMALS = 2
+# Keeps the SVGs identical between runs (rather than using random ids and the current date) so they diff cleanly
+SVG_HASH_SALT = "exercise_log"
+
+
+def _is_date_axis(axis: Axis) -> bool:
+    return isinstance(axis.get_major_locator(), mdates.DateLocator)
+
+
+def _to_values(values: np.ndarray, *, is_date: bool) -> list:
+    values = np.asarray(values, dtype=float)
+    if is_date:
+        return [None if np.isnan(value) else mdates.num2date(value).date().isoformat() for value in values]
+    return [None if np.isnan(value) else value for value in np.round(values, DECIMALS).tolist()]
+
+
+def _get_label(artist: Line2D | PathCollection | PolyCollection) -> Optional[str]:
+    # Matplotlib gives unlabelled artists a placeholder label starting with an underscore
+    label = artist.get_label()
+    return None if label.startswith("_") else label
+
+
+def _axis_to_dict(axis: Axis, limits: tuple[float, float]) -> dict[str, object]:
+    is_date = _is_date_axis(axis)
+    ticks = [tick for tick in axis.get_majorticklocs() if min(limits) <= tick <= max(limits)]
+    return {
+        "label": axis.get_label_text() or None,
+        "is_date": is_date,
+        "limits": _to_values(np.asarray(limits), is_date=is_date),
+        "ticks": _to_values(np.asarray(ticks), is_date=is_date),
+        "tick_labels": axis.get_major_formatter().format_ticks(ticks),
+    }
+
+
+def _line_to_dict(line: Line2D, *, x_is_date: bool) -> dict[str, object]:
+    xy = line.get_xydata()
+    drawstyle = line.get_drawstyle()
+    series = {
+        "type": "step" if drawstyle.startswith("steps") else "line",
+        "label": _get_label(line),
+        "colour": to_hex(line.get_color()),
+        "linestyle": line.get_linestyle(),
+        "x": _to_values(xy[:, 0], is_date=x_is_date),
+        "y": _to_values(xy[:, 1], is_date=False),
+    }
+    if series["type"] == "step":
+        series["where"] = drawstyle.removeprefix("steps-") if drawstyle != "steps" else "pre"
+    return series
+
+
+def _scatter_to_dict(scatter: PathCollection, *, x_is_date: bool) -> dict[str, object]:
+    offsets = np.asarray(scatter.get_offsets(), dtype=float).reshape(-1, 2)
+    colours = scatter.get_facecolor()
+    return {
+        "type": "scatter",
+        "label": _get_label(scatter),
+        "colour": to_hex(colours[0]) if len(colours) else None,
+        "x": _to_values(offsets[:, 0], is_date=x_is_date),
+        "y": _to_values(offsets[:, 1], is_date=False),
+    }
+
+
+def _band_to_dict(band: PolyCollection, *, x_is_date: bool) -> dict[str, object]:
+    # fill_between() makes a PolyCollection (a FillBetweenPolyCollection since matplotlib 3.10, which subclasses it).
+    # Each polygon runs along the first curve from its start, then back along the second curve to its start, with an
+    # extra vertex at both ends and a closing one, so a polygon of n x values has 2n + 3 vertices
+    x, lower, upper = [], [], []
+    for path in band.get_paths():
+        vertices = path.vertices
+        n = (len(vertices) - 3) // 2
+        x.extend(vertices[1 : n + 1, 0])
+        lower.extend(vertices[1 : n + 1, 1])
+        upper.extend(vertices[n + 2 : 2 * n + 2, 1][::-1])
+    colours = band.get_facecolor()
+    return {
+        "type": "band",
+        "label": _get_label(band),
+        "colour": to_hex(colours[0]) if len(colours) else None,
+        "x": _to_values(np.asarray(x), is_date=x_is_date),
+        "lower": _to_values(np.asarray(lower), is_date=False),
+        "upper": _to_values(np.asarray(upper), is_date=False),
+    }
+
+
+def _axes_to_dict(ax: Axes) -> dict[str, object]:
+    x_is_date = _is_date_axis(ax.xaxis)
+    series, reference_lines = [], []
+    for line in ax.get_lines():
+        if line.get_transform() is ax.transData:
+            series.append(_line_to_dict(line, x_is_date=x_is_date))
+        elif line.get_transform() is ax.get_yaxis_transform(which="grid"):
+            # A horizontal line across the whole axes, e.g. from axhline()
+            reference_lines.append(
+                {
+                    "label": line.get_gid(),
+                    "y": _to_values(line.get_ydata()[:1], is_date=False)[0],
+                    "colour": to_hex(line.get_color()),
+                    "linestyle": line.get_linestyle(),
+                },
+            )
+    for collection in ax.collections:
+        if isinstance(collection, PathCollection):
+            series.append(_scatter_to_dict(collection, x_is_date=x_is_date))
+        elif isinstance(collection, PolyCollection):
+            series.append(_band_to_dict(collection, x_is_date=x_is_date))
+    legend = ax.get_legend()
+    return {
+        "title": ax.get_title() or None,
+        "x_axis": _axis_to_dict(ax.xaxis, ax.get_xlim()),
+        "y_axis": _axis_to_dict(ax.yaxis, ax.get_ylim()),
+        "series": series,
+        "reference_lines": reference_lines,
+        "legend": [text.get_text() for text in legend.get_texts()] if legend else [],
+    }
+
+
+def figure_to_dict(fig: Figure) -> dict[str, object]:
+    """Get the data that the Figure plots: the title, axes, series and reference lines of each of its Axes."""
+    return {"axes": [_axes_to_dict(ax) for ax in fig.axes]}
+
+
+def export_figure(fig: Figure, path: str, export_format: str) -> None:
+    """
+    Export the Figure to a file in the given format.
+
+    Args:
+        fig (Figure): The Figure to export
+        path (str): The file to export to
+        export_format (str): One of EXPORT_FORMATS, i.e. an image (PNG or SVG) or the plotted data (JSON)
+    Raises:
+        ValueError: If the format isn't one of EXPORT_FORMATS
+    """
+    if export_format == PNG_FORMAT:
+        fig.savefig(path, format=PNG_FORMAT, bbox_inches="tight")
+    elif export_format == SVG_FORMAT:
+        with mpl.rc_context({"svg.hashsalt": SVG_HASH_SALT}):
+            fig.savefig(path, format=SVG_FORMAT, bbox_inches="tight", metadata={"Date": None})
+    elif export_format == JSON_FORMAT:
+        with open(path, "w", encoding=UTF8) as f:
+            json.dump(figure_to_dict(fig), f, separators=(",", ":"), allow_nan=False)
+    else:
+        msg = f"Unknown export format {export_format}, expected one of {', '.join(EXPORT_FORMATS)}"
+        raise ValueError(msg)
+
+
+def get_export_fname(f_name: str, export_format: str) -> str:
+    """Get the file that a plot saved as f_name (e.g. "weight.png") is exported to in the given format."""
+    return str(Path(f_name).with_suffix(f".{export_format}"))
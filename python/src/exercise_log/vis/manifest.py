@@ -0,0 +1,129 @@
+"""
+Keeps track of what each saved plot was rendered from, so plots whose inputs haven't changed aren't rendered again.
+
+The manifest is a JSON file alongside the plots that maps each plot's file name (relative to the image directory) to a
+hash of its inputs. The hashes are only valid for the plotting code that produced them, so a change to that code (or to
+matplotlib) discards every entry.
+"""
+
+import hashlib
+import json
+from collections.abc import Sequence
+from dataclasses import fields, is_dataclass
+from functools import cache, partial
+from pathlib import Path
+
+import matplotlib as mpl
+import numpy as np
+import pandas as pd
+
+from exercise_log.utils import UTF8
+
+MANIFEST_FNAME = ".manifest.json"
+# Bump this whenever plots change in a way that the plotting code's source doesn't show, e.g. a new font on disk
+MANIFEST_VERSION = 1
+
+
+def _update(digest: "hashlib._Hash", value: object) -> None:
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+    if isinstance(value, pd.DataFrame):
+        # The labels are hashed as strs so that e.g. np.str_ labels hash the same as the str ones that they're equal to
+        digest.update(repr([(str(label), str(dtype)) for label, dtype in value.dtypes.items()]).encode(UTF8))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype, value.shape)).encode(UTF8))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif is_dataclass(value) and not isinstance(value, type):
+        digest.update(type(value).__qualname__.encode(UTF8))
+        for field in fields(value):
+            _update(digest, getattr(value, field.name))
+    elif isinstance(value, (tuple, list, dict)):
+        # Containers are hashed item by item, their repr would truncate any DataFrames within them
+        items = value.items() if isinstance(value, dict) else value
+        digest.update(f"{type(value).__qualname__}:{len(value)}".encode(UTF8))
+        for item in items:
+            _update(digest, item)
+    else:
+        digest.update(repr(value).encode(UTF8))
+    # Separate the values so that e.g. ("ab", "c") and ("a", "bc") don't hash the same
+    digest.update(b"\0")
+
+
+def hash_inputs(*inputs: object) -> str:
+    """
+    Hash the inputs of a plot. DataFrames, Series and arrays are hashed by their contents (and dtypes), dataclasses by
+    each of their fields, tuples, lists and dicts by each of their items and anything else by its repr.
+    """
+    digest = hashlib.sha256()
+    for value in inputs:
+        _update(digest, value)
+    return digest.hexdigest()
+
+
+@cache
+def get_code_version() -> str:
+    """Get a hash that identifies the plotting code, i.e. the source of exercise_log.vis and the matplotlib version."""
+    digest = hashlib.sha256(f"{MANIFEST_VERSION}:{mpl.__version__}".encode(UTF8))
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class RenderManifest:
+    """
+    Records the hash of each saved plot's inputs (see hash_inputs()) for every file it was saved to. A plot only needs
+    to be rendered again when the hash of its inputs changes or one of its files goes missing.
+
+    Entries are only written to disk by save(), typically once all of the plots have been rendered.
+    """
+
+    def __init__(self, img_dir: str) -> None:
+        """Initialize this RenderManifest, loading the manifest in the image directory if there's a current one."""
+        self.img_dir = img_dir
+        self.path = Path(img_dir) / MANIFEST_FNAME
+        self._hashes: dict[str, str] = {}
+        try:
+            with open(self.path, encoding=UTF8) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            # A missing or corrupt manifest just means that every plot gets rendered
+            return
+        if isinstance(manifest, dict) and manifest.get("code_version") == get_code_version():
+            self._hashes = dict(manifest.get("plots", {}))
+
+    def is_current(self, fnames: Sequence[str], inputs_hash: str) -> bool:
+        """Check whether every file that the plot was saved to was rendered from inputs with the given hash."""
+        return all(self._hashes.get(fname) == inputs_hash and (Path(self.img_dir) / fname).exists() for fname in fnames)
+
+    def record(self, fnames: Sequence[str], inputs_hash: str) -> None:
+        """Record that the plot was just saved to the files from inputs with the given hash."""
+        for fname in fnames:
+            self._hashes[fname] = inputs_hash
+
+    def render(self, fnames: Sequence[str], plot: partial) -> bool:
+        """
+        Render a plot unless it was already rendered from the same inputs.
+
+        Args:
+            fnames (Sequence[str]): The files that the plot is saved to, relative to the image directory
+            plot (partial): The plotting function with all of its arguments bound, they're the plot's inputs
+        Returns:
+            Whether the plot was rendered
+        """
+        # Each keyword argument is hashed as a (name, value) tuple, i.e. by its name then by its value's contents
+        inputs_hash = hash_inputs(plot.func.__qualname__, *plot.args, *sorted(plot.keywords.items()))
+        if self.is_current(fnames, inputs_hash):
+            return False
+        plot()
+        self.record(fnames, inputs_hash)
+        return True
+
+    def save(self) -> None:
+        """Write the manifest into the image directory."""
+        manifest = {"code_version": get_code_version(), "plots": dict(sorted(self._hashes.items()))}
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding=UTF8) as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        tmp_path.replace(self.path)
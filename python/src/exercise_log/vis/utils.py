@@ -3,37 +3,57 @@
 from datetime import timedelta
 
 import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import pandas as pd
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 
 from exercise_log.constants import DATE
+from exercise_log.dataloader import ColumnName
 from exercise_log.vis.constants import ABOVE_TABLE
 
 
-def show_gcf_corners(plot: plt) -> None:
-    """Show the corners of the current plot by displaying x's."""
-    plot.gcf().text(0, 0, "x")
-    plot.gcf().text(1, 0, "x")
-    plot.gcf().text(0, 1, "x")
-    plot.gcf().text(1, 1, "x")
+def show_fig_corners(fig: Figure) -> None:
+    """Show the corners of the figure by displaying x's."""
+    fig.text(0, 0, "x")
+    fig.text(1, 0, "x")
+    fig.text(0, 1, "x")
+    fig.text(1, 1, "x")
 
 
-def configure_x_axis_by_month(data: pd.DataFrame, *, start_padding_days: int = 1, end_padding_days: int = 1) -> None:
-    """Set the current axes x-axis to major tick by month, minor tick on Sundays, and have MMM-YYYY major labels."""
-    ax = plt.gca()
+def configure_x_axis_by_month(
+    ax: Axes,
+    data: pd.DataFrame,
+    *,
+    start_padding_days: int = 1,
+    end_padding_days: int = 1,
+) -> None:
+    """Set the axes' x-axis to major tick by month, minor tick on Sundays, and have MMM-YYYY major labels."""
     ax.xaxis.set_major_locator(mdates.MonthLocator(interval=1))
     ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %Y"))
     ax.xaxis.set_minor_locator(mdates.WeekdayLocator(byweekday=mdates.SU))
-    plt.xlim(
+    ax.set_xlim(
         data[DATE].iloc[0] - timedelta(days=start_padding_days),
         data[DATE].iloc[-1] + timedelta(days=end_padding_days),
     )
 
 
-def create_legend_and_title(title: str, *, reverse_labels: bool = False, ncol: int = 2) -> None:
-    """Add a legend and title centered above the current plot."""
-    plt.title(title, y=ABOVE_TABLE)
-    handles, labels = plt.gca().get_legend_handles_labels()
+def plot_confidence_band(ax: Axes, confidence_band: pd.DataFrame, colour: str) -> None:
+    """Shade the confidence band of a trendline, in a lighter shade of the trendline's colour."""
+    ax.fill_between(
+        confidence_band[DATE],
+        confidence_band[ColumnName.LOWER_BOUND],
+        confidence_band[ColumnName.UPPER_BOUND],
+        color=colour,
+        alpha=0.2,
+        linewidth=0,
+        label="Confidence Band",
+    )
+
+
+def create_legend_and_title(ax: Axes, title: str, *, reverse_labels: bool = False, ncol: int = 2) -> None:
+    """Add a legend and title centered above the axes."""
+    ax.set_title(title, y=ABOVE_TABLE)
+    handles, labels = ax.get_legend_handles_labels()
     if reverse_labels:
         handles, labels = handles[::-1], labels[::-1]
-    plt.legend(handles, labels, bbox_to_anchor=(0.5, ABOVE_TABLE), loc="upper center", frameon=False, ncol=ncol)
+    ax.legend(handles, labels, bbox_to_anchor=(0.5, ABOVE_TABLE), loc="upper center", frameon=False, ncol=ncol)
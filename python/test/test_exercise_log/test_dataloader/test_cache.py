@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from exercise_log.dataloader import CName, DataLoader
+from exercise_log.dataloader.cache import DataCache
+
+HEALTH_METRICS_CSV = """date,weight(lbs),resting_heart_rate(bpm),notes
+03-FEB-2026,250.7,,""
+02-FEB-2026,248.9,66,"felt good"
+01-FEB-2026,,64,""
+"""
+EXTRA_ROW = '04-FEB-2026,249.1,65,""\n'
+NEW_ROWS = '05-FEB-2026,,63,""\n04-FEB-2026,249.1,,"new"\n'
+
+
+class TestDataCache(unittest.TestCase):
+    def setUp(self) -> None:
+        """Write a small health metrics CSV into a fresh temporary data directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp_dir.name
+        self.cache = DataCache(f"{self.data_dir}/.cache")
+        self.fname = f"{self.data_dir}/health_metrics.csv"
+        Path(self.fname).write_text(HEALTH_METRICS_CSV, encoding="utf-8")
+        self.parsed_sizes = []
+
+    def tearDown(self) -> None:
+        """Clean up the temporary data directory."""
+        self._tmp_dir.cleanup()
+
+    def test_cached_data_matches_parsed_data(self) -> None:
+        """Checks that a warm load from the cache returns exactly what parsing the CSV returns."""
+        expected = DataLoader.load_health_metrics(self.data_dir)
+        cold = DataLoader.load_health_metrics(self.data_dir, self.cache)
+        warm = DataLoader.load_health_metrics(self.data_dir, self.cache)
+        pd.testing.assert_frame_equal(expected, cold, check_exact=True)
+        pd.testing.assert_frame_equal(expected, warm, check_exact=True)
+        # The column labels are exactly the same too, not just equal (e.g. np.str_ rather than str)
+        self.assertEqual([str] * len(expected.columns), [type(column) for column in warm.columns])
+        self.assertEqual(list(map(repr, expected.columns)), list(map(repr, warm.columns)))
+
+    def test_warm_load_skips_parsing(self) -> None:
+        """Checks that an unchanged CSV is served from the cache without calling the loader."""
+        self.cache.get_or_load(self.fname, DataLoader.parse_and_clean_bytes)
+
+        def fail_loader(_: bytes, __: str) -> pd.DataFrame:
+            self.fail("The CSV was parsed even though it hadn't changed")
+
+        self.cache.get_or_load(self.fname, fail_loader)
+
+    def test_touched_but_unchanged_csv_is_a_hit(self) -> None:
+        """Checks that a new mtime alone doesn't invalidate the entry since the content hash still matches."""
+        self.cache.get_or_load(self.fname, DataLoader.parse_and_clean_bytes)
+        stat = Path(self.fname).stat()
+        os.utime(self.fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNotNone(self.cache.load(self.fname), "Entry was invalidated by an mtime-only change")
+
+    def test_modified_csv_is_a_miss(self) -> None:
+        """Checks that changing the CSV invalidates its entry and the next load picks up the new row."""
+        self.cache.get_or_load(self.fname, DataLoader.parse_and_clean_bytes)
+        with open(self.fname, "a", encoding="utf-8") as f:
+            f.write(EXTRA_ROW)
+        self.assertIsNone(self.cache.load(self.fname), "Entry should have been invalidated by the new row")
+
+        df = self.cache.get_or_load(self.fname, DataLoader.parse_and_clean_bytes)
+        self.assertEqual(4, len(df))
+        self.assertEqual(pd.Timestamp("2026-02-04"), df[CName.DATE].iloc[-1])
+
+    def _record_parse(self, raw: bytes, fname: str) -> pd.DataFrame:
+        self.parsed_sizes.append(raw.count(b"\n") - 1)
+        return DataLoader.parse_and_clean_bytes(raw, fname)
+
+    def _write_with_new_rows(self) -> None:
+        header, rows = HEALTH_METRICS_CSV.split("\n", 1)
+        Path(self.fname).write_text(f"{header}\n{NEW_ROWS}{rows}", encoding="utf-8")
+
+    def test_new_rows_are_parsed_incrementally(self) -> None:
+        """Checks that rows added to the top of the CSV are parsed on their own and merged with the cached rows."""
+        self.cache.get_or_load(self.fname, DataLoader.parse_and_clean_bytes, DataLoader._merge_new_rows)
+        self._write_with_new_rows()
+
+        df = self.cache.get_or_load(self.fname, self._record_parse, DataLoader._merge_new_rows)
+        self.assertEqual([2], self.parsed_sizes, "Only the new rows should have been parsed")
+        pd.testing.assert_frame_equal(DataLoader.load_health_metrics(self.data_dir), df, check_exact=True)
+        pd.testing.assert_frame_equal(df, self.cache.load(self.fname), check_exact=True)
+
+    def test_edited_older_row_is_a_full_reload(self) -> None:
+        """Checks that editing a row that was already cached falls back to parsing the whole CSV."""
+        self.cache.get_or_load(self.fname, DataLoader.parse_and_clean_bytes, DataLoader._merge_new_rows)
+        Path(self.fname).write_text(HEALTH_METRICS_CSV.replace("248.9", "248.8"), encoding="utf-8")
+
+        df = self.cache.get_or_load(self.fname, self._record_parse, DataLoader._merge_new_rows)
+        self.assertEqual([3], self.parsed_sizes, "The whole CSV should have been parsed")
+        self.assertEqual(248.8, df[CName.WEIGHT].iloc[1])
@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import DataLoader
+from exercise_log.dataloader.categorical import equals, is_in, map_values, starts_with, to_categorical
+
+RATINGS = pd.Series(["good", "bad (L)", None, "superset", "bad", "warm-up", "good"], dtype="str")
+KNOWN_RATINGS = ["bad", "bad (L)", "good", "warm-up"]
+
+
+class TestCategorical(unittest.TestCase):
+    def test_known_categories_come_first(self) -> None:
+        """Checks that the known categories keep their order and unexpected values are appended rather than lost."""
+        categorical = to_categorical(RATINGS, KNOWN_RATINGS)
+        self.assertEqual([*KNOWN_RATINGS, "superset"], list(categorical.cat.categories))
+        self.assertEqual(RATINGS.isna().tolist(), categorical.isna().tolist())
+        self.assertEqual(RATINGS.dropna().tolist(), categorical.dropna().tolist())
+
+    def test_filters_match_on_str_and_categorical(self) -> None:
+        """Checks that each filter gives the same mask whether the column is a plain str or a Categorical."""
+        categorical = to_categorical(RATINGS, KNOWN_RATINGS)
+        for values in [RATINGS, categorical]:
+            np.testing.assert_array_equal([True, False, False, False, False, False, True], equals(values, "good"))
+            np.testing.assert_array_equal(
+                [False, False, False, True, False, True, False],
+                is_in(values, ["warm-up", "superset", "deload"]),
+            )
+            np.testing.assert_array_equal([False, True, False, False, True, False, False], starts_with(values, "bad"))
+
+    def test_map_values_calls_once_per_value(self) -> None:
+        """Checks that map_values broadcasts the result of a single call per distinct value."""
+        values = RATINGS.dropna()
+        for column in [values, to_categorical(values, KNOWN_RATINGS)]:
+            calls = []
+
+            def length(value: str, calls: list[str] = calls) -> int:
+                calls.append(value)
+                return len(value)
+
+            np.testing.assert_array_equal(values.str.len().to_numpy(), map_values(column, length, dtype=int))
+            self.assertEqual(len(set(calls)), len(calls), "The function was called more than once for a value")
+
+    def test_merged_categoricals_stay_categorical(self) -> None:
+        """Checks that merging datasets whose Categoricals have different categories keeps the column Categorical."""
+        first = DataLoader.to_categoricals(pd.DataFrame({"location": ["Gym A", "Gym B"], "x": [1, 2]}))
+        second = DataLoader.to_categoricals(pd.DataFrame({"location": ["Gym C", "Gym A"], "x": [3, 4]}))
+        merged = DataLoader.merge_on_common_columns([first, second])
+        self.assertIsInstance(merged["location"].dtype, pd.CategoricalDtype)
+        self.assertEqual(["Gym A", "Gym B", "Gym C", "Gym A"], merged["location"].tolist())
@@ -0,0 +1,115 @@
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from exercise_log.dataloader import CName, DataBox, Dataset
+
+SETS_CSV = """date,exercise,reps,weight(lbs),rating
+03-FEB-2026,Deadlift,5,225,good
+03-FEB-2026,Deadlift,5,225,difficult
+02-FEB-2026,Incline Dumbbell Press,10,60,good
+01-FEB-2026,Deadlift,5,215,easy
+01-FEB-2026,Incline Dumbbell Press,10,55,good
+"""
+WALKS_CSV = (
+    "date,workout_type,duration(HH:mm:ss),distance(km),steps,elevation(m),weight(lbs),avg_heart_rate,max_heart_rate,"
+    "notes\n"
+    '03-FEB-2026,walk (treadmill),00:34:59,3.03,3859,131,0,,178,""\n'
+    '01-FEB-2026,walk (outdoor),01:03:21,5.76,,218,20,164,173,"windy"\n'
+)
+HEALTH_METRICS_CSV = """date,weight(lbs),resting_heart_rate(bpm),notes
+03-FEB-2026,250.7,,""
+02-FEB-2026,248.9,66,"felt good"
+01-FEB-2026,,64,""
+"""
+NEW_SET = "04-FEB-2026,Deadlift,3,235,good\n"
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self) -> None:
+        """Write a few small CSVs into a fresh temporary data directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp_dir.name
+        self.db_path = f"{self.data_dir}/.db/exercise_log.sqlite"
+        for fname, contents in [
+            ("weight_training_sets.csv", SETS_CSV),
+            ("walks.csv", WALKS_CSV),
+            ("health_metrics.csv", HEALTH_METRICS_CSV),
+        ]:
+            Path(f"{self.data_dir}/{fname}").write_text(contents, encoding="utf-8")
+
+    def tearDown(self) -> None:
+        """Clean up the temporary data directory."""
+        self._tmp_dir.cleanup()
+
+    def _assert_parity(self, datasets: list[Dataset]) -> None:
+        """Assert that a cold then warm SQLite-backed DataBox returns exactly what parsing the CSVs returns."""
+        for _ in range(2):
+            expected, actual = DataBox(self.data_dir), DataBox(self.data_dir, db_path=self.db_path)
+            for dataset in datasets:
+                pd.testing.assert_frame_equal(
+                    expected._get_dataset(dataset),
+                    actual._get_dataset(dataset),
+                    check_exact=True,
+                    obj=dataset,
+                )
+
+    def test_backends_return_the_same_data(self) -> None:
+        """Checks that the datasets are identical whether they're parsed or read from the database."""
+        self._assert_parity([Dataset.WEIGHT_TRAINING_SETS, Dataset.WALK_WORKOUTS, Dataset.HEALTH_METRICS])
+
+    def test_backends_return_the_same_query_results(self) -> None:
+        """Checks that queries pushed down to the database match filtering the parsed datasets."""
+        DataBox(self.data_dir, db_path=self.db_path).preload([Dataset.WEIGHT_TRAINING_SETS])
+        queries = [
+            {},
+            {"start": date(2026, 2, 2)},
+            {"end": date(2026, 2, 2)},
+            {"start": date(2026, 2, 2), "end": date(2026, 2, 2)},
+            {"exercise": "Deadlift"},
+            {"start": date(2026, 2, 2), "exercise": "Incline Dumbbell Press"},
+            {"exercise": "Barbell Lunges"},
+        ]
+        for kwargs in queries:
+            expected = DataBox(self.data_dir).query(Dataset.WEIGHT_TRAINING_SETS, **kwargs)
+            actual = DataBox(self.data_dir, db_path=self.db_path).query(Dataset.WEIGHT_TRAINING_SETS, **kwargs)
+            pd.testing.assert_frame_equal(
+                expected.reset_index(drop=True),
+                actual.reset_index(drop=True),
+                check_exact=True,
+                obj=str(kwargs),
+            )
+
+        with self.assertRaises(ValueError):  # noqa: PT027
+            DataBox(self.data_dir, db_path=self.db_path).query(Dataset.WALK_WORKOUTS, exercise="Deadlift")
+
+    def test_new_rows_are_merged(self) -> None:
+        """Checks that rows added to the top of a CSV are picked up by the database too."""
+        self._assert_parity([Dataset.WEIGHT_TRAINING_SETS])
+        fname = f"{self.data_dir}/weight_training_sets.csv"
+        header, rows = SETS_CSV.split("\n", 1)
+        Path(fname).write_text(f"{header}\n{NEW_SET}{rows}", encoding="utf-8")
+
+        self._assert_parity([Dataset.WEIGHT_TRAINING_SETS])
+        sets = DataBox(self.data_dir, db_path=self.db_path).query(Dataset.WEIGHT_TRAINING_SETS, start=date(2026, 2, 4))
+        self.assertEqual([235], sets[CName.WEIGHT].tolist())
+
+    def test_queries_use_the_indexes(self) -> None:
+        """Checks that the date and exercise indexes were created and are used to answer queries."""
+        DataBox(self.data_dir, db_path=self.db_path).preload([Dataset.WEIGHT_TRAINING_SETS])
+        with sqlite3.connect(self.db_path) as conn:
+            plan = conn.execute(
+                'EXPLAIN QUERY PLAN SELECT * FROM weight_training_sets WHERE "exercise" = ? AND "date" >= ?',
+                ("Deadlift", 0),
+            ).fetchall()
+        conn.close()
+        self.assertIn("USING INDEX weight_training_sets_exercise_date", " ".join(row[-1] for row in plan))
+
+    def test_cache_dir_and_db_path_are_exclusive(self) -> None:
+        """Checks that only one of the two storage backends can be chosen."""
+        with self.assertRaises(ValueError):  # noqa: PT027
+            DataBox(self.data_dir, cache_dir=f"{self.data_dir}/.cache", db_path=self.db_path)
@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from exercise_log.dataloader import CName, DataLoader
+from exercise_log.dataloader.cache import DataCache, Fingerprint
+from exercise_log.dataloader.journal import Journal, get_journal_fname
+
+SETS = "weight_training_sets.csv"
+SETS_CSV = """date,exercise,reps,weight(lbs),rating
+03-FEB-2026,Deadlift,5,225,good
+01-FEB-2026,Deadlift,5,215,easy
+"""
+# The journaled rows below go on top of the newest-first CSV, the last one logged on top of any others on its date
+COMPACTED_SETS_CSV = """date,exercise,reps,weight(lbs),rating
+05-FEB-2026,Deadlift,3,245,difficult
+04-FEB-2026,Incline Dumbbell Press,10,60,good
+03-FEB-2026,Deadlift,1,255,difficult
+03-FEB-2026,Deadlift,3,235,good
+02-FEB-2026,Incline Dumbbell Press,10,55,good
+03-FEB-2026,Deadlift,5,225,good
+01-FEB-2026,Deadlift,5,215,easy
+"""
+JOURNALED_SETS = [
+    (date(2026, 2, 3), "Deadlift", 3, 235, "good"),
+    (date(2026, 2, 4), "Incline Dumbbell Press", 10, 60, "good"),
+    (date(2026, 2, 2), "Incline Dumbbell Press", 10, 55, "good"),
+    (date(2026, 2, 5), "Deadlift", 3, 245, "difficult"),
+    (date(2026, 2, 3), "Deadlift", 1, 255, "difficult"),
+]
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self) -> None:
+        """Write a small weight training sets CSV into a fresh temporary data directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp_dir.name
+        self.fname = f"{self.data_dir}/{SETS}"
+        Path(self.fname).write_text(SETS_CSV, encoding="utf-8")
+        self.journal = DataLoader.open_journal(self.data_dir)
+
+    def tearDown(self) -> None:
+        """Clean up the temporary data directory."""
+        self._tmp_dir.cleanup()
+
+    def _log_sets(self) -> None:
+        for day, exercise, reps, weight, rating in JOURNALED_SETS:
+            record = {CName.DATE: day, CName.EXERCISE: exercise, CName.REPS: reps, CName.WEIGHT: weight}
+            self.journal.append(SETS, {**record, CName.RATING: rating})
+
+    def _load_compacted(self) -> pd.DataFrame:
+        compacted_dir = Path(self.data_dir) / "compacted"
+        compacted_dir.mkdir()
+        (compacted_dir / SETS).write_text(COMPACTED_SETS_CSV, encoding="utf-8")
+        return DataLoader.load_weight_training_sets(str(compacted_dir))
+
+    def test_journaled_rows_are_merged_at_load_time(self) -> None:
+        """Checks that loading a dataset with a journal matches loading the CSV with the rows already in place."""
+        self._log_sets()
+        expected = self._load_compacted()
+        cache = DataCache(f"{self.data_dir}/.cache")
+        for df_cache in [None, cache, cache]:  # Uncached, cold then warm
+            pd.testing.assert_frame_equal(expected, DataLoader.load_weight_training_sets(self.data_dir, df_cache))
+
+    def test_compaction_rewrites_the_csv(self) -> None:
+        """Checks that compacting puts the rows where they belong in the newest-first CSV and clears the journal."""
+        self._log_sets()
+        before = DataLoader.load_weight_training_sets(self.data_dir)
+
+        self.assertEqual({SETS: len(JOURNALED_SETS)}, DataLoader.compact_journal(self.data_dir))
+        self.assertEqual(COMPACTED_SETS_CSV, Path(self.fname).read_text(encoding="utf-8"))
+        self.assertFalse(Path(get_journal_fname(self.fname)).exists())
+        pd.testing.assert_frame_equal(before, DataLoader.load_weight_training_sets(self.data_dir))
+        self.assertEqual({}, DataLoader.compact_journal(self.data_dir))
+
+    def test_compaction_only_adds_to_the_top(self) -> None:
+        """Checks that a cached copy of the CSV only has to parse the compacted rows, not the whole CSV again."""
+        fingerprint = Fingerprint.of(SETS_CSV.encode(), mtime_ns=0, num_rows=2)
+        self._log_sets()
+        DataLoader.compact_journal(self.data_dir)
+        new_rows = fingerprint.get_new_rows(Path(self.fname).read_bytes())
+        self.assertEqual(len(JOURNALED_SETS), len(new_rows.decode().splitlines()) - 1)
+
+        cache = DataCache(f"{self.data_dir}/.cache")
+        Path(self.fname).write_text(SETS_CSV, encoding="utf-8")
+        DataLoader.load_weight_training_sets(self.data_dir, cache)
+        self._log_sets()
+        DataLoader.compact_journal(self.data_dir)
+        pd.testing.assert_frame_equal(
+            self._load_compacted(), DataLoader.load_weight_training_sets(self.data_dir, cache)
+        )
+
+    def test_invalid_record_is_rejected(self) -> None:
+        """Checks that a row that wouldn't load is rejected before it's written to the journal."""
+        day = date(2026, 2, 4)
+        invalid_records = [
+            {CName.DATE: day, CName.EXERCISE: "Not An Exercise", CName.REPS: 5, CName.WEIGHT: 225},
+            {CName.DATE: day, CName.EXERCISE: "Deadlift", CName.REPS: "five", CName.WEIGHT: 225},
+            {CName.DATE: "04-02-2026", CName.EXERCISE: "Deadlift", CName.REPS: 5, CName.WEIGHT: 225},
+        ]
+        for record in invalid_records:
+            with self.subTest(record=record), self.assertRaises(ValueError):  # noqa: PT027
+                self.journal.append(SETS, record)
+        self.assertFalse(Path(get_journal_fname(self.fname)).exists())
+
+    def test_invalid_journal_is_not_compacted(self) -> None:
+        """Checks that a journaled row that doesn't load stops compaction before the CSV is touched."""
+        unvalidated = Journal(self.data_dir)
+        unvalidated.append(SETS, {CName.DATE: date(2026, 2, 4), CName.EXERCISE: "Not An Exercise"})
+        with self.assertRaises(ValueError):  # noqa: PT027
+            DataLoader.compact_journal(self.data_dir)
+        self.assertEqual(SETS_CSV, Path(self.fname).read_text(encoding="utf-8"))
+
+    def test_unknown_column(self) -> None:
+        """Checks that a record with a column the dataset doesn't have is rejected."""
+        with self.assertRaises(ValueError):  # noqa: PT027
+            self.journal.append(SETS, {CName.DATE: date(2026, 2, 4), CName.DURATION: "00:01:00"})
+        self.assertFalse(Path(get_journal_fname(self.fname)).exists())
@@ -0,0 +1,203 @@
+import itertools
+import tempfile
+import threading
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import DATASET_LOADERS, CName, DataBox, DataLoader, Dataset
+from exercise_log.dataloader.query import RowFilter
+
+SETS_HEADER = "date,exercise,reps,weight(lbs),rating\n"
+
+
+class TestDataLoader(unittest.TestCase):
+    def setUp(self) -> None:
+        """Create a fresh temporary directory to write CSVs into."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """Clean up the temporary directory."""
+        self._tmp_dir.cleanup()
+
+    def _write_csv(self, contents: str, newline: str = "\n") -> str:
+        fname = f"{self._tmp_dir.name}/data.csv"
+        Path(fname).write_bytes(contents.replace("\n", newline).encode("utf-8"))
+        return fname
+
+    def _assert_raises_message(self, fname: str, expected_msg: str) -> None:
+        with self.assertRaises(ValueError) as cm:  # noqa: PT027
+            DataLoader._parse_and_clean_data(fname)
+        self.assertEqual(expected_msg, str(cm.exception))
+
+    def test_quoted_delimiters_are_not_ragged(self) -> None:
+        """Checks that commas, escaped quotes and line breaks inside quotes don't count as field separators."""
+        for newline in ["\n", "\r\n"]:
+            fname = self._write_csv('date,notes\n01-JAN-2024,"a, ""b""\nc"\n02-JAN-2024,""\n', newline)
+            df = DataLoader._parse_and_clean_data(fname)
+            self.assertEqual(2, len(df), f"Expected 2 rows using newline {newline!r}")
+            self.assertEqual(f'a, "b"{newline}c', df[CName.NOTES].iloc[0])
+
+    def test_short_row_is_ragged(self) -> None:
+        """Checks that a row with too few fields is reported using its line number in the file."""
+        fname = self._write_csv('date,notes,reps\n01-JAN-2024,"x,\ny",3\n02-JAN-2024,4\n')
+        self._assert_raises_message(fname, f"File {fname} is ragged at row 4: \"['02-JAN-2024', '4']\"")
+
+    def test_long_row_is_ragged(self) -> None:
+        """Checks that a row with too many fields is reported the same way as one with too few."""
+        fname = self._write_csv("date,reps\n01-JAN-2024,3\n02-JAN-2024,4,5\n")
+        self._assert_raises_message(fname, f"File {fname} is ragged at row 3: \"['02-JAN-2024', '4', '5']\"")
+
+    def test_blank_row_is_ragged(self) -> None:
+        """Checks that a blank line in the middle of the file is reported as ragged."""
+        fname = self._write_csv("date,reps\n01-JAN-2024,3\n\n02-JAN-2024,4\n")
+        self._assert_raises_message(fname, f'File {fname} is ragged at row 3: "[]"')
+
+    def test_empty_csv(self) -> None:
+        """Checks that an empty file is reported as such."""
+        fname = self._write_csv("")
+        self._assert_raises_message(fname, f"CSV at {fname} was empty.")
+
+    def test_invalid_exercise_reports_csv_row(self) -> None:
+        """Checks that an unknown exercise is reported using its row in the (newest-first) CSV, not its sorted row."""
+        fname = self._write_csv(
+            SETS_HEADER + "03-JAN-2024,Bicep Curl,10,30,good\n02-JAN-2024,Bicep Curls,10,30,good\n",
+        )
+        expected = f'"Bicep Curls" at row 3 in {fname} is not an expected exercise, did you mean "Bicep Curl"'
+        self._assert_raises_message(fname, expected)
+
+    def test_daily_workout_types(self) -> None:
+        """Checks that days with one workout type keep it, days with several are mixed, and the rest are rest days."""
+        days = pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-03", "2024-01-04", "2024-01-04"])
+        cardio = pd.DataFrame(
+            {
+                CName.DATE: days[:3],
+                CName.WORKOUT_TYPE: ["walk (treadmill)", "walk (treadmill)", "run (treadmill)"],
+                CName.DURATION: pd.array([600, 900, 1200], dtype="Int64"),
+            },
+        )
+        weight_training = pd.DataFrame(
+            {
+                CName.DATE: days[3:],
+                CName.WORKOUT_TYPE: ["Weight Training", "Weight Training"],
+                CName.DURATION: pd.array([1800, 300], dtype="Int64"),
+            },
+        )
+        travel = pd.DataFrame(
+            {
+                CName.DATE: pd.to_datetime(["2024-01-03"]),
+                CName.WORKOUT_TYPE: ["Travel"],
+                CName.DURATION: pd.array([0], dtype="Int64"),
+            },
+        )
+        for categorical in [False, True]:
+            frames = [cardio, weight_training, travel]
+            if categorical:
+                frames = [DataLoader.to_categoricals(frame) for frame in frames]
+            all_workouts = DataLoader.load_all_workouts(*frames)
+            self.assertEqual(
+                ["walk (treadmill)", "Rest Day", "Mixed", "Weight Training"],
+                all_workouts[CName.WORKOUT_TYPE].tolist(),
+            )
+            self.assertEqual([1500, 0, 1200, 2100], all_workouts[CName.DURATION].tolist())
+
+
+class TestDataBox(unittest.TestCase):
+    def setUp(self) -> None:
+        """Write a small health metrics CSV into a fresh temporary data directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        Path(f"{self._tmp_dir.name}/health_metrics.csv").write_text(
+            'date,weight(lbs),resting_heart_rate(bpm),notes\n02-FEB-2026,248.9,66,""\n01-FEB-2026,,64,""\n',
+            encoding="utf-8",
+        )
+        Path(f"{self._tmp_dir.name}/weight_training_sets.csv").write_text(
+            SETS_HEADER
+            + "03-FEB-2026,Deadlift,5,225,good\n03-FEB-2026,Bicep Curl,10,30,good\n"
+            + "02-FEB-2026,Bicep Curl,10,25,good\n01-FEB-2026,Deadlift,5,215,good\n",
+            encoding="utf-8",
+        )
+        self.databox = DataBox(self._tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Clean up the temporary data directory."""
+        self._tmp_dir.cleanup()
+
+    def test_getter_returns_preloaded_dataset(self) -> None:
+        """Checks that the getters return the preloaded DataFrame rather than loading it again."""
+        timings = self.databox.preload([Dataset.HEALTH_METRICS], max_workers=2)
+        self.assertEqual([Dataset.HEALTH_METRICS], list(timings))
+        self.assertGreaterEqual(timings[Dataset.HEALTH_METRICS], 0)
+
+        preloaded = self.databox.get_health_metrics()
+        pd.testing.assert_frame_equal(DataLoader.load_health_metrics(self._tmp_dir.name), preloaded)
+        self.assertIs(preloaded, self.databox.get_health_metrics())
+
+    def test_concurrent_first_access_loads_once(self) -> None:
+        """Checks that threads racing to access a dataset for the first time only load its CSV once."""
+        num_threads = 8
+        barrier = threading.Barrier(num_threads)
+        load_health_metrics = DATASET_LOADERS[Dataset.HEALTH_METRICS]
+        num_loads = []
+
+        def counting_loader(*args: object) -> pd.DataFrame:
+            num_loads.append(1)
+            return load_health_metrics(*args)
+
+        def access() -> None:
+            barrier.wait()
+            self.databox.get_health_metrics()
+
+        with mock.patch.dict(DATASET_LOADERS, {Dataset.HEALTH_METRICS: counting_loader}):
+            threads = [threading.Thread(target=access) for _ in range(num_threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(1, len(num_loads))
+
+    def test_query_matches_filtering(self) -> None:
+        """Checks that querying with the RowIndex selects exactly the rows that a boolean mask does."""
+        days = [None, *(date(2026, 2, day) for day in range(1, 5))]
+        for categorical in [False, True]:
+            databox = DataBox(self._tmp_dir.name, categorical=categorical)
+            sets = databox.get_weight_training_sets()
+            for start, end, exercise in itertools.product(days, days, [None, "Deadlift", "Bicep Curl", "Plank"]):
+                pd.testing.assert_frame_equal(
+                    RowFilter(start, end, exercise).apply(sets),
+                    databox.query(Dataset.WEIGHT_TRAINING_SETS, start, end, exercise),
+                    obj=f"{start}, {end}, {exercise}",
+                )
+
+        with self.assertRaises(ValueError):  # noqa: PT027
+            self.databox.query(Dataset.HEALTH_METRICS, exercise="Deadlift")
+
+    def test_date_range_query_is_a_view(self) -> None:
+        """Checks that a date range is sliced out of the loaded dataset rather than copied."""
+        sets = self.databox.get_weight_training_sets()
+        queried = self.databox.query(Dataset.WEIGHT_TRAINING_SETS, start=date(2026, 2, 2))
+        self.assertEqual(3, len(queried))
+        self.assertTrue(np.shares_memory(sets[CName.REPS].to_numpy(), queried[CName.REPS].to_numpy()))
+
+    def test_snapshot_restores_loaded_datasets(self) -> None:
+        """Checks that a restored snapshot holds the same datasets without going back to the CSVs."""
+        snapshot_path = f"{self._tmp_dir.name}/snapshot.npz"
+        for categorical in [False, True]:
+            databox = DataBox(self._tmp_dir.name, categorical=categorical)
+            databox.preload([Dataset.HEALTH_METRICS, Dataset.WEIGHT_TRAINING_SETS])
+            # A filtered dataset keeps the index labels of its rows
+            databox._datasets[Dataset.HEALTH_METRICS] = databox.get_health_metrics().iloc[[1]]
+            databox.snapshot(snapshot_path)
+
+            with mock.patch.dict(DATASET_LOADERS, {dataset: mock.Mock() for dataset in Dataset}):
+                restored = DataBox.restore(snapshot_path)
+                pd.testing.assert_frame_equal(databox.get_health_metrics(), restored.get_health_metrics())
+                pd.testing.assert_frame_equal(databox.get_weight_training_sets(), restored.get_weight_training_sets())
+            self.assertEqual(categorical, restored.categorical)
+            self.assertFalse(restored.get_weight_training_sets()[CName.REPS].to_numpy().flags.owndata)
+
+        with self.assertRaises(ValueError):  # noqa: PT027
+            DataBox.restore(f"{self._tmp_dir.name}/health_metrics.csv")
@@ -0,0 +1,28 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader.parsing import parse_durations
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_durations(self) -> None:
+        """Checks well-formed, lenient and missing durations all parse to the expected whole seconds."""
+        values = pd.Series(["01:09:00", None, "00:00:59", "1:02:03", "100:00:00", "23:59:59"], name="duration")
+        expected = pd.Series([4140, None, 59, 3723, 360000, 86399], dtype="Int64", name="duration")
+        pd.testing.assert_series_equal(expected, parse_durations(values))
+
+    def test_parse_durations_matches_timedelta(self) -> None:
+        """Checks the vectorized parser against pd.to_timedelta on a large, random sample."""
+        rng = np.random.default_rng(0)
+        seconds = rng.integers(0, 100 * 60 * 60, size=1000)
+        values = pd.Series([f"{s // 3600:02}:{s // 60 % 60:02}:{s % 60:02}" for s in seconds])
+        expected = pd.to_timedelta(values).dt.total_seconds().astype("Int64")
+        pd.testing.assert_series_equal(expected, parse_durations(values))
+
+    def test_parse_durations_all_missing(self) -> None:
+        """Checks that a column without any durations (which pandas reads as floats) becomes all NA."""
+        values = pd.Series([np.nan, np.nan])
+        expected = pd.Series([None, None], dtype="Int64")
+        pd.testing.assert_series_equal(expected, parse_durations(values))
@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from exercise_log.dataloader import SCHEMA, CName, DataLoader
+from exercise_log.dataloader.cache import DataCache
+
+STAIRS_CSV = (
+    "date,workout_type,duration(HH:mm:ss),flights_up,flights_down,pack_weight(lbs),avg_heart_rate,max_heart_rate,"
+    "location,notes\n"
+    "02-FEB-2026,Stairs,00:30:00,40,40,0,,150,Gym,\n"
+    "01-FEB-2026,Stairs,00:25:00,35,,20,120,,Gym,\n"
+)
+
+
+class TestSchema(unittest.TestCase):
+    def setUp(self) -> None:
+        """Write a small stairs CSV into a fresh temporary data directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp_dir.name
+        self.fname = f"{self.data_dir}/stairs.csv"
+        Path(self.fname).write_text(STAIRS_CSV, encoding="utf-8")
+
+    def tearDown(self) -> None:
+        """Clean up the temporary data directory."""
+        self._tmp_dir.cleanup()
+
+    def test_columns_are_read_as_declared(self) -> None:
+        """Checks that each column comes out of the reader with the dtype its schema declares."""
+        df = DataLoader.load_stair_workouts(self.data_dir)
+        for column in SCHEMA.get_columns("stairs"):
+            if column.name in {CName.DATE, CName.DATA_DURATION}:
+                continue
+            self.assertEqual(column.get_reader_dtype(), str(df[column.name].dtype), column.name)
+        self.assertEqual("str", str(df[CName.NOTES].dtype), "An entirely empty text column should still be a str")
+
+    def test_requested_columns_are_projected(self) -> None:
+        """Checks that only the requested columns (plus the date) are loaded, with or without the cache."""
+        cache = DataCache(f"{self.data_dir}/.cache")
+        columns = [CName.DURATION, CName.AVG_HEART_RATE]
+        expected = [CName.DATE, CName.DURATION, CName.AVG_HEART_RATE, CName.DISTANCE]  # Distance is always added
+        for df_cache in [None, cache, cache]:  # Uncached, cold then warm
+            df = DataLoader.load_stair_workouts(self.data_dir, df_cache, columns)
+            self.assertEqual(expected, list(df.columns))
+            self.assertEqual([1500, 1800], df[CName.DURATION].tolist())
+
+    def test_missing_required_value(self) -> None:
+        """Checks that an empty value in a non-nullable column is reported with its row in the CSV."""
+        Path(self.fname).write_text(STAIRS_CSV.replace(",Gym,\n01", ",,\n01"), encoding="utf-8")
+        with self.assertRaises(ValueError) as cm:  # noqa: PT027
+            DataLoader.load_stair_workouts(self.data_dir)
+        self.assertEqual(f'"location" is missing at row 2 in {self.fname} but is required', str(cm.exception))
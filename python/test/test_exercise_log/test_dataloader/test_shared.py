@@ -0,0 +1,52 @@
+import unittest
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName, DataLoader
+from exercise_log.dataloader.shared import SharedFrames, SharedFramesHandle, attach_frames
+
+SETS = pd.DataFrame(
+    {
+        CName.DATE: pd.to_datetime(["2026-02-01", "2026-02-01", "2026-02-03"]).as_unit("us"),
+        CName.EXERCISE: pd.array(["Deadlift", "Bicep Curl", "Deadlift"], dtype="str"),
+        CName.REPS: [5, 10, 3],
+        CName.WEIGHT: [215.0, 25.0, np.nan],
+        CName.RATING: pd.array(["good", None, "easy"], dtype="str"),
+        CName.DURATION: pd.array([None, 60, 90], dtype="Int64"),
+    },
+)
+
+# The frames that the pool worker attached to in test_workers_only_receive_keys
+_worker_frames: dict[str, pd.DataFrame] = {}
+
+
+def _attach(handle: SharedFramesHandle) -> None:
+    _worker_frames.update(attach_frames(handle))
+
+
+def _count_sets(exercise: str) -> int:
+    sets = _worker_frames["sets"]
+    return int((sets[CName.EXERCISE] == exercise).sum())
+
+
+class TestSharedFrames(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        """Checks that attaching to published frames gives back identical, read-only DataFrames."""
+        frames = {"sets": SETS, "categorical": DataLoader.to_categoricals(SETS), "filtered": SETS.iloc[[2, 0]]}
+        with SharedFrames(frames) as shared:
+            attached = attach_frames(shared.handle)
+            self.assertEqual(list(frames), list(attached))
+            for name, df in frames.items():
+                pd.testing.assert_frame_equal(df, attached[name])
+
+            reps = attached["sets"][CName.REPS]
+            self.assertFalse(reps.to_numpy().flags.writeable)
+            reps.iloc[0] = 1  # Writing gives the DataFrame its own copy rather than modifying the shared memory
+            self.assertEqual(5, attach_frames(shared.handle)["sets"][CName.REPS].iloc[0])
+
+    def test_workers_only_receive_keys(self) -> None:
+        """Checks that pool workers can attach to the published frames when they start and then work on them."""
+        with SharedFrames({"sets": SETS}) as shared, Pool(1, initializer=_attach, initargs=(shared.handle,)) as pool:
+            self.assertEqual([2, 1, 0], pool.map(_count_sets, ["Deadlift", "Bicep Curl", "Plank"]))
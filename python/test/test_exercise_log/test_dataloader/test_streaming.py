@@ -0,0 +1,134 @@
+import itertools
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from exercise_log.dataloader import CName, DataLoader
+from exercise_log.dataloader.journal import Journal
+from exercise_log.dataloader.streaming import (
+    SET_COLUMNS,
+    aggregate_daily_cardio,
+    iter_clean_chunks,
+    iter_raw_chunks,
+    stream_daily_sets,
+    summarize_exercises,
+)
+
+SETS_HEADER = "date,exercise,reps,weight(lbs),rating\n"
+EXERCISES = ["Deadlift", "Incline Dumbbell Press", "Barbell Lunges"]
+WALKS_HEADER = "date,workout_type,duration(HH:mm:ss),distance(km),steps,elevation(m),weight(lbs),avg_heart_rate,"
+WALKS_CSV = f"""{WALKS_HEADER}max_heart_rate,notes
+02-FEB-2026,walk (outdoor),00:40:00,3.50,4500,20,0,120,140,"Two walks today,
+the second one was short"
+02-FEB-2026,walk (outdoor),00:10:00,0.75,1000,5,0,110,120,""
+01-FEB-2026,walk (treadmill),01:00:00,5.00,6500,200,0,150,165,"A ""long"" one"
+"""
+STAIRS_CSV = """date,workout_type,duration(HH:mm:ss),flights_up,flights_down,pack_weight(lbs),avg_heart_rate,\
+max_heart_rate,location,notes
+02-FEB-2026,stairs (indoor),00:05:00,10,10,0,140,150,Gym,""
+02-FEB-2026,stairs (indoor),00:03:00,6,6,0,130,145,Gym,""
+01-FEB-2026,stairs (indoor),00:17:26,36,36,27.3,150,175,Gym,""
+"""
+TINY_CHUNK_SIZE = 64
+
+
+class TestStreaming(unittest.TestCase):
+    def setUp(self) -> None:
+        """Write a weight training sets CSV spanning many chunks into a fresh temporary data directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp_dir.name
+        self.sets_fname = f"{self.data_dir}/weight_training_sets.csv"
+
+        rng = random.Random(13)
+        day = date(2026, 3, 1)
+        rows = []
+        for _ in range(200):
+            day -= timedelta(days=rng.randint(0, 1))
+            exercise = rng.choice(EXERCISES)
+            rows.append(
+                f"{day.strftime('%d-%b-%Y').upper()},{exercise},{rng.randint(3, 12)},{rng.randint(20, 60) * 5},good\n"
+            )
+        Path(self.sets_fname).write_text(SETS_HEADER + "".join(rows), encoding="utf-8")
+
+    def tearDown(self) -> None:
+        """Clean up the temporary data directory."""
+        self._tmp_dir.cleanup()
+
+    def test_chunks_keep_whole_rows(self) -> None:
+        """Checks that rows are never split across chunks, even when a quoted field spans lines."""
+        fname = f"{self.data_dir}/walks.csv"
+        Path(fname).write_text(WALKS_CSV, encoding="utf-8")
+        chunks = list(iter_raw_chunks(fname, chunk_size=16))
+
+        header = WALKS_CSV.split("\n", 1)[0].encode() + b"\n"
+        self.assertEqual([0, 1, 2], [row_offset for _, row_offset in chunks])
+        self.assertTrue(all(raw.startswith(header) for raw, _ in chunks))
+        self.assertEqual(WALKS_CSV.encode(), header + b"".join(raw[len(header) :] for raw, _ in chunks))
+
+        daily_cardio = aggregate_daily_cardio(iter_clean_chunks(fname, chunk_size=16))
+        self.assertEqual([1, 2], daily_cardio["workouts"].tolist())
+        self.assertEqual([3600, 3000], daily_cardio[CName.DURATION].tolist())
+        self.assertEqual([5.0, 4.25], daily_cardio[CName.DISTANCE].tolist())
+
+    def test_stairs_have_no_distance(self) -> None:
+        """Checks that cardio without a distance (stairs) keeps a NaN distance, even when its day spans chunks."""
+        walks_fname, stairs_fname = f"{self.data_dir}/walks.csv", f"{self.data_dir}/stairs.csv"
+        Path(walks_fname).write_text(WALKS_CSV, encoding="utf-8")
+        Path(stairs_fname).write_text(STAIRS_CSV, encoding="utf-8")
+        chunks = itertools.chain(
+            iter_clean_chunks(walks_fname, [CName.WORKOUT_TYPE, CName.DURATION, CName.DISTANCE], chunk_size=16),
+            iter_clean_chunks(stairs_fname, [CName.WORKOUT_TYPE, CName.DURATION], chunk_size=16),
+        )
+        daily_cardio = aggregate_daily_cardio(chunks).set_index([CName.DATE, CName.WORKOUT_TYPE])
+
+        stairs = daily_cardio.xs("stairs (indoor)", level=CName.WORKOUT_TYPE)
+        self.assertEqual([1, 2], stairs["workouts"].tolist())
+        self.assertEqual([1046, 480], stairs[CName.DURATION].tolist())
+        self.assertTrue(stairs[CName.DISTANCE].isna().all())
+        # Same as the stair workouts loaded in memory
+        self.assertTrue(DataLoader.load_stair_workouts(self.data_dir)[CName.DISTANCE].isna().all())
+        walks = daily_cardio.xs("walk (outdoor)", level=CName.WORKOUT_TYPE)
+        self.assertEqual([4.25], walks[CName.DISTANCE].tolist())
+
+    def test_daily_sets_match_in_memory(self) -> None:
+        """Checks that streaming the sets in tiny chunks (plus a journal) gives the same totals as loading them all."""
+        Journal(self.data_dir).append(
+            "weight_training_sets.csv",
+            {CName.DATE: date(2026, 3, 1), CName.EXERCISE: "Deadlift", CName.REPS: 5, CName.WEIGHT: 315},
+        )
+        sets = DataLoader.load_weight_training_sets(self.data_dir, columns=SET_COLUMNS)
+        volume = sets[CName.REPS] * sets[CName.WEIGHT]
+        expected = (
+            sets.assign(volume=volume)
+            .groupby([CName.DATE, CName.EXERCISE])
+            .agg(sets=(CName.REPS, "size"), reps=(CName.REPS, "sum"), volume=("volume", "sum"))
+            .reset_index()
+        )
+        self.assertGreater(len(list(iter_raw_chunks(self.sets_fname, TINY_CHUNK_SIZE))), 100)
+
+        daily_sets = stream_daily_sets(self.data_dir, TINY_CHUNK_SIZE)
+        self.assertEqual(expected[CName.DATE].tolist(), daily_sets[CName.DATE].tolist())
+        self.assertEqual(expected[CName.EXERCISE].tolist(), daily_sets[CName.EXERCISE].tolist())
+        for column in ["sets", CName.REPS]:
+            self.assertEqual(expected[column].tolist(), daily_sets[column].tolist())
+        self.assertEqual(expected["volume"].tolist(), daily_sets["volume(lbs)"].tolist())
+
+        summaries = summarize_exercises(daily_sets)
+        self.assertEqual(len(sets), summaries["sets"].sum())
+        self.assertEqual(
+            sets.groupby(CName.EXERCISE)[CName.WEIGHT].max().to_dict(), summaries["max_weight(lbs)"].to_dict()
+        )
+        self.assertEqual(pd.Timestamp(2026, 3, 1), summaries["last_date"].max())
+
+    def test_errors_point_at_the_csv_row(self) -> None:
+        """Checks that an invalid row deep in the CSV is reported at its row in the whole CSV, not within its chunk."""
+        lines = Path(self.sets_fname).read_text(encoding="utf-8").splitlines(keepends=True)
+        lines[150] = lines[150].replace(lines[150].split(",")[1], "Not An Exercise")
+        Path(self.sets_fname).write_text("".join(lines), encoding="utf-8")
+
+        with self.assertRaisesRegex(ValueError, "at row 151 "):  # noqa: PT027
+            list(iter_clean_chunks(self.sets_fname, SET_COLUMNS, TINY_CHUNK_SIZE))
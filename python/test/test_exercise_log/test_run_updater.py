@@ -0,0 +1,56 @@
+import os
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.run_updater import (
+    BOOTSTRAP_WORKERS_ENV_VAR,
+    STRENGTH_WORKERS_ENV_VAR,
+    get_num_bootstrap_workers,
+    get_num_strength_workers,
+    get_strength_exercises,
+)
+from exercise_log.strength import Exercise
+
+
+class TestRunUpdater(unittest.TestCase):
+    def test_num_workers(self) -> None:
+        """Checks that the number of workers is read from its environment variable, defaulting to one per CPU."""
+        for env_var, get_num_workers in [
+            (STRENGTH_WORKERS_ENV_VAR, get_num_strength_workers),
+            (BOOTSTRAP_WORKERS_ENV_VAR, get_num_bootstrap_workers),
+        ]:
+            with mock.patch.dict(os.environ, clear=True), mock.patch("os.sched_getaffinity", return_value={0, 1, 2}):
+                self.assertEqual(3, get_num_workers())
+            for value, expected in [("4", 4), (" 2 ", 2), ("0", 1), ("-3", 1), ("", 3)]:
+                with (
+                    self.subTest(env_var=env_var, value=value),
+                    mock.patch.dict(os.environ, {env_var: value}),
+                    mock.patch("os.sched_getaffinity", return_value={0, 1, 2}),
+                ):
+                    self.assertEqual(expected, get_num_workers())
+            for value in ["many", "1.5"]:
+                with (
+                    self.subTest(env_var=env_var, value=value),
+                    mock.patch.dict(os.environ, {env_var: value}),
+                    self.assertRaisesRegex(ValueError, f"Invalid {env_var}"),  # noqa: PT027
+                ):
+                    get_num_workers()
+
+    def test_strength_exercises(self) -> None:
+        """Checks that the exercises with the most sets are plotted first and that skipped exercises aren't plotted."""
+        set_counts = {
+            Exercise.BENCH_PRESS: 2,
+            Exercise.PLANK: 5,
+            Exercise.DEADLIFT: 4,
+            Exercise.BURPEES: 1,
+            Exercise.SQUATS: 3,
+        }
+        exercises = [exercise.value for exercise, num_sets in set_counts.items() for _ in range(num_sets)]
+        sets = pd.DataFrame({CName.EXERCISE: pd.Categorical(exercises), CName.REPS: 5})
+
+        to_plot, skipped = get_strength_exercises(sets)
+        self.assertEqual([Exercise.DEADLIFT, Exercise.SQUATS, Exercise.BENCH_PRESS], to_plot)
+        self.assertEqual([Exercise.PLANK, Exercise.BURPEES], skipped)
@@ -0,0 +1,92 @@
+import unittest
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.strength import SetType
+from exercise_log.strength.progress import SET_TYPE, StrengthProgress
+
+PRIMARY_GYMS = {"Home Gym": (date(2026, 1, 1), date(2026, 12, 31))}
+WORKOUTS = pd.DataFrame(
+    {
+        CName.DATE: pd.to_datetime(["2026-02-01", "2026-02-02", "2026-02-04"]).as_unit("us"),
+        CName.LOCATION: pd.array(["Home Gym", "Hotel Gym", "Home Gym"], dtype="str"),
+    },
+)
+SETS = pd.DataFrame(
+    {
+        CName.DATE: pd.to_datetime(
+            [
+                "2026-02-01",
+                "2026-02-01",
+                "2026-02-01",
+                "2026-02-01",
+                "2026-02-01",
+                "2026-02-02",
+                "2026-02-03",
+                "2026-02-04",
+                "2026-02-04",
+            ],
+        ).as_unit("us"),
+        CName.EXERCISE: pd.array(
+            [
+                "Deadlift",
+                "Deadlift",
+                "Deadlift",
+                "Deadlift",
+                "Leg Press",
+                "Leg Press",
+                "Deadlift",
+                "Deadlift",
+                "Leg Press",
+            ],
+            dtype="str",
+        ),
+        CName.REPS: [2, 5, 5, 10, 10, 10, 5, 5, 10],
+        CName.WEIGHT: [275.0, 225.0, 245.0, 135.0, 180.0, 400.0, 300.0, 235.0, np.nan],
+        CName.RATING: pd.array(
+            ["good", "warm-up", "good", "failure (L)", "good", "good", "good", None, "good"],
+            dtype="str",
+        ),
+    },
+)
+
+
+class TestStrengthProgress(unittest.TestCase):
+    def test_daily_bests(self) -> None:
+        """Checks that only the heaviest eligible set of each SetType is kept for each day at a primary gym."""
+        progress = StrengthProgress.prepare(WORKOUTS, SETS, PRIMARY_GYMS)
+
+        deadlift = progress.get_exercise("Deadlift")
+        self.assertEqual(
+            [
+                (SetType.ONE_RM, pd.Timestamp(2026, 2, 1), 275.0),
+                (SetType.STRENGTH, pd.Timestamp(2026, 2, 1), 245.0),
+                (SetType.STRENGTH, pd.Timestamp(2026, 2, 4), 235.0),
+            ],
+            list(deadlift.daily_bests[[SET_TYPE, CName.DATE, CName.WEIGHT]].itertuples(index=False, name=None)),
+        )
+        self.assertEqual((135.0, 300.0), deadlift.weight_range)
+        self.assertEqual(
+            [pd.Timestamp(2026, 2, 1), pd.Timestamp(2026, 2, 4)], deadlift.workout_dates[CName.DATE].tolist()
+        )
+
+        # The heavier Leg Press set was on a machine at a gym that isn't primary
+        leg_press = progress.get_exercise("Leg Press")
+        self.assertEqual([180.0], leg_press.daily_bests[CName.WEIGHT].tolist())
+        self.assertEqual((180.0, 400.0), leg_press.weight_range)
+
+        plank = progress.get_exercise("Plank")
+        self.assertTrue(plank.daily_bests.empty)
+        self.assertTrue(np.isnan(plank.weight_range).all())
+
+    def test_rebuild_from_tables(self) -> None:
+        """Checks that a StrengthProgress rebuilt from its tables slices out the same progress as the original."""
+        progress = StrengthProgress.prepare(WORKOUTS, SETS, PRIMARY_GYMS)
+        rebuilt = StrengthProgress(**progress.get_tables())
+        for exercise in ["Deadlift", "Leg Press"]:
+            expected, actual = progress.get_exercise(exercise), rebuilt.get_exercise(exercise)
+            pd.testing.assert_frame_equal(expected.daily_bests, actual.daily_bests)
+            self.assertEqual(expected.weight_range, actual.weight_range)
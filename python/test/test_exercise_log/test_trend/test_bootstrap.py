@@ -0,0 +1,75 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from exercise_log.trend import Trendsetter
+from exercise_log.trend.bootstrap import bootstrap_curve, bootstrap_lines, get_band
+
+NUM_RESAMPLES = 200
+
+
+def _get_line(noise: float, num_points: int = 100) -> tuple[np.ndarray, np.ndarray]:
+    """Get a noisy line that starts far from zero like the day numbers do."""
+    x = np.arange(num_points, dtype="float64") + 1000
+    return x, 250 - 0.1 * x + np.random.default_rng(25).normal(0, noise, num_points)
+
+
+class TestBootstrap(unittest.TestCase):
+    def test_get_band(self) -> None:
+        """Checks that a band covers the middle of the curves at each x, ignoring curves that failed to fit."""
+        curves = np.array([[0.0, 10.0], [1.0, 20.0], [2.0, 30.0], [np.nan, np.nan]])
+        np.testing.assert_allclose([[0.0, 10.0], [2.0, 30.0]], get_band(curves, confidence_level=1.0))
+        np.testing.assert_allclose([[1.0, 20.0], [1.0, 20.0]], get_band(curves, confidence_level=0.0))
+
+    def test_bootstrap_lines(self) -> None:
+        """Checks that each segment's band contains its line of best fit and narrows when it's less noisy."""
+        x, y = _get_line(noise=1.0)
+        y_quiet = _get_line(noise=0.1)[1]
+        y_gappy = y.copy()
+        y_gappy[::7] = np.nan
+        x_band = np.concatenate([x, x[-1] + np.arange(1, 31)])
+        noisy, quiet, gappy = bootstrap_lines(
+            [(x, y, x_band), (x, y_quiet, x_band), (x, y_gappy, x_band)], num_resamples=NUM_RESAMPLES
+        )
+
+        slope, intercept = np.polyfit(x, y, 1)
+        trendline = slope * x_band + intercept
+        self.assertEqual((2, len(x_band)), noisy.shape)
+        self.assertTrue(np.all((noisy[0] <= trendline) & (trendline <= noisy[1])))
+        self.assertTrue(np.all(quiet[1] - quiet[0] < (noisy[1] - noisy[0]) / 5))
+        self.assertFalse(np.isnan(gappy).any())
+        # The band widens past the end of the readings, like any extrapolation
+        widths = noisy[1] - noisy[0]
+        self.assertGreater(widths[-1], widths[len(x) // 2])
+
+        again = bootstrap_lines([(x, y, x_band)], num_resamples=NUM_RESAMPLES)[0]
+        np.testing.assert_array_equal(noisy, again)
+
+    def test_bootstrap_curve(self) -> None:
+        """Checks that a curve's band contains it and is the same no matter how many processes refit it."""
+        x = np.arange(1, 201, dtype="float64")
+        fitted_params = (-3.0, 0.5, 60.0)
+        y = Trendsetter._f_log_curve(x, *fitted_params)
+        y += np.random.default_rng(25).normal(0, 0.5, len(x))
+        x_band = np.arange(1, 241, dtype="float64")
+
+        # The refits don't warn about the parameters that curve_fit tries along the way
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            band = bootstrap_curve(Trendsetter._f_log_curve, x, y, fitted_params, x_band, NUM_RESAMPLES)
+        curve = Trendsetter._f_log_curve(x_band, *fitted_params)
+        self.assertEqual((2, len(x_band)), band.shape)
+        self.assertGreater(np.mean((band[0] <= curve) & (curve <= band[1])), 0.9)
+
+        in_pool = bootstrap_curve(
+            Trendsetter._f_log_curve,
+            x,
+            y,
+            fitted_params,
+            x_band,
+            NUM_RESAMPLES,
+            num_workers=2,
+        )
+        # The resamples are the same, but curve_fit can land a hair apart on them from one call to the next
+        np.testing.assert_allclose(band, in_pool, rtol=1e-6)
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.trend import WeightTrend
+from exercise_log.trend.changepoint import CostTable, find_changepoints, find_datespans
+from exercise_log.trend.linear import fit_lines
+
+# The slope of each segment of a series and the position that it starts at
+SEGMENTS = [(0, -0.2), (200, 0.0), (320, -0.1), (500, 0.05)]
+NUM_POINTS = 700
+
+
+def _get_series(noise: float) -> tuple[np.ndarray, np.ndarray]:
+    """Get a continuous piecewise-linear series with the SEGMENTS, starting far from zero like the day numbers do."""
+    x = np.arange(NUM_POINTS, dtype="float64")
+    slopes = np.zeros(NUM_POINTS)
+    for start, slope in SEGMENTS:
+        slopes[start:] = slope
+    y = 250 + np.concatenate([[0], np.cumsum(slopes[1:])]) + np.random.default_rng(23).normal(0, noise, NUM_POINTS)
+    return x + 1000, y
+
+
+class TestChangepoint(unittest.TestCase):
+    def test_costs(self) -> None:
+        """Checks that the squared error from the cost table is the same as the residuals of a line fit directly."""
+        x, y = _get_series(noise=1.0)
+        table = CostTable(x, y)
+        for start, end in [(0, NUM_POINTS), (10, 13), (250, 600)]:
+            slope, intercept = fit_lines(x[start:end], y[start:end])[0]
+            expected = ((y[start:end] - (slope * x[start:end] + intercept)) ** 2).sum()
+            self.assertAlmostEqual(expected, table.get_costs(start, end), delta=1e-6 * expected)
+        np.testing.assert_array_equal([0, 0], table.get_costs([5, 5], [5, 7]))
+
+    def test_find_changepoints(self) -> None:
+        """Checks that the changes of trend are found close to where they are, and that noise alone isn't a change."""
+        x, y = _get_series(noise=0.5)
+        # A gentle bend is hard to place exactly amongst the noise, so each only has to be close, even partway through
+        for num_points in [450, NUM_POINTS]:
+            changepoints = find_changepoints(x[:num_points], y[:num_points])
+            expected = [start for start, _ in SEGMENTS[1:] if start < num_points]
+            self.assertEqual(len(expected), len(changepoints))
+            np.testing.assert_allclose(expected, changepoints, atol=12)
+
+        noise = np.random.default_rng(23).normal(0, 0.5, NUM_POINTS)
+        self.assertEqual([], find_changepoints(x, 250 - 0.01 * x + noise))
+        self.assertEqual([], find_changepoints(x[:40], y[:40]))
+        with self.assertRaisesRegex(ValueError, "same shape"):  # noqa: PT027
+            find_changepoints(x, y[:-1])
+
+    def test_find_datespans(self) -> None:
+        """Checks that the datespans found in readings with gaps can be fit by a Trend."""
+        _, y = _get_series(noise=0.5)
+        dates = pd.date_range("2023-01-01", periods=NUM_POINTS, freq="D").as_unit("us")
+        health_metrics = pd.DataFrame({CName.DATE: dates, CName.WEIGHT: y})
+        # Readings are missing for a few days at a time, including right where the trend changes
+        health_metrics.loc[np.arange(NUM_POINTS) % 9 < 2, CName.WEIGHT] = np.nan  # noqa: PLR2004
+        health_metrics.loc[195:205, CName.WEIGHT] = np.nan
+
+        datespans = find_datespans(health_metrics, CName.WEIGHT)
+        self.assertEqual(len(SEGMENTS) + 1, len(datespans))
+        self.assertEqual((dates[2], dates[-1]), (datespans[0], datespans[-1]))
+
+        trendline = WeightTrend(datespans, health_metrics, extrapolate_days=30).get_trendline()
+        self.assertEqual(NUM_POINTS - 3 + 30, len(trendline))
+        expected = pd.Series(y[2:], index=dates[2:])
+        actual = trendline.set_index(CName.DATE)[CName.WEIGHT].reindex(expected.index)
+        self.assertLess((expected - actual).abs().mean(), 0.5)
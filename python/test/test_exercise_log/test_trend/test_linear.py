@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+from scipy.optimize import curve_fit
+
+from exercise_log.trend.linear import RunningLine, fit_lines, fit_segments
+
+
+def _f_affine(t: float, a: float, b: float) -> float:
+    return a * t + b
+
+
+class TestLinear(unittest.TestCase):
+    def setUp(self) -> None:
+        """Generate noisy segments of different lengths, starting far from zero like the day numbers of a trend."""
+        rng = np.random.default_rng(21)
+        self.segments = []
+        for start, length, slope in [(700, 50, -0.2), (740, 10, 0.05), (800, 200, 0.01)]:
+            x = np.arange(start, start + length, dtype="float64")
+            self.segments.append((x, 250 + slope * (x - start) + rng.normal(0, 1, length)))
+
+    def test_matches_curve_fit(self) -> None:
+        """Checks that the closed form fits give the same lines and covariances as scipy's curve_fit."""
+        fits = fit_segments(self.segments)
+        self.assertEqual(len(self.segments), len(fits))
+        for i, (x, y) in enumerate(self.segments):
+            params, covariance = curve_fit(_f_affine, x, y)
+            np.testing.assert_allclose(params, fits[i], rtol=1e-6)
+            np.testing.assert_allclose(covariance, fits.covariances[i], rtol=1e-5)
+            np.testing.assert_allclose(_f_affine(x, *params), fits.evaluate(x, i), rtol=1e-9)
+
+    def test_missing_and_degenerate(self) -> None:
+        """Checks that NaNs are ignored and that series without a line (or without an error estimate) are flagged."""
+        x, y = self.segments[0]
+        with_gaps = y.copy()
+        with_gaps[::3] = np.nan
+        fits = fit_lines(np.stack([x, x, x]), np.stack([with_gaps, np.full_like(y, np.nan), y]))
+        np.testing.assert_allclose(fit_lines(x[~np.isnan(with_gaps)], y[~np.isnan(with_gaps)])[0], fits[0])
+        self.assertTrue(np.isnan(fits[1]).all())
+        np.testing.assert_allclose(fit_lines(x, y)[0], fits[2])
+
+        fits = fit_lines([1.0, 2.0], [3.0, 5.0])
+        np.testing.assert_allclose((2.0, 1.0), fits[0])
+        self.assertTrue(np.isinf(fits.covariances[0, 0, 0]))
+
+        with self.assertRaisesRegex(ValueError, "same shape"):  # noqa: PT027
+            fit_lines(x, y[:-1])
+
+    def test_running_line(self) -> None:
+        """Checks that a line updated a point (or a batch of points) at a time is the same as one fit all at once."""
+        x, y = np.concatenate([seg[0] for seg in self.segments]), np.concatenate([seg[1] for seg in self.segments])
+        y[5] = np.nan
+        expected = fit_lines(x, y)
+
+        line = RunningLine.from_points(x[:100], y[:100])
+        for x_i, y_i in zip(x[100:150], y[100:150], strict=True):
+            line = line.add(x_i, y_i)
+        line = line.merge(RunningLine.from_points(x[150:], y[150:]))
+        self.assertEqual(len(x) - 1, line.n)
+        actual = line.to_fits()
+        np.testing.assert_allclose(expected[0], actual[0], rtol=1e-9)
+        np.testing.assert_allclose(expected.covariances, actual.covariances, rtol=1e-7)
+
+        self.assertEqual(line, RunningLine().merge(line))
+        self.assertTrue(np.isnan(RunningLine().add(1.0, 2.0).to_fits()[0]).all())
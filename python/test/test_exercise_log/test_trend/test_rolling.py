@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.trend.rolling import ACTIVE_DAYS_COLUMN, MEAN_COLUMN, TOTAL_COLUMN, compute_rolling_stats
+
+
+class TestRolling(unittest.TestCase):
+    def setUp(self) -> None:
+        """Generate a year of daily durations with rest days, a missing value and a gap of days without rows."""
+        rng = np.random.default_rng(24)
+        dates = pd.date_range("2025-01-01", periods=365, freq="D").as_unit("us")
+        is_active = rng.random(365) < 0.6  # noqa: PLR2004
+        durations = np.where(is_active, rng.integers(600, 5400, 365), 0)
+        self.workouts = pd.DataFrame({CName.DATE: dates, CName.DURATION: pd.array(durations, dtype="Int64")})
+        self.workouts.loc[40, CName.DURATION] = pd.NA
+        self.workouts = self.workouts.drop(index=range(100, 110))
+
+    def test_matches_pandas_rolling(self) -> None:
+        """Checks that every window's statistics are the same as pandas' rolling windows over the same days."""
+        stats = compute_rolling_stats(self.workouts, CName.DURATION, windows=(1, 7, 90))
+        self.assertEqual(9, len(stats.columns))
+        pd.testing.assert_index_equal(self.workouts.index, stats.index)
+
+        durations = self.workouts.set_index(CName.DATE)[CName.DURATION].fillna(0).astype("int64")
+        for window in (1, 7, 90):
+            rolling = durations.rolling(f"{window}D")
+            np.testing.assert_array_equal(rolling.sum().to_numpy(), stats[TOTAL_COLUMN.format(window)])
+            active_days = (durations > 0).astype("int64").rolling(f"{window}D").sum()
+            np.testing.assert_array_equal(active_days.to_numpy(), stats[ACTIVE_DAYS_COLUMN.format(window)])
+
+        # The means are per day, counting days without a row, except before the first row
+        means = stats[MEAN_COLUMN.format(90)].set_axis(durations.index)
+        self.assertAlmostEqual(durations.iloc[:5].sum() / 5, means.iloc[4])
+        self.assertAlmostEqual(durations["2025-01-27":"2025-04-26"].sum() / 90, means["2025-04-26"])
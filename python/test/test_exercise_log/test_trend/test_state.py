@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.dataloader.columnar import arrays_to_frame, frame_to_arrays
+from exercise_log.trend import WeightTrend
+from exercise_log.trend.state import TrendState
+
+DATES = pd.date_range("2023-11-01", "2024-06-30", freq="D").as_unit("us")
+BOUNDARIES = [date(2024, 1, 6), date(2024, 3, 5), date(2024, 4, 30)]
+
+
+def _get_health_metrics(num_days: int) -> pd.DataFrame:
+    """Get the first num_days of daily weights that go down, hold steady, go down again and then hold steady."""
+    days = np.arange(len(DATES), dtype="float64")
+    noise = np.random.default_rng(22).normal(0, 0.5, len(DATES))
+    weights = 250 - 0.2 * np.minimum(days, 66) - 0.15 * np.clip(days - 125, 0, 56) + noise
+    return pd.DataFrame({CName.DATE: DATES, CName.WEIGHT: weights}).iloc[:num_days]
+
+
+def _get_weight_trend(health_metrics: pd.DataFrame, state_path: str) -> WeightTrend:
+    datespans = [health_metrics[CName.DATE].iloc[0], *BOUNDARIES, health_metrics[CName.DATE].iloc[-1]]
+    return WeightTrend(datespans, health_metrics, extrapolate_days=30, state_path=state_path)
+
+
+class TestTrendState(unittest.TestCase):
+    def setUp(self) -> None:
+        """Create a fresh temporary directory for the saved trend states."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = f"{self._tmp_dir.name}/.weight_trend_state.json"
+
+    def tearDown(self) -> None:
+        """Clean up the temporary directory."""
+        self._tmp_dir.cleanup()
+
+    def _assert_extends_saved_state(self, health_metrics: pd.DataFrame, *, expect_refit: bool) -> None:
+        """Check that the trendline is the same as one fit from scratch, and whether it had to be refit to get it."""
+        trend = _get_weight_trend(health_metrics, self.state_path)
+        with mock.patch.object(WeightTrend, "get_fixed_trendline", wraps=trend.get_fixed_trendline) as refit:
+            trendline = trend.get_trendline()
+        self.assertEqual(expect_refit, refit.called)
+        trend.save_state()
+
+        expected = _get_weight_trend(health_metrics, state_path=None).get_trendline()
+        pd.testing.assert_series_equal(expected[CName.DATE], trendline[CName.DATE])
+        np.testing.assert_allclose(expected[CName.WEIGHT], trendline[CName.WEIGHT], rtol=1e-12)
+
+    def test_extends_saved_state(self) -> None:
+        """Checks that new readings extend the saved state, and that it's refit once older readings change."""
+        self._assert_extends_saved_state(_get_health_metrics(200), expect_refit=True)
+        self._assert_extends_saved_state(_get_health_metrics(201), expect_refit=False)
+        self._assert_extends_saved_state(_get_health_metrics(220), expect_refit=False)
+        self._assert_extends_saved_state(_get_health_metrics(220), expect_refit=False)
+
+        edited = _get_health_metrics(221)
+        edited.loc[100, CName.WEIGHT] += 1
+        self._assert_extends_saved_state(edited, expect_refit=True)
+        # Fewer readings than the saved state has seen, e.g. if one was deleted
+        self._assert_extends_saved_state(_get_health_metrics(210), expect_refit=True)
+
+    def test_cached_readings(self) -> None:
+        """Checks that a saved state is reused for the same readings once they're loaded from the columnar cache."""
+        health_metrics = _get_health_metrics(200)
+        self._assert_extends_saved_state(health_metrics, expect_refit=True)
+
+        cache_path = f"{self._tmp_dir.name}/health_metrics.npz"
+        np.savez(cache_path, **frame_to_arrays(health_metrics))
+        with np.load(cache_path) as arrays:
+            cached = arrays_to_frame(arrays)
+        self._assert_extends_saved_state(cached, expect_refit=False)
+
+    def test_boundaries_change(self) -> None:
+        """Checks that a saved state isn't reused once the fixed boundaries of the trend change."""
+        health_metrics = _get_health_metrics(200)
+        trend = _get_weight_trend(health_metrics, self.state_path)
+        trend.save_state()
+        self.assertIsNotNone(TrendState.load(self.state_path, trend.get_state().key))
+
+        datespans = [*trend.datespans]
+        datespans[2] += pd.Timedelta(days=1)
+        moved = WeightTrend(datespans, health_metrics, extrapolate_days=30, state_path=self.state_path)
+        self.assertIsNone(TrendState.load(self.state_path, moved.get_state().key))
+
+    def test_caches_fixed_band(self) -> None:
+        """Checks that the confidence band of the fixed segments is saved with the state and reused by later updates."""
+        trend = _get_weight_trend(_get_health_metrics(200), self.state_path)
+        expected = trend.get_confidence_band()
+        trend.save_state()
+
+        trend = _get_weight_trend(_get_health_metrics(200), self.state_path)
+        with mock.patch.object(WeightTrend, "get_fixed_band", wraps=trend.get_fixed_band) as rebootstrap:
+            band = trend.get_confidence_band()
+        self.assertFalse(rebootstrap.called)
+        pd.testing.assert_frame_equal(expected, band)
+        self.assertEqual(len(trend.get_trendline()), len(band))
+        self.assertTrue((band[CName.LOWER_BOUND] <= band[CName.UPPER_BOUND]).all())
@@ -1,7 +1,10 @@
+import io
 import pickle
+import tempfile
 import unittest
+from pathlib import Path
 
-from exercise_log.utils import StrEnum
+from exercise_log.utils import StrEnum, invert_csv_rows, iter_lines_reversed
 
 TestEnum = StrEnum.create_from_json("../test/data/enum/sample_enum.json", __name__)
 
@@ -26,3 +29,24 @@ class TestStrEnum(unittest.TestCase):
         """Tests that a StrEnum can be pickled/unpickled correctly."""
         result = pickle.loads(pickle.dumps(TestEnum.A))  # noqa: S301
         self.assertEqual(TestEnum.A.value, result.value, "Original value and depickled value do not match")
+
+
+class TestReverseLines(unittest.TestCase):
+    def test_iter_lines_reversed(self) -> None:
+        """Tests that lines come out last to first with their own line breaks, regardless of the block boundaries."""
+        data = b"date,notes\r\n01-JAN-2024,a\n02-JAN-2024,\r03-JAN-2024,bc\r\n\n04-JAN-2024,d"
+        expected = data.splitlines(keepends=True)[::-1]
+        for block_size in [1, 2, 3, 7, 1024]:
+            lines = list(iter_lines_reversed(io.BytesIO(data), block_size=block_size))
+            self.assertEqual(expected, lines, f"Block size: {block_size}")
+        header_length = len(b"date,notes\r\n")
+        self.assertEqual(expected[:-1], list(iter_lines_reversed(io.BytesIO(data), start=header_length, block_size=2)))
+
+    def test_invert_csv_rows(self) -> None:
+        """Tests that the rows are inverted beneath the header and that every row ends up with a line break."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fname = f"{tmp_dir}/data.csv"
+            Path(fname).write_bytes(b"date,weight\r\n01-JAN-2024,1\r\n02-JAN-2024,2\r\n03-JAN-2024,3")
+            invert_csv_rows(fname, has_header_row=True)
+            inverted = Path(f"{tmp_dir}/data_inverted.csv").read_bytes()
+        self.assertEqual(b"date,weight\r\n03-JAN-2024,3\r\n02-JAN-2024,2\r\n01-JAN-2024,1\r\n", inverted)
@@ -0,0 +1,79 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.vis import PlotOptions, plot_weight
+from exercise_log.vis.export import JSON_FORMAT, SVG_FORMAT, export_figure, figure_to_dict
+
+DATES = pd.to_datetime(["2026-02-01", "2026-02-02", "2026-02-03"]).as_unit("us")
+HEALTH_METRICS = pd.DataFrame({CName.DATE: DATES, CName.WEIGHT: [250.123, np.nan, 249.5]})
+WEIGHT_TRENDLINE = pd.DataFrame({CName.DATE: DATES, CName.WEIGHT: [250.0, 249.75, 249.5]})
+CONFIDENCE_BAND = pd.DataFrame(
+    {CName.DATE: DATES, CName.LOWER_BOUND: [249.0, 249.25, 248.5], CName.UPPER_BOUND: [251.0, 250.25, 250.5]}
+)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self) -> None:
+        """Create a fresh temporary export directory."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.export_dir = self._tmp_dir.name
+
+    def tearDown(self) -> None:
+        """Clean up the temporary export directory."""
+        self._tmp_dir.cleanup()
+
+    def test_figure_to_dict(self) -> None:
+        """Checks that the series, reference lines and axes of a plot are read back off of its Figure."""
+        ax = figure_to_dict(plot_weight(HEALTH_METRICS, WEIGHT_TRENDLINE))["axes"][0]
+        self.assertEqual("Weight", ax["title"])
+        self.assertEqual(["Projected Weight", "Weight"], ax["legend"])
+        self.assertTrue(ax["x_axis"]["is_date"])
+        self.assertEqual(["2026-01-31", "2026-02-04"], ax["x_axis"]["limits"])
+        self.assertFalse(ax["y_axis"]["is_date"])
+        self.assertEqual([180.0, 305.0], ax["y_axis"]["limits"])
+
+        trendline, weights = ax["series"]
+        self.assertEqual(
+            ("line", "Projected Weight", "--"), (trendline["type"], trendline["label"], trendline["linestyle"])
+        )
+        self.assertEqual(["2026-02-01", "2026-02-02", "2026-02-03"], trendline["x"])
+        self.assertEqual([250.0, 249.75, 249.5], trendline["y"])
+        self.assertEqual(("scatter", "Weight"), (weights["type"], weights["label"]))
+        self.assertEqual(["2026-02-01", "2026-02-03"], weights["x"])
+        self.assertEqual([250.12, 249.5], weights["y"])
+        self.assertEqual([("Healthy", 250.0), ("Target", 200.0)], [(r["label"], r["y"]) for r in ax["reference_lines"]])
+
+    def test_confidence_band(self) -> None:
+        """Checks that a trendline's confidence band is read back off of its Figure, in the colour of the trendline."""
+        fig = plot_weight(HEALTH_METRICS, WEIGHT_TRENDLINE, confidence_band=CONFIDENCE_BAND)
+        ax = figure_to_dict(fig)["axes"][0]
+        self.assertIn("Confidence Band", ax["legend"])
+
+        trendline, band = (series for series in ax["series"] if series["type"] in ("line", "band"))
+        self.assertEqual(("band", "Confidence Band"), (band["type"], band["label"]))
+        self.assertEqual(trendline["colour"], band["colour"])
+        self.assertEqual(["2026-02-01", "2026-02-02", "2026-02-03"], band["x"])
+        self.assertEqual([249.0, 249.25, 248.5], band["lower"])
+        self.assertEqual([251.0, 250.25, 250.5], band["upper"])
+
+    def test_export_formats(self) -> None:
+        """Checks that a plot is exported in each of the requested formats, and the same way every time."""
+        options = PlotOptions(export_dir=self.export_dir, export_formats=(JSON_FORMAT, SVG_FORMAT))
+        self.assertEqual(["weight.json", "weight.svg"], options.get_export_fnames("weight.png"))
+        fig = plot_weight(HEALTH_METRICS, WEIGHT_TRENDLINE, options)
+        self.assertEqual(["weight.json", "weight.svg"], sorted(path.name for path in Path(self.export_dir).iterdir()))
+
+        exported = json.loads(Path(f"{self.export_dir}/weight.json").read_text(encoding="utf-8"))
+        self.assertEqual(figure_to_dict(fig), exported)
+        svg = Path(f"{self.export_dir}/weight.svg").read_bytes()
+        export_figure(fig, f"{self.export_dir}/again.svg", SVG_FORMAT)
+        self.assertEqual(svg, Path(f"{self.export_dir}/again.svg").read_bytes())
+
+        with self.assertRaisesRegex(ValueError, "Unknown export format"):  # noqa: PT027
+            export_figure(fig, f"{self.export_dir}/weight.gif", "gif")
@@ -0,0 +1,103 @@
+import json
+import tempfile
+import unittest
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from exercise_log.dataloader import CName
+from exercise_log.dataloader.columnar import arrays_to_frame, frame_to_arrays
+from exercise_log.vis import PlotOptions
+from exercise_log.vis.manifest import MANIFEST_FNAME, RenderManifest, hash_inputs
+
+WEIGHTS = pd.DataFrame(
+    {
+        CName.DATE: pd.to_datetime(["2026-02-01", "2026-02-02"]).as_unit("us"),
+        CName.WEIGHT: [215.0, np.nan],
+    },
+)
+
+
+class TestRenderManifest(unittest.TestCase):
+    def setUp(self) -> None:
+        """Create a fresh temporary image directory and reset the record of rendered plots."""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.img_dir = self._tmp_dir.name
+        self.rendered: list[str] = []
+
+    def tearDown(self) -> None:
+        """Clean up the temporary image directory."""
+        self._tmp_dir.cleanup()
+
+    def _plot(self, weights: pd.DataFrame, options: PlotOptions) -> None:
+        Path(f"{options.export_dir}/weight.png").write_bytes(b"")
+        self.rendered.append(str(weights[CName.WEIGHT].max()))
+
+    def test_hash_inputs(self) -> None:
+        """Checks that the hash of the inputs only changes when their contents do."""
+        options = PlotOptions(export_dir=self.img_dir)
+        expected = hash_inputs(WEIGHTS, options)
+        self.assertEqual(expected, hash_inputs(WEIGHTS.copy(), PlotOptions(export_dir=self.img_dir)))
+        self.assertNotEqual(expected, hash_inputs(WEIGHTS.assign(**{CName.WEIGHT: [215.0, 220.0]}), options))
+        self.assertNotEqual(expected, hash_inputs(WEIGHTS.astype({CName.WEIGHT: "float32"}), options))
+        self.assertNotEqual(expected, hash_inputs(WEIGHTS, PlotOptions(export_dir=self.img_dir, show_plot=True)))
+        self.assertNotEqual(hash_inputs("ab", "c"), hash_inputs("a", "bc"))
+
+    def test_hash_cached_inputs(self) -> None:
+        """Checks that a DataFrame hashes the same after a round-trip through the columnar cache."""
+        cache_path = Path(self.img_dir) / "weights.npz"
+        np.savez(cache_path, **frame_to_arrays(WEIGHTS))
+        with np.load(cache_path) as arrays:
+            cached = arrays_to_frame(arrays)
+        self.assertEqual(hash_inputs(WEIGHTS), hash_inputs(cached))
+        # The labels are CName members before the round-trip and strs after it, equal labels of any type hash the same
+        np_labels = WEIGHTS.set_axis([np.str_(column) for column in WEIGHTS.columns], axis=1)
+        self.assertEqual(hash_inputs(WEIGHTS), hash_inputs(np_labels))
+
+    def test_skips_unchanged_plots(self) -> None:
+        """Checks that a plot is only rendered again once its inputs change, its file goes missing or the code does."""
+        options = PlotOptions(export_dir=self.img_dir)
+        manifest = RenderManifest(self.img_dir)
+        self.assertTrue(manifest.render(["weight.png"], partial(self._plot, WEIGHTS, options)))
+        manifest.save()
+
+        manifest = RenderManifest(self.img_dir)
+        self.assertFalse(manifest.render(["weight.png"], partial(self._plot, WEIGHTS.copy(), options)))
+        heavier = WEIGHTS.assign(**{CName.WEIGHT: [215.0, 220.0]})
+        self.assertTrue(manifest.render(["weight.png"], partial(self._plot, heavier, options)))
+        self.assertFalse(manifest.render(["weight.png"], partial(self._plot, heavier, options)))
+        self.assertEqual(["215.0", "220.0"], self.rendered)
+
+        Path(f"{self.img_dir}/weight.png").unlink()
+        self.assertTrue(manifest.render(["weight.png"], partial(self._plot, heavier, options)))
+        manifest.save()
+
+        # A manifest written by different plotting code is discarded entirely
+        manifest_path = Path(f"{self.img_dir}/{MANIFEST_FNAME}")
+        saved = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest_path.write_text(json.dumps({**saved, "code_version": "old"}), encoding="utf-8")
+        self.assertTrue(RenderManifest(self.img_dir).render(["weight.png"], partial(self._plot, heavier, options)))
+
+    def test_keyword_inputs(self) -> None:
+        """Checks that a DataFrame passed by keyword is hashed by its contents, not by its truncated repr."""
+        dates = pd.date_range("2026-01-01", periods=1000, freq="D").as_unit("us")
+        band = pd.DataFrame({CName.DATE: dates, CName.LOWER_BOUND: np.arange(1000.0), CName.UPPER_BOUND: 1000.0})
+        edited = band.copy()
+        edited.loc[500, CName.LOWER_BOUND] += 1
+        self.assertEqual(repr(band), repr(edited))
+        self.assertNotEqual(hash_inputs([band]), hash_inputs([edited]))
+        self.assertNotEqual(hash_inputs({"band": band}), hash_inputs({"band": edited}))
+
+        options = PlotOptions(export_dir=self.img_dir)
+        manifest = RenderManifest(self.img_dir)
+        plot = partial(self._plot_with_band, WEIGHTS, options)
+        self.assertTrue(manifest.render(["weight.png"], partial(plot, confidence_band=band)))
+        self.assertFalse(manifest.render(["weight.png"], partial(plot, confidence_band=band.copy())))
+        self.assertTrue(manifest.render(["weight.png"], partial(plot, confidence_band=edited)))
+        self.assertEqual(2, len(self.rendered))
+
+    def _plot_with_band(self, weights: pd.DataFrame, options: PlotOptions, *, confidence_band: pd.DataFrame) -> None:
+        self._plot(weights, options)
+        self.rendered[-1] += f" {confidence_band[CName.LOWER_BOUND].sum()}"
@@ -0,0 +1,48 @@
+import unittest
+
+import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.figure import Figure
+
+from exercise_log.dataloader import CName
+from exercise_log.strength import SetType
+from exercise_log.strength.progress import SET_TYPE, ExerciseProgress
+from exercise_log.vis import PlotOptions, plot_exercise_progress
+
+DATES = pd.to_datetime(["2026-02-01", "2026-02-03", "2026-02-05"]).as_unit("us")
+SET_TYPES = pd.CategoricalDtype(list(SetType))
+
+
+def _get_progress(exercise: str, weights: list[float]) -> ExerciseProgress:
+    daily_bests = pd.DataFrame(
+        {
+            CName.EXERCISE: pd.array([exercise] * len(weights), dtype="str"),
+            SET_TYPE: pd.Categorical([SetType.STRENGTH] * len(weights), dtype=SET_TYPES),
+            CName.DATE: DATES[: len(weights)],
+            CName.WEIGHT: weights,
+        },
+    )
+    workout_dates = pd.DataFrame({CName.DATE: DATES[[0, -1]]})
+    return ExerciseProgress(exercise, daily_bests, (min(weights), max(weights)), workout_dates)
+
+
+class TestPlots(unittest.TestCase):
+    def test_plots_are_independent(self) -> None:
+        """Checks that each plot gets its own Figure (or the Axes it's given) without going through pyplot."""
+        fig = plot_exercise_progress(_get_progress("Deadlift", [225.0, 235.0, 245.0]), PlotOptions())
+        other_fig = plot_exercise_progress(_get_progress("Bench Press", [135.0, 145.0, 155.0]))
+        self.assertIsNot(fig, other_fig)
+        self.assertEqual("Deadlift", fig.axes[0].get_title())
+        self.assertEqual("Bench Press", other_fig.axes[0].get_title())
+        self.assertEqual([], plt.get_fignums())
+
+        composed = Figure()
+        left, right = composed.subplots(1, 2)
+        self.assertIs(composed, plot_exercise_progress(_get_progress("Deadlift", [225.0, 235.0, 245.0]), ax=left))
+        self.assertTrue(left.has_data())
+        self.assertFalse(right.has_data())
+
+    def test_not_enough_sets(self) -> None:
+        """Checks that an exercise without enough sets to plot is rejected."""
+        with self.assertRaisesRegex(ValueError, "Not enough good sets"):  # noqa: PT027
+            plot_exercise_progress(_get_progress("Deadlift", [225.0, 235.0]))